@@ -1,8 +1,17 @@
+import itertools
+
 import streamlit as st
-import pandas as pd
-from urllib.parse import urlencode
-from datetime import datetime
-import re
+
+from name_generator import metrics
+from name_generator.draft import CampaignDraft
+from name_generator.engine import NAMING_FIELDS, validate_url
+from name_generator.exports import LAYOUTS, NAME_LIMITS
+from name_generator.normalize import canonicalize, field_kind
+from name_generator.schema import NAMING_SCHEMA, UTM_SCHEMA
+from name_generator.shortlinks import is_safe_url, short_url
+from name_generator.ui import (get_vocabulary_store, get_vocabularies, get_search_index, get_history_store,
+                               get_preset_store, get_compatibility, get_rules, get_shortlink_store, inject_styles,
+                               session_id, static_url)
 
 # ============================================================
 # НАСТРОЙКА СТРАНИЦЫ
@@ -15,300 +24,40 @@ st.set_page_config(
 )
 
 # ============================================================
-# CSS СТИЛИ
+# ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ
 # ============================================================
 
-st.markdown("""
-<style>
-@import url('https://fonts.googleapis.com/css2?family=Golos+Text:wght@400;500;600;700&display=swap');
-
-/* Применяем Golos Text */
-.stMarkdown p, .stMarkdown li, .stMarkdown span {
-    font-family: 'Golos Text', sans-serif;
-}
-
-h1, h2, h3, h4, h5, h6 {
-    font-family: 'Golos Text', sans-serif;
-}
-
-.stSelectbox label, .stMultiSelect label, .stTextInput label, .stRadio label, .stCheckbox label {
-    font-family: 'Golos Text', sans-serif;
-}
-
-code, pre, .stCode {
-    font-family: 'Courier New', monospace !important;
-}
-
-/* Компактные отступы */
-.block-container {
-    padding-top: 1.5rem;
-    padding-bottom: 2rem;
-}
-
-/* КОМПАКТНЫЕ КНОПКИ */
-.stButton button {
-    margin: 3px;
-    padding: 6px 12px;
-    font-size: 13px;
-    min-height: 36px;
-    max-height: 36px;
-}
-
-/* Кнопки добавления (➕) - прозрачные, без фона */
-.stButton button:has-text("➕") {
-    background: transparent !important;
-    border: none !important;
-    color: #666 !important;
-    font-size: 20px !important;
-    padding: 4px 8px !important;
-    min-width: 40px !important;
-}
-
-.stButton button:has-text("➕"):hover {
-    color: #1E5AA8 !important;
-    background: transparent !important;
-}
-
-/* Заголовки полей */
-.field-label {
-    font-size: 17px;
-    font-weight: 700;
-    margin-bottom: 10px;
-    color: #1E5AA8;
-    display: flex;
-    align-items: center;
-    gap: 8px;
-}
-
-.field-label-disabled {
-    color: #9E9E9E;
-}
-
-/* Нумерация в кружках */
-.field-number {
-    display: inline-flex;
-    align-items: center;
-    justify-content: center;
-    background: #1E5AA8;
-    color: white;
-    width: 26px;
-    height: 26px;
-    border-radius: 50%;
-    font-weight: 700;
-    font-size: 14px;
-    flex-shrink: 0;
-}
-
-.field-number-disabled {
-    background: #9E9E9E;
-}
-
-/* Прогресс-бар */
-.progress-container {
-    width: 100%;
-    height: 6px;
-    background: #e0e0e0;
-    border-radius: 3px;
-    margin-bottom: 20px;
-    overflow: hidden;
-}
-
-.progress-bar {
-    height: 6px;
-    background: linear-gradient(90deg, #4CAF50, #2196F3);
-    border-radius: 3px;
-    transition: width 0.3s ease;
-}
-
-/* СТИЛИ САЙДБАРА */
-[data-testid="stSidebar"] {
-    background: #f7fafc !important;
-}
-
-[data-testid="stSidebar"] .stMarkdown h3 {
-    color: #333333;
-    font-weight: 700;
-    font-size: 18px;
-    margin-bottom: 10px;
-}
-
-[data-testid="stSidebar"] .stMarkdown p,
-[data-testid="stSidebar"] .stMarkdown strong {
-    color: #555555;
-    font-size: 13px;
-    font-weight: 600;
-    margin-bottom: 5px;
-}
-
-/* Простые светлые блоки для текста с темным текстом */
-[data-testid="stSidebar"] code {
-    background: #e2e8f0 !important;
-    border: none !important;
-    border-left: 3px solid #10b981 !important; /* Зеленый акцент слева для нейминга */
-    border-radius: 4px !important;
-    padding: 10px 12px !important;
-    color: #047857 !important; /* Темно-зеленый для нейминга */
-    font-family: 'Courier New', monospace !important;
-    font-size: 13px !important;
-    display: block !important;
-    white-space: pre-wrap !important;
-    word-wrap: break-word !important;
-    overflow-wrap: break-word !important;
-    max-width: 100% !important;
-    line-height: 1.4 !important;
-    font-weight: 400 !important; /* Обычный шрифт */
-}
-
-/* Убираем белые контейнеры */
-[data-testid="stSidebar"] [data-testid="stCodeBlock"] {
-    background: transparent !important;
-    padding: 0 !important;
-    margin: 0 !important;
-}
-
-[data-testid="stSidebar"] .stCodeBlock {
-    background: transparent !important;
-}
-
-[data-testid="stSidebar"] pre {
-    background: transparent !important;
-    border: none !important;
-    margin: 0 !important;
-    padding: 0 !important;
-}
-
-/* Темно-фиолетовый текст для UTM с фиолетовым акцентом */
-[data-testid="stSidebar"] .utm-code code {
-    color: #6d28d9 !important;
-    border-left: 3px solid #9333ea !important;
-}
-
-/* Разделитель */
-[data-testid="stSidebar"] hr {
-    border-color: #cbd5e0 !important;
-    margin: 15px 0 !important;
-    opacity: 0.5;
-}
-</style>
-""", unsafe_allow_html=True)
+# Ключи служебных виджетов, которые создаются на лету (форма ➕, поиск)
+TRANSIENT_PREFIXES = ("show_add_", "new_input_", "search_")
 
-# ============================================================
-# КОНФИГУРАЦИЯ ДАННЫХ
-# ============================================================
+def get_draft():
+    return st.session_state.draft
 
-DEFAULT_STRICT_NAMING = {
-    "Продукт": ["adtech-b2b", "adtech-b2c"],
-    "Стрим": ["magnitsupergeo", "lpv", "vebinar", "multi", "clickme", "client", "cobrand", 
-              "omnikanalnost", "brandlift", "vr", "career", "retargeting", "reactiv", 
-              "adtech", "meetup", "onedayoffer"],
-    "Статья расхода": ["vr", "cpa", "nch", "lpv", "career"],
-    "Источник": ["yandex", "telegram", "vk", "tgads", "rockettelegram", "gooroo", "vc", "yandexpromopages"],
-}
-
-DEFAULT_VARIABLE_NAMING = {
-    "Тип кампании": ["cpcepkall", "mk", "inapp", "media", "leadform", "telegram", "feed", 
-                     "autofeed", "epkrsya", "cpaepkall", "post", "search", "article", 
-                     "resumes", "common", "vacancy", "banner300x600", "banner100x250", 
-                     "employer", "text", "video", "banner", "image"],
-    "Клиент/гео": ["rostelecomoperatorcallcenter", "astrakhan", "voditel", "b2c", "multigeo", 
-                   "supergeo", "vit", "special", "remote", "common", "efes", "february", 
-                   "multycallcentre", "multyvoditel", "podrabotka", "5napravleniy", "bezopyta",
-                   "vakhta", "obnoviresume", "kaknenado", "statyasovetirezume", "kartavacanse",
-                   "RTK-operatorkc", "RTK-seller", "periodmart", "yandex-storekeeper", 
-                   "vkusnoitochka", "webinarkobrend"],
-    "Таргетинг": ["channel", "users", "bdhh", "msk2km", "joblisting", "bigdata", 
-                  "segment6-12", "segment12-24", "segment24-60", "chatbot", "key-autotarget",
-                  "segmenteconomist", "segment-themes-t1", "segment-channel-t1",
-                  "segment1224-themes-t1", "segment1224-channel-t1", "segmentcallcentre",
-                  "channel-t1", "channel-t2", "channel-t3", "channel-t4", "channel-themes-t1",
-                  "segment612-themes-t1", "segment612-channel-t1", "segmenthh", "segment-t1", "segment-t2"],
-    "Цель": ["response", "tresponse", "reg", "regb2c", "install", "reginstall", "leadform", 
-             "lead", "response-tresponse", "clickredlk-clicksohranitizmeneniyalk", "cuerresponse",
-             "zapolnenyekontaktnihdanih", "impressions"],
-}
-
-DEFAULT_UTM_PARAMS = {
-    "utm_source": ["yandex", "tgads", "clickme", "vk", "gooroo", "tg", "vc", "yandexpromopages"],
-    "utm_medium": ["cpc", "cpm", "cpa", "post", "posev", "cpc_yandex_direct"],
-    "utm_content": ["ad1", "{ad_id}", "ad2", "t1", "t2", "t3", "v1", "v2", "v3", "i1"],
-    "utm_term": ["none", "{keyword}", "kartavacanse", "5obraztsov", "sovetirezume", "kaknenado",
-                 "posadkavacancy", "statyaudalenka", "statya5napravleniy", "obshayabezopyta",
-                 "obshayaposadkavacancy", "posadkaresume", "obshayapodrabotka", "podrabotka",
-                 "vakhta", "remote", "obnoviresume", "multy_callcentre", "seller", "waiter",
-                 "multyvoditel", "statyamyths", "rosteloperatorcc", "bezopyta", "RTK-seller",
-                 "yandex-storekeeper", "msk", "yandexeda-courier"],
-    "utm_vacancy": ["116482958", "114556060", "{utm_vacancy}", "121286221", "33086", "125468351"],
-}
+def set_draft(draft):
+    st.session_state.draft = draft
 
-# ============================================================
-# ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ
-# ============================================================
-
-def validate_url(url):
-    pattern = re.compile(
-        r'^https?://'
-        r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'
-        r'localhost|'
-        r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'
-        r'(?::\d+)?'
-        r'(?:/?|[/?]\S+)$', re.IGNORECASE)
-    return bool(pattern.match(url))
-
-def build_preview(product, stream, expense, source, campaign_types, client_geo, targeting, goal):
-    parts = []
-    if product:
-        parts.append(product)
-    if stream:
-        parts.append(stream)
-    if expense:
-        parts.append(expense)
-    if source:
-        parts.append(source)
-    if campaign_types:
-        parts.append("&".join(campaign_types))
-    if client_geo:
-        parts.append(client_geo)
-    if targeting:
-        parts.append(targeting)
-    if goal:
-        parts.append(goal)
-    return "_".join(parts) if parts else ""
+def draft_field(state_key):
+    # Ключ виджетов поля → поле черновика (utm_source_select → utm_source)
+    return state_key.removesuffix("_select")
 
 def clear_all():
-    keys_to_clear = ['product', 'stream', 'expense', 'source', 'campaign_types', 
-                     'client_geo', 'targeting', 'goal', 'base_link', 'utm_source_select',
-                     'utm_medium_select', 'utm_campaign', 'utm_content_select', 
-                     'utm_term_select', 'utm_vacancy_select']
-    for key in keys_to_clear:
-        if key in st.session_state:
-            if key == 'campaign_types':
-                st.session_state[key] = []
-            else:
-                st.session_state[key] = ""
-    st.session_state.campaign_name = ""
-
-# ============================================================
-# ИНИЦИАЛИЗАЦИЯ SESSION STATE
-# ============================================================
-
-if 'campaign_name' not in st.session_state:
-    st.session_state.campaign_name = ""
-if 'product' not in st.session_state:
-    st.session_state.product = ""
-if 'stream' not in st.session_state:
-    st.session_state.stream = ""
-if 'expense' not in st.session_state:
-    st.session_state.expense = ""
-if 'source' not in st.session_state:
-    st.session_state.source = ""
-if 'campaign_types' not in st.session_state:
-    st.session_state.campaign_types = []
-if 'client_geo' not in st.session_state:
-    st.session_state.client_geo = ""
-if 'targeting' not in st.session_state:
-    st.session_state.targeting = ""
-if 'goal' not in st.session_state:
-    st.session_state.goal = ""
+    set_draft(CampaignDraft())
+    for key in list(st.session_state):
+        if key.startswith(TRANSIENT_PREFIXES):
+            del st.session_state[key]
+
+def collect_garbage():
+    # Закрытые формы ➕ и пустые поля поиска не должны копиться в сессии.
+    # Вызывается до отрисовки виджетов, поэтому их ключи можно удалять.
+    state = st.session_state
+    for key in list(state):
+        if key.startswith("show_add_") and not state[key]:
+            del state[key]
+    for key in list(state):
+        if key.startswith("new_input_") and not state.get(f"show_add_{key[len('new_input_'):]}"):
+            del state[key]
+        elif key.startswith("search_") and not state[key]:
+            del state[key]
 
 # ============================================================
 # UI: ФУНКЦИИ ДЛЯ ПОЛЕЙ
@@ -326,534 +75,497 @@ def render_field_header(label, field_number, disabled=False):
     </div>
     ''', unsafe_allow_html=True)
 
-def render_button_field(label, field_number, options, state_key, disabled=False, columns=4):
+# Колбэки кнопок выполняются до перезапуска скрипта, поэтому клик
+# стоит одного прогона вместо двух (клик + st.rerun()).
+
+def _select_value(state_key, option):
+    set_draft(get_draft().replace(**{draft_field(state_key): option}))
+
+def _toggle_value(state_key, option):
+    set_draft(get_draft().toggle_type(option))
+
+def _sync_dropdown(state_key):
+    set_draft(get_draft().replace(**{draft_field(state_key): st.session_state[f"{state_key}_dropdown"]}))
+
+def _sync_text(state_key):
+    set_draft(get_draft().replace(**{draft_field(state_key): st.session_state[state_key]}))
+
+def _sync_campaign(preview):
+    # Совпадение с неймингом — это автозаполнение, а не ручное значение
+    value = st.session_state.utm_campaign
+    set_draft(get_draft().replace(utm_campaign="" if value == preview else value))
+
+def _sync_widget(key, value):
+    # Значение виджета задаётся из черновика до его отрисовки
+    if st.session_state.get(key) != value:
+        st.session_state[key] = value
+
+def _set_add_form(state_key, visible):
+    st.session_state[f"show_add_{state_key}"] = visible
+
+@st.fragment
+def render_field_toolbar(label, field_number, vocabulary_field, state_key, disabled=False, select_on_add=False):
+    # Заголовок поля и форма ➕ живут во фрагменте: открытие/закрытие формы
+    # перерисовывает только её, а не весь скрипт
     col_header, col_add = st.columns([6, 1])
     with col_header:
-        render_field_header(label, field_number, disabled)
+        if field_number:
+            render_field_header(label, field_number, disabled)
+        elif disabled:
+            st.markdown(f'<p class="field-label field-label-disabled">{label} 🔒</p>', unsafe_allow_html=True)
+        else:
+            st.markdown(f'<p class="field-label">{label}</p>', unsafe_allow_html=True)
     with col_add:
-        if not disabled and field_number:  # Показываем ➕ только для нейминга (где есть field_number)
-            if st.button("➕", key=f"add_btn_{state_key}", help="Добавить своё значение", use_container_width=True):
-                st.session_state[f"show_add_{state_key}"] = True
+        if not disabled:
+            metrics.add_widgets(1)
+            st.button("➕", key=f"add_btn_{state_key}", help="Добавить своё значение", use_container_width=True,
+                      on_click=_set_add_form, args=(state_key, True))
     
-    if disabled:
-        st.info("🔒 Заполните предыдущее поле")
+    if disabled or not st.session_state.get(f"show_add_{state_key}", False):
         return
     
-    if st.session_state.get(f"show_add_{state_key}", False):
-        col_input, col_btn_add, col_btn_cancel = st.columns([4, 1, 1])
-        with col_input:
-            new_val = st.text_input("Новое значение:", key=f"new_input_{state_key}", placeholder="Введите значение...", label_visibility="collapsed")
-        with col_btn_add:
-            if st.button("✓", key=f"confirm_{state_key}", help="Добавить", use_container_width=True, type="primary"):
-                if new_val and new_val.strip():
-                    if new_val.strip() not in options:
-                        options.append(new_val.strip())
-                        st.session_state[f"show_add_{state_key}"] = False
-                        st.rerun()
-                    else:
-                        st.toast("Значение уже есть в списке", icon="⚠️")
-        with col_btn_cancel:
-            if st.button("✗", key=f"cancel_{state_key}", help="Отмена", use_container_width=True):
-                st.session_state[f"show_add_{state_key}"] = False
-                st.rerun()
-    
-    cols = st.columns(columns)
-    current_value = st.session_state.get(state_key, "")
+    col_input, col_btn_add, col_btn_cancel = st.columns([4, 1, 1])
+    metrics.add_widgets(3)
+    with col_input:
+        new_val = st.text_input("Новое значение:", key=f"new_input_{state_key}", placeholder="Введите значение...", label_visibility="collapsed")
+        # В словарь попадает нормализованное значение: латиница, нижний регистр,
+        # без разделителей нейминга; показываем, во что превратится ввод
+        new_val = new_val.strip()
+        normalized = canonicalize(new_val, get_vocabularies().options(vocabulary_field),
+                                  field_kind(vocabulary_field)) if new_val else ""
+        if normalized != new_val:
+            st.caption(f"Будет добавлено: `{normalized}`" if normalized else "Нет допустимых символов")
+    with col_btn_add:
+        if st.button("✓", key=f"confirm_{state_key}", help="Добавить", use_container_width=True, type="primary"):
+            if normalized:
+                if get_vocabulary_store().add(vocabulary_field, normalized):
+                    if select_on_add:
+                        set_draft(get_draft().replace(**{draft_field(state_key): normalized}))
+                    st.session_state[f"show_add_{state_key}"] = False
+                    # Новое значение должно появиться в списке вне фрагмента
+                    st.rerun()
+                else:
+                    st.toast("Значение уже есть в списке", icon="⚠️")
+    with col_btn_cancel:
+        st.button("✗", key=f"cancel_{state_key}", help="Отмена", use_container_width=True,
+                  on_click=_set_add_form, args=(state_key, False))
+
+# Словари длиннее порога показываются через поиск: на экране только топ совпадений
+SEARCH_THRESHOLD = 40
+SEARCH_LIMIT = 20
+
+def _visible_options(vocabulary_field, state_key, selected):
+    # Варианты, совместимые с уже выбранными значениями (схема правил);
+    # выбранные ранее значения остаются видны, даже если стали несовместимы
+    vocabulary = get_vocabularies()
+    compatibility = get_compatibility(vocabulary.version)
+    field = draft_field(state_key)
+    options = compatibility.allowed(field, get_draft())
+    if len(options) <= SEARCH_THRESHOLD:
+        return tuple(value for value in selected if value not in options) + options
     
-    for i, option in enumerate(options):
-        with cols[i % columns]:
-            button_type = "primary" if option == current_value else "secondary"
-            if st.button(option, key=f"{state_key}_{option}", type=button_type, use_container_width=True):
-                st.session_state[state_key] = option
-                st.rerun()
-
-def render_multiselect_field(label, field_number, options, state_key, disabled=False, columns=4):
-    col_header, col_add = st.columns([6, 1])
-    with col_header:
-        render_field_header(label, field_number, disabled)
-    with col_add:
-        if not disabled:
-            if st.button("➕", key=f"add_btn_{state_key}", help="Добавить своё значение", use_container_width=True):
-                st.session_state[f"show_add_{state_key}"] = True
+    metrics.add_widgets(1)
+    query = st.text_input("Поиск", key=f"search_{state_key}", placeholder=f"🔍 Поиск среди {len(options)} значений...",
+                          label_visibility="collapsed")
+    matches = get_search_index(vocabulary_field, vocabulary.version).search(query, SEARCH_LIMIT)
+    if compatibility.is_restricted(field):
+        matches = [value for value in matches if compatibility.is_allowed(field, value, get_draft())]
+    pinned = tuple(value for value in selected if value not in matches)
+    st.caption(f"Показано {len(matches)} из {len(options)}")
+    return pinned + tuple(matches)
+
+def _warn_incompatible(state_key, values):
+    compatibility = get_compatibility(get_vocabularies().version)
+    field = draft_field(state_key)
+    bad = [value for value in values if not compatibility.is_allowed(field, value, get_draft())]
+    if bad:
+        st.warning(f"⚠️ {', '.join(bad)}: не сочетается с выбранными значениями, выберите другое")
+
+# Сетки значений — не фрагменты: клик по значению меняет превью в сайдбаре
+# и доступность соседних полей, так что фрагменту всё равно пришлось бы
+# вызывать st.rerun(scope="app") — это фрагмент плюс полный прогон на клик
+def render_button_field(label, field_number, vocabulary_field, state_key, disabled=False, columns=4,
+                        disabled_hint="🔒 Заполните предыдущее поле"):
+    with metrics.section(f"field:{state_key}"):
+        render_field_toolbar(label, field_number, vocabulary_field, state_key, disabled)
     
-    if disabled:
-        st.info("🔒 Заполните предыдущее поле")
-        return
+        if disabled:
+            st.info(disabled_hint)
+            return
     
-    if st.session_state.get(f"show_add_{state_key}", False):
-        col_input, col_btn_add, col_btn_cancel = st.columns([4, 1, 1])
-        with col_input:
-            new_val = st.text_input("Новое значение:", key=f"new_input_{state_key}", placeholder="Введите значение...", label_visibility="collapsed")
-        with col_btn_add:
-            if st.button("✓", key=f"confirm_{state_key}", help="Добавить", use_container_width=True, type="primary"):
-                if new_val and new_val.strip():
-                    if new_val.strip() not in options:
-                        options.append(new_val.strip())
-                        st.session_state[f"show_add_{state_key}"] = False
-                        st.rerun()
-                    else:
-                        st.toast("Значение уже есть в списке", icon="⚠️")
-        with col_btn_cancel:
-            if st.button("✗", key=f"cancel_{state_key}", help="Отмена", use_container_width=True):
-                st.session_state[f"show_add_{state_key}"] = False
-                st.rerun()
+        current_value = getattr(get_draft(), draft_field(state_key))
+        options = _visible_options(vocabulary_field, state_key, [current_value] if current_value else [])
+        _warn_incompatible(state_key, [current_value] if current_value else [])
+        cols = st.columns(columns)
+        metrics.add_widgets(len(options))
     
-    cols = st.columns(columns)
-    current_values = st.session_state.get(state_key, [])
+        for i, option in enumerate(options):
+            with cols[i % columns]:
+                button_type = "primary" if option == current_value else "secondary"
+                st.button(option, key=f"{state_key}_{option}", type=button_type, use_container_width=True,
+                          on_click=_select_value, args=(state_key, option))
+
+def render_multiselect_field(label, field_number, vocabulary_field, state_key, disabled=False, columns=4,
+                             disabled_hint="🔒 Заполните предыдущее поле"):
+    with metrics.section(f"field:{state_key}"):
+        render_field_toolbar(label, field_number, vocabulary_field, state_key, disabled)
     
-    for i, option in enumerate(options):
-        with cols[i % columns]:
-            button_type = "primary" if option in current_values else "secondary"
-            if st.button(option, key=f"{state_key}_toggle_{option}", type=button_type, use_container_width=True):
-                if option in current_values:
-                    current_values.remove(option)
-                else:
-                    current_values.append(option)
-                st.session_state[state_key] = current_values
-                st.rerun()
-
-def render_dropdown_with_add(label, options, state_key, disabled=False):
-    col_label, col_add = st.columns([6, 1])
-    with col_label:
         if disabled:
-            st.markdown(f'<p class="field-label field-label-disabled">{label} 🔒</p>', unsafe_allow_html=True)
-        else:
-            st.markdown(f'<p class="field-label">{label}</p>', unsafe_allow_html=True)
-    with col_add:
-        if not disabled:
-            if st.button("➕", key=f"add_btn_{state_key}", help="Добавить своё значение", use_container_width=True):
-                st.session_state[f"show_add_{state_key}"] = True
+            st.info(disabled_hint)
+            return
     
-    if st.session_state.get(f"show_add_{state_key}", False):
-        col_input, col_btn_add, col_btn_cancel = st.columns([4, 1, 1])
-        with col_input:
-            new_val = st.text_input("Новое значение:", key=f"new_input_{state_key}", placeholder="Введите значение...", label_visibility="collapsed")
-        with col_btn_add:
-            if st.button("✓", key=f"confirm_{state_key}", help="Добавить", use_container_width=True, type="primary"):
-                if new_val and new_val.strip():
-                    if new_val.strip() not in options:
-                        options.append(new_val.strip())
-                        st.session_state[state_key] = new_val.strip()
-                        st.session_state[f"show_add_{state_key}"] = False
-                        st.rerun()
-                    else:
-                        st.toast("Значение уже есть в списке", icon="⚠️")
-        with col_btn_cancel:
-            if st.button("✗", key=f"cancel_{state_key}", help="Отмена", use_container_width=True):
-                st.session_state[f"show_add_{state_key}"] = False
-                st.rerun()
+        current_values = getattr(get_draft(), draft_field(state_key))
+        options = _visible_options(vocabulary_field, state_key, current_values)
+        _warn_incompatible(state_key, current_values)
+        cols = st.columns(columns)
+        metrics.add_widgets(len(options))
     
-    current_value = st.session_state.get(state_key, "")
-    selected = st.selectbox(
-        label,
-        [""] + options,
-        key=f"{state_key}_dropdown",
-        index=0 if not current_value else (options.index(current_value) + 1 if current_value in options else 0),
-        disabled=disabled,
-        label_visibility="collapsed"
-    )
+        for i, option in enumerate(options):
+            with cols[i % columns]:
+                button_type = "primary" if option in current_values else "secondary"
+                st.button(option, key=f"{state_key}_toggle_{option}", type=button_type, use_container_width=True,
+                          on_click=_toggle_value, args=(state_key, option))
+
+def render_dropdown_with_add(label, vocabulary_field, state_key, disabled=False):
+    with metrics.section(f"field:{state_key}"):
+        render_field_toolbar(label, None, vocabulary_field, state_key, disabled, select_on_add=True)
     
-    if selected != current_value:
-        st.session_state[state_key] = selected
-        st.rerun()
-
-# ============================================================
-# ГЛАВНЫЙ UI
-# ============================================================
+        vocabulary = get_vocabularies()
+        current_value = getattr(get_draft(), draft_field(state_key))
+        options = get_compatibility(vocabulary.version).allowed(draft_field(state_key), get_draft())
+        if current_value and current_value not in options and vocabulary.contains(vocabulary_field, current_value):
+            options = (current_value,) + options
+            _warn_incompatible(state_key, [current_value])
+        _sync_widget(f"{state_key}_dropdown", current_value if current_value in options else "")
+        metrics.add_widgets(1)
+        st.selectbox(
+            label,
+            ("",) + options,
+            key=f"{state_key}_dropdown",
+            disabled=disabled,
+            label_visibility="collapsed",
+            on_change=_sync_dropdown,
+            args=(state_key,)
+        )
+
+def render_campaign_field(spec, disabled=False):
+    # Текстовое поле с автозаполнением: пока значение не изменили вручную,
+    # в нём нейминг
+    preview = get_draft().name()
+    if disabled:
+        st.markdown(f'<div class="field-label field-label-disabled"><span>{spec.label} (автозаполнение) 🔒</span></div>', unsafe_allow_html=True)
+        st.info(spec.hint)
+        return
+    st.markdown(f'<div class="field-label"><span>{spec.label} <span style="color: #888; font-weight: 400;">(автозаполнение)</span></span></div>', unsafe_allow_html=True)
+    _sync_widget(spec.state_key, getattr(get_draft(), spec.key) or preview)
+    metrics.add_widgets(1)
+    st.text_input(
+        spec.label,
+        key=spec.state_key,
+        label_visibility="collapsed",
+        on_change=_sync_campaign,
+        args=(preview,)
+    )
 
-st.title("🏷️ Генератор нейминга кампании и UTM")
-
-# Кнопка сброса
-col_title, col_reset = st.columns([5, 1])
-with col_reset:
-    if st.button("🔄 Сбросить всё", type="secondary", use_container_width=True):
-        clear_all()
-        st.rerun()
-
-# Получаем текущие значения
-current_product = st.session_state.get('product', '')
-current_stream = st.session_state.get('stream', '')
-current_expense = st.session_state.get('expense', '')
-current_source = st.session_state.get('source', '')
-current_campaign_types = st.session_state.get('campaign_types', [])
-current_client_geo = st.session_state.get('client_geo', '')
-current_targeting = st.session_state.get('targeting', '')
-current_goal = st.session_state.get('goal', '')
+def render_spec(spec, draft):
+    # Виджет поля — из схемы (FieldSpec.widget)
+    disabled = not spec.is_enabled(draft)
+    if spec.widget == "text":
+        render_campaign_field(spec, disabled)
+    elif spec.widget == "dropdown":
+        render_dropdown_with_add(spec.label, spec.vocabulary, spec.state_key, disabled=disabled)
+    elif spec.multi:
+        render_multiselect_field(spec.label, spec.number, spec.vocabulary, spec.state_key, disabled=disabled,
+                                 columns=spec.columns, disabled_hint=spec.hint)
+    else:
+        render_button_field(spec.label, spec.number, spec.vocabulary, spec.state_key, disabled=disabled,
+                            columns=spec.columns, disabled_hint=spec.hint)
 
 # ============================================================
-# ЭТАП 1: НЕЙМИНГ
+# ПРЕСЕТЫ
 # ============================================================
+#
+# Пресет применяется в колбэке кнопки: все поля черновика меняются
+# до прогона скрипта, форма заполняется за один прогон.
+
+def _apply_preset():
+    store = get_preset_store()
+    preset = store.get(st.session_state.get("preset_select"))
+    if preset is None:
+        return
+    set_draft(get_draft().with_params(preset.params, get_vocabularies()))
+    store.mark_used(preset.name)
+
+def _save_preset():
+    name = st.session_state.get("preset_name", "").strip()
+    params = get_draft().to_query_params()
+    if st.session_state.get("preset_naming_only"):
+        params = {field: value for field, value in params.items() if field in NAMING_FIELDS}
+    if get_preset_store().save(name, params):
+        st.session_state.preset_select = name
+        st.session_state.preset_name = ""
+        st.toast(f"Пресет «{name}» сохранён", icon="💾")
+    else:
+        st.toast("Введите название и заполните хотя бы одно поле", icon="⚠️")
 
-st.header("📌 Этап 1: Нейминг кампании")
-
-# ПОЛЯ НЕЙМИНГА
-render_button_field("Продукт", "1", DEFAULT_STRICT_NAMING["Продукт"], "product", columns=2)
-
-step2_disabled = not bool(current_product)
-render_button_field("Стрим", "2", DEFAULT_STRICT_NAMING["Стрим"], "stream", disabled=step2_disabled, columns=4)
-
-step3_disabled = not bool(current_stream)
-render_button_field("Статья расхода", "3", DEFAULT_STRICT_NAMING["Статья расхода"], "expense", disabled=step3_disabled, columns=5)
-
-step4_disabled = not bool(current_expense)
-render_button_field("Источник", "4", DEFAULT_STRICT_NAMING["Источник"], "source", disabled=step4_disabled, columns=4)
-
-step5_disabled = not bool(current_source)
-render_multiselect_field("Тип кампании (можно несколько)", "5", DEFAULT_VARIABLE_NAMING["Тип кампании"], "campaign_types", disabled=step5_disabled, columns=4)
-
-step6_disabled = not bool(current_campaign_types)
-render_button_field("Клиент/профиль/гео", "6", DEFAULT_VARIABLE_NAMING["Клиент/гео"], "client_geo", disabled=step6_disabled, columns=5)
-
-step7_disabled = not bool(current_client_geo)
-render_button_field("Таргетинг", "7", DEFAULT_VARIABLE_NAMING["Таргетинг"], "targeting", disabled=step7_disabled, columns=5)
-
-step8_disabled = not bool(current_targeting)
-render_button_field("Цель", "8", DEFAULT_VARIABLE_NAMING["Цель"], "goal", disabled=step8_disabled, columns=4)
+def _delete_preset():
+    name = st.session_state.get("preset_select")
+    if name and get_preset_store().delete(name):
+        st.session_state.preset_select = None
+        st.toast(f"Пресет «{name}» удалён", icon="🗑️")
 
-st.markdown("<div style='margin-top: 20px;'></div>", unsafe_allow_html=True)
+def _preset_label(preset):
+    partial = " (частичный)" if preset.is_partial() else ""
+    return f"{preset.name}{partial} · применён {preset.uses} раз"
 
 # ============================================================
-# ЭТАП 2: UTM
+# ПРОГОН
 # ============================================================
+#
+# Всё ниже — один прогон скрипта. end_run в finally: прогон учитывается
+# и при исключении, st.stop() или st.rerun().
+
+metrics.begin_run(session_id())
+try:
+    # ============================================================
+    # CSS СТИЛИ
+    # ============================================================
+
+    with metrics.section("styles"):
+        inject_styles()
+
+    # ============================================================
+    # ИНИЦИАЛИЗАЦИЯ SESSION STATE
+    # ============================================================
+    #
+    # Всё, что выбрано в форме, — один объект CampaignDraft в session_state.
+    # Он же дублируется в query-параметры страницы, поэтому заполненная форма
+    # открывается по ссылке за один прогон. Виджеты с ключами (ссылка,
+    # utm_campaign, выпадающие списки) перед отрисовкой получают значение из
+    # черновика, а их on_change пишет обратно.
+
+    if "draft" not in st.session_state:
+        st.session_state.draft = CampaignDraft.from_query_params(st.query_params.to_dict(), get_vocabularies())
+
+    collect_garbage()
+
+    # ============================================================
+    # ГЛАВНЫЙ UI
+    # ============================================================
+
+    st.title("🏷️ Генератор нейминга кампании и UTM")
+
+    # Кнопка сброса
+    col_title, col_reset = st.columns([5, 1])
+    with col_reset:
+        metrics.add_widgets(1)
+        st.button("🔄 Сбросить всё", type="secondary", use_container_width=True, on_click=clear_all)
+
+    # Пресеты
+    with metrics.section("presets"), st.expander("⭐ Пресеты"):
+        presets = {preset.name: preset for preset in get_preset_store().all()}
+        metrics.add_widgets(6)
+
+        col_select, col_apply, col_delete = st.columns([4, 1, 1])
+        with col_select:
+            st.selectbox(
+                "Пресет",
+                list(presets),
+                index=None,
+                key="preset_select",
+                placeholder="Выберите или начните вводить название...",
+                format_func=lambda name: _preset_label(presets[name]),
+                label_visibility="collapsed"
+            )
+        with col_apply:
+            st.button("Применить", key="preset_apply", type="primary", use_container_width=True,
+                      disabled=not presets, on_click=_apply_preset)
+        with col_delete:
+            st.button("🗑️", key="preset_delete", help="Удалить пресет", use_container_width=True,
+                      disabled=not presets, on_click=_delete_preset)
+
+        col_name, col_scope, col_save = st.columns([4, 1, 1])
+        with col_name:
+            st.text_input("Название пресета", key="preset_name", placeholder="Название для текущей формы...",
+                          label_visibility="collapsed")
+        with col_scope:
+            st.checkbox("Только нейминг", key="preset_naming_only")
+        with col_save:
+            st.button("💾 Сохранить", key="preset_save", use_container_width=True, on_click=_save_preset)
+
+    # Получаем текущие значения
+    draft = get_draft()
+
+    # Ошибка в файле правил (NAME_GENERATOR_SCHEMA) не ломает форму: работаем без правил
+    rules_error = get_rules()[1]
+    if rules_error:
+        st.error(f"❌ Правила совместимости не загружены, значения не фильтруются: {rules_error}")
+
+    # ============================================================
+    # ЭТАП 1: НЕЙМИНГ
+    # ============================================================
+
+    st.header("📌 Этап 1: Нейминг кампании")
+
+    # ПОЛЯ НЕЙМИНГА: порядок, виджеты и зависимости — из схемы (name_generator/schema.py)
+    for spec in NAMING_SCHEMA:
+        render_spec(spec, draft)
+
+    st.markdown("<div style='margin-top: 20px;'></div>", unsafe_allow_html=True)
+
+    # ============================================================
+    # ЭТАП 2: UTM
+    # ============================================================
+
+    with metrics.section("utm"):
+        st.header("🎯 Этап 2: UTM ссылка")
+
+        # Базовая ссылка
+        st.markdown("### 🔗 Базовая ссылка")
+        st.info("👇 **Вставьте сюда URL страницы** (должна начинаться с `https://`)")
+
+        _sync_widget("base_link", draft.base_link)
+        metrics.add_widgets(1)
+        base_link = st.text_input(
+            "Базовая ссылка", 
+            placeholder="https://expert.hh.ru/webinar/kobrending",
+            key="base_link",
+            label_visibility="collapsed",
+            on_change=_sync_text,
+            args=("base_link",)
+        )
+
+        if base_link:
+            if validate_url(base_link):
+                st.success("✓ Ссылка корректна")
+            else:
+                st.error("❌ Ссылка должна начинаться с http:// или https://")
 
-st.header("🎯 Этап 2: UTM ссылка")
-
-# Базовая ссылка
-st.markdown("### 🔗 Базовая ссылка")
-st.info("👇 **Вставьте сюда URL страницы** (должна начинаться с `https://`)")
-
-base_link = st.text_input(
-    "Базовая ссылка", 
-    placeholder="https://expert.hh.ru/webinar/kobrending",
-    key="base_link",
-    label_visibility="collapsed"
-)
-
-if base_link:
-    if validate_url(base_link):
-        st.success("✓ Ссылка корректна")
-    else:
-        st.error("❌ Ссылка должна начинаться с http:// или https://")
-
-st.markdown("<div style='margin-top: 15px;'></div>", unsafe_allow_html=True)
-
-# Строим превью нейминга
-preview = build_preview(
-    current_product, current_stream, current_expense, current_source,
-    current_campaign_types, current_client_geo, current_targeting, current_goal
-)
-
-if preview:
-    st.session_state.campaign_name = preview
-
-naming_ready = bool(preview)
-
-st.subheader("UTM параметры")
-
-if not naming_ready:
-    st.info("⬆️ Сначала сгенерируйте нейминг кампании")
-
-# utm_source
-utm_source_disabled = not naming_ready
-col_label, col_add = st.columns([6, 1])
-with col_label:
-    if utm_source_disabled:
-        st.markdown('<p class="field-label field-label-disabled">utm_source 🔒</p>', unsafe_allow_html=True)
-    else:
-        st.markdown('<p class="field-label">utm_source</p>', unsafe_allow_html=True)
-with col_add:
-    if not utm_source_disabled:
-        if st.button("➕", key="add_btn_utm_source", help="Добавить своё значение", use_container_width=True):
-            st.session_state["show_add_utm_source_select"] = True
-
-if not utm_source_disabled:
-    # Поле добавления
-    if st.session_state.get("show_add_utm_source_select", False):
-        col_input, col_btn_add, col_btn_cancel = st.columns([4, 1, 1])
-        with col_input:
-            new_val = st.text_input("Новое значение:", key="new_input_utm_source_select", placeholder="Введите значение...", label_visibility="collapsed")
-        with col_btn_add:
-            if st.button("✓", key="confirm_utm_source_select", help="Добавить", use_container_width=True, type="primary"):
-                if new_val and new_val.strip():
-                    if new_val.strip() not in DEFAULT_UTM_PARAMS["utm_source"]:
-                        DEFAULT_UTM_PARAMS["utm_source"].append(new_val.strip())
-                        st.session_state["show_add_utm_source_select"] = False
-                        st.rerun()
-                    else:
-                        st.toast("Значение уже есть в списке", icon="⚠️")
-        with col_btn_cancel:
-            if st.button("✗", key="cancel_utm_source_select", help="Отмена", use_container_width=True):
-                st.session_state["show_add_utm_source_select"] = False
-                st.rerun()
-    
-    # Кнопки выбора
-    cols = st.columns(4)
-    current_value = st.session_state.get("utm_source_select", "")
-    for i, option in enumerate(DEFAULT_UTM_PARAMS["utm_source"]):
-        with cols[i % 4]:
-            button_type = "primary" if option == current_value else "secondary"
-            if st.button(option, key=f"utm_source_select_{option}", type=button_type, use_container_width=True):
-                st.session_state["utm_source_select"] = option
-                st.rerun()
-else:
-    st.info("🔒 Заполните нейминг")
-
-# utm_medium
-current_utm_source = st.session_state.get('utm_source_select', '')
-utm_medium_disabled = not bool(current_utm_source)
-col_label2, col_add2 = st.columns([6, 1])
-with col_label2:
-    if utm_medium_disabled:
-        st.markdown('<p class="field-label field-label-disabled">utm_medium 🔒</p>', unsafe_allow_html=True)
-    else:
-        st.markdown('<p class="field-label">utm_medium</p>', unsafe_allow_html=True)
-with col_add2:
-    if not utm_medium_disabled:
-        if st.button("➕", key="add_btn_utm_medium", help="Добавить своё значение", use_container_width=True):
-            st.session_state["show_add_utm_medium_select"] = True
-
-if not utm_medium_disabled:
-    # Поле добавления
-    if st.session_state.get("show_add_utm_medium_select", False):
-        col_input, col_btn_add, col_btn_cancel = st.columns([4, 1, 1])
-        with col_input:
-            new_val = st.text_input("Новое значение:", key="new_input_utm_medium_select", placeholder="Введите значение...", label_visibility="collapsed")
-        with col_btn_add:
-            if st.button("✓", key="confirm_utm_medium_select", help="Добавить", use_container_width=True, type="primary"):
-                if new_val and new_val.strip():
-                    if new_val.strip() not in DEFAULT_UTM_PARAMS["utm_medium"]:
-                        DEFAULT_UTM_PARAMS["utm_medium"].append(new_val.strip())
-                        st.session_state["show_add_utm_medium_select"] = False
-                        st.rerun()
-                    else:
-                        st.toast("Значение уже есть в списке", icon="⚠️")
-        with col_btn_cancel:
-            if st.button("✗", key="cancel_utm_medium_select", help="Отмена", use_container_width=True):
-                st.session_state["show_add_utm_medium_select"] = False
-                st.rerun()
-    
-    # Кнопки выбора
-    cols = st.columns(3)
-    current_value = st.session_state.get("utm_medium_select", "")
-    for i, option in enumerate(DEFAULT_UTM_PARAMS["utm_medium"]):
-        with cols[i % 3]:
-            button_type = "primary" if option == current_value else "secondary"
-            if st.button(option, key=f"utm_medium_select_{option}", type=button_type, use_container_width=True):
-                st.session_state["utm_medium_select"] = option
-                st.rerun()
-else:
-    st.info("🔒 Выберите utm_source")
-
-# utm_campaign
-current_utm_medium = st.session_state.get('utm_medium_select', '')
-utm_campaign_disabled = not bool(current_utm_medium)
-
-if not utm_campaign_disabled:
-    st.markdown('<div class="field-label"><span>utm_campaign <span style="color: #888; font-weight: 400;">(автозаполнение)</span></span></div>', unsafe_allow_html=True)
-    utm_campaign = st.text_input(
-        "Кампания", 
-        value=preview,
-        key="utm_campaign",
-        disabled=False,
-        label_visibility="collapsed"
-    )
-else:
-    st.markdown('<div class="field-label field-label-disabled"><span>utm_campaign (автозаполнение) 🔒</span></div>', unsafe_allow_html=True)
-    st.info("🔒 Заполните utm_medium")
-
-st.markdown("<div style='margin-top: 10px;'></div>", unsafe_allow_html=True)
-
-# utm_content, utm_term, utm_vacancy
-utm_other_disabled = not bool(current_utm_medium)
+        st.markdown("<div style='margin-top: 15px;'></div>", unsafe_allow_html=True)
 
-col_utm1, col_utm2, col_utm3 = st.columns(3)
+        # Строим превью нейминга
+        preview = draft.name()
 
-with col_utm1:
-    render_dropdown_with_add("utm_content", DEFAULT_UTM_PARAMS["utm_content"], "utm_content_select", disabled=utm_other_disabled)
+        naming_ready = bool(preview)
 
-with col_utm2:
-    render_dropdown_with_add("utm_term", DEFAULT_UTM_PARAMS["utm_term"], "utm_term_select", disabled=utm_other_disabled)
+        st.subheader("UTM параметры")
 
-with col_utm3:
-    render_dropdown_with_add("utm_vacancy", DEFAULT_UTM_PARAMS["utm_vacancy"], "utm_vacancy_select", disabled=utm_other_disabled)
+        if not naming_ready:
+            st.info("⬆️ Сначала сгенерируйте нейминг кампании")
 
-# ============================================================
-# SIDEBAR: ПРЕВЬЮ РЕЗУЛЬТАТОВ
-# ============================================================
+        # Поля UTM — циклом по схеме; идущие подряд выпадающие списки — в одну строку
+        for widget, group in itertools.groupby(UTM_SCHEMA, key=lambda spec: spec.widget):
+            group = list(group)
+            if widget == "dropdown":
+                st.markdown("<div style='margin-top: 10px;'></div>", unsafe_allow_html=True)
+                for column, spec in zip(st.columns(len(group)), group):
+                    with column:
+                        render_spec(spec, draft)
+            else:
+                for spec in group:
+                    render_spec(spec, draft)
 
-import streamlit.components.v1 as components
+    # ============================================================
+    # SIDEBAR: ПРЕВЬЮ РЕЗУЛЬТАТОВ
+    # ============================================================
 
-with st.sidebar:
-    # Логотип HH
-    st.markdown("""
+    with st.sidebar, metrics.section("sidebar"):
+        # Логотип HH: локальная статика (static/logo.png), размеры заданы заранее,
+        # чтобы место под картинку было зарезервировано до её загрузки
+        st.markdown(f"""
     <div style="text-align: center; padding: 20px 0 30px 0;">
-        <img src="https://raw.githubusercontent.com/bratyakrobatya-web/name_generator/main/min-hh-red.png" 
+        <img src="{static_url('logo.png')}" width="240" height="100"
              style="width: 240px; height: auto;" 
              alt="HH Logo">
     </div>
     """, unsafe_allow_html=True)
     
-    st.markdown("### 📋 Результат")
+        st.markdown("### 📋 Результат")
     
-    # Получаем все значения
-    current_base_link = st.session_state.get('base_link', '')
-    current_utm_source = st.session_state.get('utm_source_select', '')
-    current_utm_medium = st.session_state.get('utm_medium_select', '')
-    current_utm_campaign = st.session_state.get('utm_campaign', '') or preview
-    current_utm_content = st.session_state.get('utm_content_select', '')
-    current_utm_term = st.session_state.get('utm_term_select', '')
-    current_utm_vacancy = st.session_state.get('utm_vacancy_select', '')
+        # Собираем UTM строку (пустой utm_campaign заполняется неймингом)
+        utm_preview = draft.utm_url()
     
-    # Собираем UTM строку
-    utm_parts = []
-    if current_utm_source:
-        utm_parts.append(f"utm_source={current_utm_source}")
-    if current_utm_medium:
-        utm_parts.append(f"utm_medium={current_utm_medium}")
-    if current_utm_campaign:
-        utm_parts.append(f"utm_campaign={current_utm_campaign}")
-    if current_utm_content:
-        utm_parts.append(f"utm_content={current_utm_content}")
-    if current_utm_term:
-        utm_parts.append(f"utm_term={current_utm_term}")
-    if current_utm_vacancy:
-        utm_parts.append(f"utm_vacancy={current_utm_vacancy}")
+        # Отображение
+        preview_display = preview if preview else "Заполните поля..."
+        utm_display = utm_preview if utm_preview else "Введите ссылку и UTM..."
     
-    utm_preview = ""
-    if current_base_link and utm_parts:
-        separator = "&" if "?" in current_base_link else "?"
-        utm_preview = f"{current_base_link}{separator}{'&'.join(utm_parts)}"
-    elif current_base_link:
-        utm_preview = current_base_link
-    elif utm_parts:
-        utm_preview = f"?{'&'.join(utm_parts)}"
+        # Нейминг
+        st.markdown("**Нейминг:**")
+        st.code(preview_display, language=None)
     
-    # Отображение
-    preview_display = preview if preview else "Заполните поля..."
-    utm_display = utm_preview if utm_preview else "Введите ссылку и UTM..."
+        # Кабинеты, в которые нейминг не помещается: при выгрузке он будет сокращён
+        too_long = [LAYOUTS[platform].title for platform, limit in NAME_LIMITS.items() if len(preview) > limit]
+        if too_long:
+            st.warning(f"⚠️ {len(preview)} символов — длиннее лимита: {', '.join(too_long)}. "
+                       f"В выгрузке название будет сокращено")
     
-    # Нейминг
-    st.markdown("**Нейминг:**")
-    st.code(preview_display, language=None)
+        # UTM
+        st.markdown("**UTM:**")
+        st.code(utm_display, language=None)
     
-    if preview:
-        escaped_naming = preview.replace("\\", "\\\\").replace("'", "\\'").replace('"', '\\"').replace('\n', '').replace('\r', '')
-        
-        btn_html_naming = f'''
-        <html><head><style>
-        * {{ margin: 0; padding: 0; }}
-        body {{ background: transparent; }}
-        .copy-btn {{
-            width: 100%;
-            padding: 10px 16px;
-            border-radius: 6px;
-            cursor: pointer;
-            font-size: 14px;
-            font-weight: 600;
-            border: none;
-            color: #fff;
-            background: #48bb78;
-            transition: all 0.2s;
-            margin-top: 8px;
-            margin-bottom: 15px;
-        }}
-        .copy-btn:hover {{ background: #38a169; transform: scale(1.02); }}
-        </style></head><body>
-        <button class="copy-btn" onclick="
-            navigator.clipboard.writeText('{escaped_naming}').then(function() {{
-                document.querySelector('.copy-btn').innerText = '✓ Скопировано!';
-                setTimeout(function() {{ document.querySelector('.copy-btn').innerText = '📋 Копировать'; }}, 1500);
-            }}).catch(function() {{
-                var ta = document.createElement('textarea');
-                ta.value = '{escaped_naming}';
-                ta.style.position = 'fixed';
-                ta.style.left = '-9999px';
-                document.body.appendChild(ta);
-                ta.select();
-                document.execCommand('copy');
-                document.body.removeChild(ta);
-                document.querySelector('.copy-btn').innerText = '✓ Скопировано!';
-                setTimeout(function() {{ document.querySelector('.copy-btn').innerText = '📋 Копировать'; }}, 1500);
-            }});
-        ">📋 Копировать</button>
-        </body></html>
-        '''
-        components.html(btn_html_naming, height=50)
+        # Короткая ссылка: код — хэш UTM-ссылки. Пока ссылку набирают, код
+        # только показывается; в базу она попадает при копировании. Код
+        # запоминается в сессии вместе со ссылкой, чтобы не ходить в базу
+        # на каждом прогоне, пока ссылка не изменилась
+        short_link = ""
+        if utm_preview and validate_url(draft.base_link) and is_safe_url(utm_preview):
+            peeked = st.session_state.get("short_link_peek")
+            if not peeked or peeked[0] != utm_preview:
+                peeked = (utm_preview, get_shortlink_store().peek(utm_preview))
+                st.session_state.short_link_peek = peeked
+            short_link = short_url(peeked[1])
+            st.markdown("**Короткая ссылка:**")
+            st.code(short_link, language=None)
     
-    # UTM
-    st.markdown("**UTM:**")
-    st.code(utm_display, language=None)
+        # Проверка по истории: поиск в словаре в памяти, без запроса к базе
+        metrics.add_widgets(1)
+        author = st.text_input("Автор", key="author", placeholder="Имя или команда")
+        first_use = get_history_store().first_use(preview)
+        if first_use:
+            used_by, used_at = first_use
+            used_on = f"{used_at[8:10]}.{used_at[5:7]}.{used_at[:4]}"
+            author_name = author.strip()
+            if used_by and used_by == author_name:
+                st.info(f"ℹ️ Вы уже копировали этот нейминг {used_on}")
+            elif used_by and author_name:
+                st.warning(f"⚠️ Нейминг уже использовал {used_by} {used_on}")
+            else:
+                # Без имени автора (своего или в истории) не понять, чужое ли
+                # это использование, — сообщаем без предупреждения
+                st.info(f"ℹ️ Нейминг уже использовали {used_on}" + (f" ({used_by})" if used_by else ""))
     
-    if utm_preview:
-        escaped_utm = utm_preview.replace("\\", "\\\\").replace("'", "\\'").replace('"', '\\"').replace('\n', '').replace('\r', '')
-        
-        btn_html_utm = f'''
-        <html><head><style>
-        * {{ margin: 0; padding: 0; }}
-        body {{ background: transparent; }}
-        .copy-btn {{
-            width: 100%;
-            padding: 10px 16px;
-            border-radius: 6px;
-            cursor: pointer;
-            font-size: 14px;
-            font-weight: 600;
-            border: none;
-            color: #fff;
-            background: #4299e1;
-            transition: all 0.2s;
-            margin-top: 8px;
-        }}
-        .copy-btn:hover {{ background: #3182ce; transform: scale(1.02); }}
-        </style></head><body>
-        <button class="copy-btn" onclick="
-            navigator.clipboard.writeText('{escaped_utm}').then(function() {{
-                document.querySelector('.copy-btn').innerText = '✓ Скопировано!';
-                setTimeout(function() {{ document.querySelector('.copy-btn').innerText = '📋 Копировать'; }}, 1500);
-            }}).catch(function() {{
-                var ta = document.createElement('textarea');
-                ta.value = '{escaped_utm}';
-                ta.style.position = 'fixed';
-                ta.style.left = '-9999px';
-                document.body.appendChild(ta);
-                ta.select();
-                document.execCommand('copy');
-                document.body.removeChild(ta);
-                document.querySelector('.copy-btn').innerText = '✓ Скопировано!';
-                setTimeout(function() {{ document.querySelector('.copy-btn').innerText = '📋 Копировать'; }}, 1500);
-            }});
-        ">📋 Копировать</button>
-        </body></html>
-        '''
-        components.html(btn_html_utm, height=50)
+        copy_items = []
+        if preview:
+            copy_items.append(("📋 Копировать нейминг", preview, "#48bb78"))
+        if utm_preview:
+            copy_items.append(("📋 Копировать UTM", utm_preview, "#4299e1"))
+        if short_link:
+            copy_items.append(("📋 Короткая ссылка", short_link, "#dd6b20"))
+        if preview and utm_preview:
+            copy_items.append(("📋 Нейминг + UTM (TSV)", f"{preview}\t{utm_preview}", "#805ad5"))
     
-    # Прогресс-бар внизу сайдбара
-    st.markdown("---")
+        if copy_items:
+            # Компонент нужен только для кнопок копирования
+            from name_generator.copy_button import copy_buttons
+            with metrics.section("copy_buttons"):
+                metrics.add_widgets(1)
+                copy_event = copy_buttons(copy_items, key="copy_result")
+            # Значение компонента сохраняется между прогонами, поэтому
+            # каждое копирование записывается в историю один раз — по ts
+            if copy_event and copy_event["ts"] != st.session_state.get("copy_recorded_ts") and preview:
+                st.session_state.copy_recorded_ts = copy_event["ts"]
+                get_history_store().record(preview, utm_preview, author, draft.segments())
+                if short_link and copy_event["text"] == short_link:
+                    st.session_state.short_link_peek = (utm_preview, get_shortlink_store().shorten(utm_preview))
     
-    # Получаем данные для прогресса
-    current_product = st.session_state.get('product', '')
-    current_stream = st.session_state.get('stream', '')
-    current_expense = st.session_state.get('expense', '')
-    current_source = st.session_state.get('source', '')
-    current_campaign_types = st.session_state.get('campaign_types', [])
-    current_client_geo = st.session_state.get('client_geo', '')
-    current_targeting = st.session_state.get('targeting', '')
-    current_goal = st.session_state.get('goal', '')
+        # Прогресс-бар внизу сайдбара
+        st.markdown("---")
     
-    completed_steps = sum([
-        bool(current_product),
-        bool(current_stream),
-        bool(current_expense),
-        bool(current_source),
-        bool(current_campaign_types),
-        bool(current_client_geo),
-        bool(current_targeting),
-        bool(current_goal)
-    ])
-    total_steps = 8
-    progress_percent = (completed_steps / total_steps) * 100
+        completed_steps = sum(bool(getattr(draft, spec.key)) for spec in NAMING_SCHEMA)
+        total_steps = len(NAMING_SCHEMA)
+        progress_percent = (completed_steps / total_steps) * 100
     
-    st.markdown(f'''
+        st.markdown(f'''
     <div class="progress-container">
         <div class="progress-bar" style="width: {progress_percent}%"></div>
     </div>
@@ -861,3 +573,10 @@ with st.sidebar:
         {completed_steps} из {total_steps} завершено
     </p>
     ''', unsafe_allow_html=True)
+
+    # Черновик → query-параметры: ссылка на страницу открывает ту же форму
+    query_params = get_draft().to_query_params()
+    if st.query_params.to_dict() != query_params:
+        st.query_params.from_dict(query_params)
+finally:
+    metrics.end_run()
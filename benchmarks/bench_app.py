@@ -0,0 +1,197 @@
+import argparse
+import datetime
+import json
+import logging
+import os
+import pickle
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# ============================================================
+# БЕНЧМАРК ВЗАИМОДЕЙСТВИЙ ЧЕРЕЗ streamlit.testing AppTest
+# ============================================================
+#
+# python benchmarks/bench_app.py --scale 1 10 100 --output bench_app.json
+# python benchmarks/bench_app.py --compare bench_app.json
+#
+# Сценарий: полное заполнение нейминга (8 полей), UTM, сброс.
+# Для каждого шага пишется время прогона скрипта, число виджетов
+# и размер session_state. --scale N раздувает каждый словарь в N раз.
+# Шаг deep_link — открытие той же заполненной формы по ссылке
+# (query-параметры черновика) одним прогоном.
+
+APP_PATH = os.path.join(ROOT, "app.py")
+
+WIDGET_TYPES = ("button", "text_input", "selectbox", "multiselect", "number_input",
+                "checkbox", "radio", "download_button")
+
+NAMING_STEPS = (
+    ("product", "Продукт", "product_{}"),
+    ("stream", "Стрим", "stream_{}"),
+    ("expense", "Статья расхода", "expense_{}"),
+    ("source", "Источник", "source_{}"),
+    ("campaign_types", "Тип кампании", "campaign_types_toggle_{}"),
+    ("client_geo", "Клиент/гео", "client_geo_{}"),
+    ("targeting", "Таргетинг", "targeting_{}"),
+    ("goal", "Цель", "goal_{}"),
+    ("utm_source", "utm_source", "utm_source_select_{}"),
+    ("utm_medium", "utm_medium", "utm_medium_select_{}"),
+)
+
+def scaled_vocabularies(scale):
+    from name_generator.vocabulary import DEFAULT_VOCABULARIES
+
+    return {
+        field: list(options) + [f"{value}x{copy}" for copy in range(1, scale) for value in options]
+        for field, options in DEFAULT_VOCABULARIES.items()
+    }
+
+def build_flow(vocabularies):
+    # Шаг: (название, действие над AppTest); первым значением поля
+    # выбирается первое значение словаря — оно видно и при поиске
+    flow = [("load", lambda at: None)]
+    for step, field, key in NAMING_STEPS:
+        button_key = key.format(vocabularies[field][0])
+        flow.append((f"click_{step}", lambda at, k=button_key: at.button(key=k).click()))
+    flow.append(("set_base_link",
+                 lambda at: at.text_input(key="base_link").set_value("https://expert.hh.ru/webinar/kobrending")))
+    for key in ("utm_content", "utm_term", "utm_vacancy"):
+        value = vocabularies[key][0]
+        flow.append((f"select_{key}",
+                     lambda at, k=key, v=value: at.selectbox(key=f"{k}_select_dropdown").select(v)))
+    flow.append(("reset", lambda at: next(b for b in at.button if b.label.startswith("🔄")).click()))
+    return flow
+
+def deep_link_params(vocabularies):
+    params = {field: vocabularies[vocabulary][0] for field, vocabulary, _ in NAMING_STEPS}
+    params["base_link"] = "https://expert.hh.ru/webinar/kobrending"
+    for key in ("utm_content", "utm_term", "utm_vacancy"):
+        params[key] = vocabularies[key][0]
+    return params
+
+def widget_count(at):
+    return sum(len(at.get(widget_type)) for widget_type in WIDGET_TYPES)
+
+def session_state_bytes(at):
+    state = {key: at.session_state[key] for key in at.session_state.keys()}
+    return len(pickle.dumps(state))
+
+def run_scale(scale, rounds, timeout):
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    from name_generator.vocabulary import VocabularyStore
+
+    vocabularies = scaled_vocabularies(scale)
+    flow = build_flow(vocabularies)
+    timings = {name: [] for name, _ in flow}
+    timings["deep_link"] = []
+    widgets = {}
+    state_sizes = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["NAME_GENERATOR_DB"] = os.path.join(directory, "bench.sqlite3")
+        VocabularyStore(defaults=vocabularies)
+        st.cache_resource.clear()
+
+        for _ in range(rounds):
+            at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+            for name, action in flow:
+                action(at)
+                started = time.perf_counter()
+                at.run()
+                timings[name].append(time.perf_counter() - started)
+                if at.exception:
+                    raise RuntimeError(f"{name}: {at.exception[0].message}")
+                widgets[name] = widget_count(at)
+                state_sizes[name] = session_state_bytes(at)
+
+            at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+            at.query_params.update(deep_link_params(vocabularies))
+            started = time.perf_counter()
+            at.run()
+            timings["deep_link"].append(time.perf_counter() - started)
+            if at.exception:
+                raise RuntimeError(f"deep_link: {at.exception[0].message}")
+            widgets["deep_link"] = widget_count(at)
+            state_sizes["deep_link"] = session_state_bytes(at)
+
+        st.cache_resource.clear()
+
+    return {
+        name: {
+            "ms_median": round(statistics.median(values) * 1000, 2),
+            "ms_max": round(max(values) * 1000, 2),
+            "widgets": widgets[name],
+            "session_state_bytes": state_sizes[name],
+        }
+        for name, values in timings.items()
+    }
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+def compare(old_path, new):
+    with open(old_path, encoding="utf-8") as handle:
+        old = json.load(handle)
+    print(f"\nСравнение с {old_path} ({old['meta'].get('revision', '?')}):")
+    for scale, steps in new["results"].items():
+        old_steps = old["results"].get(scale, {})
+        for name, result in steps.items():
+            if name not in old_steps:
+                continue
+            before = old_steps[name]["ms_median"]
+            after = result["ms_median"]
+            change = (after - before) / before * 100 if before else 0
+            print(f"  x{scale:<4} {name:<22} {before:8.1f} → {after:8.1f} мс ({change:+.0f}%)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк app.py через AppTest")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--output", default="bench_app.json")
+    parser.add_argument("--compare", metavar="OLD_JSON")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    import streamlit
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "streamlit": streamlit.__version__,
+            "rounds": args.rounds,
+        },
+        "results": {},
+    }
+    for scale in args.scale:
+        results = run_scale(scale, args.rounds, args.timeout)
+        report["results"][str(scale)] = results
+        print(f"\nСловари x{scale}:")
+        for name, result in results.items():
+            print(f"  {name:<22} {result['ms_median']:8.1f} мс  "
+                  f"виджетов: {result['widgets']:5}  session_state: {result['session_state_bytes']:6} Б")
+
+    if args.compare:
+        compare(args.compare, report)
+
+    with open(args.output, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, ensure_ascii=False, indent=2)
+    print(f"\nРезультаты: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import argparse
+import concurrent.futures
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from load_api import free_port, wait_for_port
+
+# ============================================================
+# ЗАГРУЗКА РЕСУРСОВ ПЕРВОЙ ОТРИСОВКИ
+# ============================================================
+#
+# python benchmarks/bench_assets.py
+# python benchmarks/bench_assets.py --timeout 30
+#
+# Браузера в окружении может не быть, поэтому первая отрисовка
+# оценивается по сети: поднимается streamlit run app.py, и ресурсы,
+# без которых страница не дорисуется (оболочка, стили, логотип),
+# загружаются параллельно, как это делает браузер. Время первой
+# отрисовки не меньше самой долгой загрузки из набора.
+#
+# «до» — внешние ресурсы прежней версии (Google Fonts, логотип с GitHub),
+# «после» — те же ресурсы из static/ этого сервера.
+
+EXTERNAL = {
+    "Google Fonts CSS": "https://fonts.googleapis.com/css2?family=Golos+Text:wght@400;500;600;700&display=swap",
+    "логотип (GitHub)": "https://raw.githubusercontent.com/bratyakrobatya-web/name_generator/main/min-hh-red.png",
+}
+
+def fetch(url, timeout):
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            size = len(response.read())
+        status = "ok"
+    except OSError as exc:
+        size = 0
+        status = f"ошибка: {getattr(exc, 'reason', exc)}"
+    return time.perf_counter() - started, size, status
+
+def measure(resources, timeout):
+    with concurrent.futures.ThreadPoolExecutor(len(resources)) as pool:
+        futures = {label: pool.submit(fetch, url, timeout) for label, url in resources.items()}
+        results = {label: future.result() for label, future in futures.items()}
+    for label, (elapsed, size, status) in results.items():
+        print(f"  {label:<24} {elapsed * 1000:8.1f} мс {size:>9,} байт  {status}")
+    critical = max(elapsed for elapsed, _, _ in results.values())
+    print(f"  {'самая долгая загрузка':<24} {critical * 1000:8.1f} мс")
+    return critical, all(status == "ok" for _, _, status in results.values())
+
+def local_resources(base):
+    from name_generator.ui import static_url
+
+    resources = {
+        "оболочка страницы": base + "/",
+        "style.css": f"{base}/{static_url('style.css')}",
+        "logo.png": f"{base}/{static_url('logo.png')}",
+    }
+    return resources
+
+def main():
+    parser = argparse.ArgumentParser(description="Загрузка ресурсов первой отрисовки: до и после")
+    parser.add_argument("--timeout", type=float, default=10, help="таймаут загрузки одного ресурса, с")
+    args = parser.parse_args()
+
+    host, port = "127.0.0.1", free_port()
+    directory = tempfile.TemporaryDirectory()
+    env = dict(os.environ, NAME_GENERATOR_DB=os.path.join(directory.name, "assets.sqlite3"))
+    server = subprocess.Popen([sys.executable, "-m", "streamlit", "run", "app.py", "--server.headless", "true",
+                               "--server.port", str(port), "--server.address", host],
+                              cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_port(host, port, timeout=60)
+        base = f"http://{host}:{port}"
+        print("до (внешние ресурсы):")
+        before, before_ok = measure(EXTERNAL, args.timeout)
+        print("после (static/ этого сервера):")
+        after, _ = measure(local_resources(base), args.timeout)
+    finally:
+        server.terminate()
+        server.wait()
+        directory.cleanup()
+
+    print(f"нижняя граница первой отрисовки: {before * 1000:.0f} мс → {after * 1000:.0f} мс")
+    if not before_ok:
+        print("внешние ресурсы недоступны: раньше страница осталась бы без шрифта и логотипа")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from name_generator.bulk import default_vocabularies
+from name_generator.normalize import canonicalize, normalize_series, normalize_value
+from name_generator.translit import CYRILLIC_TO_LATIN
+
+# ============================================================
+# БЕНЧМАРК НОРМАЛИЗАЦИИ ЗНАЧЕНИЙ
+# ============================================================
+#
+# python benchmarks/bench_normalize.py --rows 2000000
+#
+# Сравнивает посимвольную нормализацию на Python (как если бы её писали
+# циклом) с normalize_value() на таблице str.translate и с пакетной
+# normalize_series(), проверяет совпадение результатов и меряет время
+# одного вызова canonicalize() для формы ➕ на словаре в 500 значений.
+
+DIRTY = ("Яндекс Еда_Курьер", "RTK-Seller", "  Adtech-B2C ", "Вахта & подработка", "segment6-12",
+         "Москва/МО", "Щедрый   бонус!!", "b2c", "KakNeNado", "ОБНОВИ резюме")
+
+def random_values(rows, seed=0):
+    rng = random.Random(seed)
+    pool = list(DIRTY) + [value for options in default_vocabularies().values() for value in options]
+    return [rng.choice(pool) + rng.choice(("", "", " 2", "_Х")) for _ in range(rows)]
+
+def naive(value):
+    chars = []
+    for char in value.lower():
+        if char in CYRILLIC_TO_LATIN:
+            chars.append(CYRILLIC_TO_LATIN[char])
+        elif char.isspace() or char in "_&/\\|.,;:+—–":
+            chars.append("-")
+        elif re.match("[a-z0-9-]", char):
+            chars.append(char)
+    return re.sub("-{2,}", "-", "".join(chars)).strip("-")
+
+def main():
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Скорость нормализации значений, строк/с")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--loop-rows", type=int, default=200_000,
+                        help="сколько строк прогнать через посимвольный цикл")
+    args = parser.parse_args()
+
+    values = random_values(args.rows)
+    sample = values[:args.loop_rows]
+
+    started = time.perf_counter()
+    expected = [naive(value) for value in sample]
+    loop = time.perf_counter() - started
+
+    started = time.perf_counter()
+    translated = [normalize_value(value) for value in values]
+    scalar = time.perf_counter() - started
+
+    series = pd.Series(values, dtype=str)
+    started = time.perf_counter()
+    vectorized = normalize_series(series)
+    batch = time.perf_counter() - started
+
+    mismatches = sum(1 for left, right in zip(translated, expected) if left != right)
+    mismatches += int((vectorized != pd.Series(translated, dtype=str)).sum())
+
+    options = [f"value-{number}" for number in range(500)]
+    calls = 2000
+    started = time.perf_counter()
+    for number in range(calls):
+        canonicalize(f"Value {number % 700}", options)
+    keystroke = (time.perf_counter() - started) / calls
+
+    print(f"посимвольный цикл:   {len(sample) / loop:,.0f} строк/с ({len(sample):,} строк)")
+    print(f"normalize_value():   {len(values) / scalar:,.0f} строк/с ({len(values):,} строк)")
+    print(f"normalize_series():  {len(values) / batch:,.0f} строк/с ({len(values):,} строк)")
+    print(f"canonicalize(), 500 значений: {keystroke * 1e6:,.0f} мкс на вызов")
+    print(f"расхождений:         {mismatches:,}")
+    print(f"пример:              {values[0]!r} → {translated[0]!r}")
+    if mismatches:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from name_generator.bulk import default_vocabularies
+from name_generator.engine import FIELD_VOCABULARY, NAMING_FIELDS, build_name
+from name_generator.parser import NameParser
+
+# ============================================================
+# БЕНЧМАРК РАЗБОРА НЕЙМИНГА
+# ============================================================
+#
+# python benchmarks/bench_parser.py --rows 2000000 --unique 50000
+
+def random_names(count, unknown_share, seed=0):
+    rng = random.Random(seed)
+    vocabularies = default_vocabularies()
+    names = []
+    for _ in range(count):
+        values = []
+        for field in NAMING_FIELDS:
+            options = vocabularies[FIELD_VOCABULARY[field]]
+            if field == "campaign_types":
+                values.append(rng.sample(options, rng.randint(1, 3)))
+            elif rng.random() < unknown_share:
+                values.append(f"unknown{rng.randint(0, 99)}")
+            else:
+                values.append(rng.choice(options))
+        names.append(build_name(*values))
+    return names
+
+def main():
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Скорость разбора нейминга, строк/с")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--unique", type=int, default=20_000)
+    parser.add_argument("--unknown-share", type=float, default=0.05)
+    args = parser.parse_args()
+
+    uniques = random_names(args.unique, args.unknown_share)
+    rng = random.Random(1)
+    column = pd.Series([uniques[rng.randrange(len(uniques))] for _ in range(args.rows)])
+
+    name_parser = NameParser()
+
+    started = time.perf_counter()
+    for name in uniques:
+        name_parser.parse(name)
+    single = time.perf_counter() - started
+
+    started = time.perf_counter()
+    parsed = name_parser.parse_series(column)
+    vectorized = time.perf_counter() - started
+
+    print(f"parse():        {len(uniques) / single:,.0f} имён/с ({len(uniques):,} уникальных)")
+    print(f"parse_series(): {len(column) / vectorized:,.0f} строк/с ({len(column):,} строк)")
+    print(f"невалидных:     {(~parsed['valid']).sum():,}")
+
+if __name__ == "__main__":
+    main()
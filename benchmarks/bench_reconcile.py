@@ -0,0 +1,99 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_parser import random_names
+from name_generator.reconcile import PartialCache, load_partial, reconcile, summarize
+
+# ============================================================
+# БЕНЧМАРК СВЕРКИ РАСХОДОВ
+# ============================================================
+#
+# python benchmarks/bench_reconcile.py --rows 2000000 --campaigns 5000
+#
+# Генерирует выгрузку расходов и выгрузку сессий (одна строка — сессия)
+# и сравнивает:
+# - «как в ноутбуке»: read_csv целиком, merge строк по utm_campaign;
+# - reconcile без кэша: чтение чанками, суммы по кампаниям в category;
+# - reconcile с кэшем: оба файла уже обработаны, читается только хэш.
+# Пик памяти — по tracemalloc (аллокации numpy и pandas учитываются).
+
+def write_files(directory, rows, campaigns, seed=0):
+    rng = random.Random(seed)
+    names = random_names(campaigns, 0.05, seed)
+    costs = os.path.join(directory, "costs.csv")
+    sessions = os.path.join(directory, "sessions.csv")
+    with open(costs, "w", encoding="utf-8") as handle:
+        handle.write("Кампания;Клики;Расход (руб.)\n")
+        for _ in range(rows // 4):
+            handle.write(f"{rng.choice(names)};{rng.randint(0, 50)};{rng.randint(0, 9999)},{rng.randint(0, 99):02d}\n")
+    with open(sessions, "w", encoding="utf-8") as handle:
+        handle.write("session_id,utm_campaign,utm_source\n")
+        for number in range(rows):
+            handle.write(f"{number},{rng.choice(names)},yandex\n")
+    return costs, sessions
+
+def measure(action):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = action()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def notebook(costs, sessions):
+    import pandas as pd
+
+    cost_frame = pd.read_csv(costs, sep=";", dtype=str)
+    cost_frame["cost"] = pd.to_numeric(cost_frame["Расход (руб.)"].str.replace(",", "."))
+    session_frame = pd.read_csv(sessions, dtype=str)
+    cost_by_campaign = cost_frame.groupby("Кампания")["cost"].sum()
+    sessions_by_campaign = session_frame.groupby("utm_campaign").size().rename("sessions")
+    return pd.concat([cost_by_campaign, sessions_by_campaign], axis=1)
+
+def pipeline(costs, sessions, cache):
+    cost_partial, _ = load_partial(costs, costs, "costs", cache)
+    session_partial, _ = load_partial(sessions, sessions, "sessions", cache)
+    campaigns = reconcile([cost_partial], [session_partial])
+    return campaigns, summarize(campaigns, ["product", "stream"])
+
+def main():
+    parser = argparse.ArgumentParser(description="Сверка расходов: время и пик памяти")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="строк в выгрузке сессий")
+    parser.add_argument("--campaigns", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        costs, sessions = write_files(directory, args.rows, args.campaigns)
+        cache = PartialCache(os.path.join(directory, "cache.sqlite3"))
+        size = (os.path.getsize(costs) + os.path.getsize(sessions)) / 2**20
+        print(f"файлы: {size:,.1f} МБ, строк: {args.rows // 4:,} расходов + {args.rows:,} сессий")
+
+        merged, naive, naive_peak = measure(lambda: notebook(costs, sessions))
+        (campaigns, _), cold, cold_peak = measure(lambda: pipeline(costs, sessions, cache))
+        _, warm, warm_peak = measure(lambda: pipeline(costs, sessions, cache))
+
+        print(f"read_csv целиком:     {naive:6.2f} с, пик {naive_peak / 2**20:8.1f} МБ")
+        print(f"reconcile без кэша:   {cold:6.2f} с, пик {cold_peak / 2**20:8.1f} МБ")
+        print(f"reconcile из кэша:    {warm:6.2f} с, пик {warm_peak / 2**20:8.1f} МБ")
+
+        object_bytes = campaigns.astype({column: object for column in campaigns.select_dtypes("category")})
+        print(f"кампаний: {len(campaigns):,}; таблица в category "
+              f"{campaigns.memory_usage(deep=True).sum() / 2**20:.1f} МБ, "
+              f"в object {object_bytes.memory_usage(deep=True).sum() / 2**20:.1f} МБ")
+
+        mismatch = abs(campaigns["cost"].sum() - merged["cost"].sum()) > 0.01
+        mismatch |= campaigns["sessions"].sum() != merged["sessions"].sum()
+        print(f"суммы совпадают:      {'нет' if mismatch else 'да'}")
+        if mismatch:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
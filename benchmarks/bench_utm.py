@@ -0,0 +1,83 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from name_generator.bulk import default_vocabularies
+from name_generator.engine import (DEFAULT_UTM_PARAMS, FIELD_VOCABULARY, NAMING_FIELDS, UTM_KEYS,
+                                   build_name, build_utm_url, build_utm_urls)
+
+# ============================================================
+# БЕНЧМАРК СБОРКИ UTM-ССЫЛОК
+# ============================================================
+#
+# python benchmarks/bench_utm.py --rows 1000000
+#
+# Сравнивает цикл build_utm_url() по строкам с пакетной build_utm_urls()
+# и проверяет, что результаты совпадают.
+
+BASE_LINKS = (
+    "https://expert.hh.ru/webinar/kobrending",
+    "https://hh.ru/vacancy/116482958?from=banner",
+    "https://hh.ru/article/remote#top",
+    "https://hh.ru/?utm_source=old&hhtmFrom=main",
+)
+
+def random_frame(rows, seed=0):
+    import pandas as pd
+
+    rng = random.Random(seed)
+    vocabularies = default_vocabularies()
+    data = {}
+    for field in NAMING_FIELDS:
+        options = vocabularies[FIELD_VOCABULARY[field]]
+        if field == "campaign_types":
+            data[field] = ["&".join(rng.sample(options, rng.randint(1, 2))) for _ in range(rows)]
+        else:
+            data[field] = [rng.choice(options) for _ in range(rows)]
+    data["base_link"] = [rng.choice(BASE_LINKS) for _ in range(rows)]
+    for key in UTM_KEYS:
+        options = DEFAULT_UTM_PARAMS.get(key, [""])
+        data[key] = [rng.choice(options) for _ in range(rows)]
+    return pd.DataFrame(data)
+
+def single_urls(frame):
+    urls = []
+    for row in frame.itertuples(index=False):
+        name = build_name(row.product, row.stream, row.expense, row.source,
+                          row.campaign_types.split("&"), row.client_geo, row.targeting, row.goal)
+        urls.append(build_utm_url(row.base_link, row.utm_source, row.utm_medium, row.utm_campaign or name,
+                                  row.utm_content, row.utm_term, row.utm_vacancy))
+    return urls
+
+def main():
+    parser = argparse.ArgumentParser(description="Скорость сборки UTM-ссылок, строк/мин")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--single-rows", type=int, default=200_000,
+                        help="сколько строк прогнать через цикл build_utm_url()")
+    args = parser.parse_args()
+
+    frame = random_frame(args.rows)
+    sample = frame.head(args.single_rows)
+
+    started = time.perf_counter()
+    expected = single_urls(sample)
+    single = time.perf_counter() - started
+
+    started = time.perf_counter()
+    urls = build_utm_urls(frame)
+    vectorized = time.perf_counter() - started
+
+    mismatches = sum(1 for left, right in zip(urls.head(len(expected)), expected) if left != right)
+    print(f"build_utm_url() в цикле: {len(sample) / single * 60:,.0f} строк/мин ({len(sample):,} строк)")
+    print(f"build_utm_urls():        {len(frame) / vectorized * 60:,.0f} строк/мин ({len(frame):,} строк)")
+    print(f"расхождений:             {mismatches:,}")
+    print(f"пример:                  {urls.iloc[0]}")
+    if mismatches:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import itertools
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from name_generator.engine import UTM_KEYS, build_utm_url, build_utm_urls
+from name_generator.exports import LAYOUTS, join_utm_url, split_utm_url
+
+# ============================================================
+# ПРОВЕРКА ВЫГРУЗКИ ДЛЯ VK РЕКЛАМЫ
+# ============================================================
+#
+# python benchmarks/check_exports.py
+#
+# Кабинет дописывает колонку «UTM-метки» к «Ссылке». Для набора базовых
+# ссылок (свои параметры, fragment, старые UTM-метки, кириллица) проверяет,
+# что склейка колонок даёт ровно utm_url, а в метках — только utm_*.
+# Код выхода 1 при расхождении.
+
+BASE_LINKS = (
+    "https://hh.ru/vacancy",
+    "https://hh.ru/vacancy?a=1",
+    "https://hh.ru/vacancy?a=1&b=x%20y#form",
+    "https://hh.ru/vacancy#form",
+    "https://hh.ru/vacancy?utm_source=old&a=1",
+    "https://hh.ru/vacancy?utm_id=42",
+    "https://hh.ru/search?text=Водитель&area=1",
+    "",
+)
+
+UTM_VALUES = (
+    {"utm_source": "yandex", "utm_medium": "cpc", "utm_campaign": "adtech_vr"},
+    {"utm_campaign": "курьер доставка", "utm_term": "{keyword}"},
+    {"utm_source": "vk", "utm_content": "a&b=c"},
+    {},
+)
+
+def check(url, layout):
+    row = {"utm_url": url, "name": "x"}
+    values = dict(zip(layout.header, layout.values(row)))
+    link, tags = values["Ссылка"], values["UTM-метки"]
+    problems = []
+    if join_utm_url(link, tags) != url:
+        problems.append(f"склейка {join_utm_url(link, tags)!r}")
+    if any(pair.partition("=")[0] not in UTM_KEYS for pair in tags.split("&") if pair):
+        problems.append(f"в метках не только utm_*: {tags!r}")
+    if split_utm_url(link)[1]:
+        problems.append(f"метки остались в ссылке: {link!r}")
+    return problems
+
+def main():
+    import pandas as pd
+
+    layout = LAYOUTS["vk_ads"]
+    urls = [build_utm_url(base, **values) for base, values in itertools.product(BASE_LINKS, UTM_VALUES)]
+    frame = pd.DataFrame([{"base_link": base, **values}
+                          for base, values in itertools.product(BASE_LINKS, UTM_VALUES)])
+    urls += build_utm_urls(frame, names=pd.Series("name", index=frame.index)).tolist()
+
+    failed = 0
+    for url in urls:
+        problems = check(url, layout)
+        if problems:
+            failed += 1
+            print(f"FAIL {url!r}: {'; '.join(problems)}")
+    print(f"ссылок: {len(urls)}, с ошибками: {failed}")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
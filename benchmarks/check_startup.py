@@ -0,0 +1,67 @@
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ============================================================
+# ПРОВЕРКА ВРЕМЕНИ ИМПОРТА (python -X importtime)
+# ============================================================
+#
+# python benchmarks/check_startup.py
+# python benchmarks/check_startup.py --budget name_generator.ui=800
+#
+# Для каждого модуля: бюджет на холодный импорт в мс и модули, которые
+# он не должен тянуть за собой. Код выхода 1, если бюджет превышен.
+
+BUDGETS = {
+    # Движок: используется CLI и API, должен стартовать без Streamlit и pandas
+    "name_generator": (60, ("streamlit", "pandas")),
+    "name_generator.engine": (60, ("streamlit", "pandas")),
+    # CLI запускается из shell-циклов: импорт всей цепочки build
+    "name_generator.cli": (80, ("streamlit", "pandas")),
+    # Всё, что импортирует app.py до первого вывода на экран
+    "name_generator.ui": (1200, ("pandas",)),
+}
+
+def measure(module):
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    imported = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            imported[name.strip()] = int(cumulative.strip())
+    return imported[module] / 1000, set(imported)
+
+def main():
+    parser = argparse.ArgumentParser(description="Проверка бюджета времени импорта")
+    parser.add_argument("--repeat", type=int, default=3, help="берётся лучший из N запусков")
+    parser.add_argument("--budget", action="append", default=[], metavar="MODULE=MS")
+    args = parser.parse_args()
+
+    budgets = dict(BUDGETS)
+    for override in args.budget:
+        module, ms = override.split("=")
+        budgets[module] = (float(ms), budgets.get(module, (0, ()))[1])
+
+    failed = False
+    for module, (budget_ms, forbidden) in budgets.items():
+        runs = [measure(module) for _ in range(args.repeat)]
+        best_ms = min(ms for ms, _ in runs)
+        leaked = sorted(name for name in forbidden if name in runs[0][1])
+        ok = best_ms <= budget_ms and not leaked
+        failed |= not ok
+        status = "OK  " if ok else "FAIL"
+        print(f"{status} {module:<28} {best_ms:8.1f} мс (бюджет {budget_ms:.0f} мс)"
+              + (f"; лишние импорты: {', '.join(leaked)}" if leaked else ""))
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+# ============================================================
+# ПЕРЦЕНТИЛИ ЗАДЕРЖЕК
+# ============================================================
+#
+# Общая функция для нагрузочных тестов: значение без интерполяции,
+# как в отчётах (p95 — замер, медленнее которого 5% запросов).
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * share), len(ordered) - 1)]
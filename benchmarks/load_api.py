@@ -0,0 +1,150 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from latency import percentile
+
+# ============================================================
+# НАГРУЗОЧНЫЙ ТЕСТ HTTP API
+# ============================================================
+#
+# python benchmarks/load_api.py --connections 64 --duration 10
+# python benchmarks/load_api.py --url http://127.0.0.1:8600 --endpoint batch
+#
+# Без --url поднимает сервер отдельным процессом (одно ядро: asyncio в
+# одном потоке) на временной базе. Клиенты работают в --client-processes
+# процессах, каждый держит свою долю keep-alive соединений и шлёт запросы
+# последовательно. Итог — запросов/с, записей/с и задержки p50/p99.
+
+RECORD = {
+    "product": "adtech-b2c", "stream": "vr", "expense": "cpa", "source": "yandex",
+    "campaign_types": ["mk", "feed"], "client_geo": "supergeo", "targeting": "channel",
+    "goal": "reg", "base_link": "https://expert.hh.ru/webinar/kobrending",
+    "utm_source": "yandex", "utm_medium": "cpc", "utm_content": "{ad_id}", "utm_term": "msk",
+}
+
+def request_bytes(host, endpoint, batch_size):
+    if endpoint == "name":
+        path, body = "/v1/name", json.dumps(RECORD)
+    else:
+        path, body = "/v1/batch", json.dumps([RECORD] * batch_size)
+    body = body.encode("utf-8")
+    head = (f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n")
+    return head.encode("latin-1") + body
+
+async def connection_loop(host, port, payload, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            writer.write(payload)
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line[:15].lower() == b"content-length:":
+                    length = int(line[15:])
+            await reader.readexactly(length)
+            if not head.startswith(b"HTTP/1.1 200"):
+                errors.append(head.split(b"\r\n", 1)[0].decode("latin-1"))
+            latencies.append(time.perf_counter() - started)
+    finally:
+        writer.close()
+
+def client_process(host, port, connections, duration, endpoint, batch_size, queue):
+    async def run():
+        payload = request_bytes(host, endpoint, batch_size)
+        latencies = []
+        errors = []
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(connection_loop(host, port, payload, deadline, latencies, errors)
+                               for _ in range(connections)))
+        return latencies, errors
+
+    queue.put(asyncio.run(run()))
+
+def wait_for_port(host, port, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"сервер не поднялся на {host}:{port}")
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный тест HTTP API")
+    parser.add_argument("--url", help="адрес уже запущенного сервера, например http://127.0.0.1:8600")
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--client-processes", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--endpoint", choices=("name", "batch"), default="name")
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    server = None
+    directory = tempfile.TemporaryDirectory()
+    if args.url:
+        host, _, port = args.url.split("://", 1)[-1].rstrip("/").partition(":")
+        port = int(port or 80)
+    else:
+        host, port = "127.0.0.1", free_port()
+        env = dict(os.environ, NAME_GENERATOR_DB=os.path.join(directory.name, "load.sqlite3"))
+        server = subprocess.Popen([sys.executable, "-m", "name_generator.server", "--host", host,
+                                   "--port", str(port)], cwd=ROOT, env=env, stdout=subprocess.DEVNULL)
+    try:
+        wait_for_port(host, port)
+        queue = multiprocessing.Queue()
+        per_process = max(1, args.connections // args.client_processes)
+        processes = [
+            multiprocessing.Process(target=client_process, args=(host, port, per_process, args.duration,
+                                                                 args.endpoint, args.batch_size, queue))
+            for _ in range(args.client_processes)
+        ]
+        for process in processes:
+            process.start()
+        latencies = []
+        errors = []
+        for _ in processes:
+            process_latencies, process_errors = queue.get()
+            latencies += process_latencies
+            errors += process_errors
+        for process in processes:
+            process.join()
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        directory.cleanup()
+
+    latencies.sort()
+    records = len(latencies) * (args.batch_size if args.endpoint == "batch" else 1)
+    print(f"эндпоинт: /v1/{args.endpoint}, соединений: {per_process * args.client_processes}, "
+          f"длительность: {args.duration:.0f} с")
+    print(f"запросов/с: {len(latencies) / args.duration:,.0f}")
+    print(f"записей/с:  {records / args.duration:,.0f}")
+    print(f"задержка, мс: p50 {statistics.median(latencies) * 1000:.2f}, "
+          f"p99 {percentile(latencies, 0.99) * 1000:.2f}")
+    print(f"ошибок: {len(errors)}")
+    if errors:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from latency import percentile
+from load_api import free_port, wait_for_port
+from name_generator.shortlinks import ShortLinkStore
+
+# ============================================================
+# НАГРУЗОЧНЫЙ ТЕСТ РЕДИРЕКТА КОРОТКИХ ССЫЛОК
+# ============================================================
+#
+# python benchmarks/load_redirect.py --links 1000000 --connections 64 --duration 10
+#
+# Заполняет временную базу --links ссылками, меряет поиск кода в
+# ShortLinkStore напрямую (холодный кэш: каждый код — запрос к SQLite),
+# затем поднимает name_generator.redirect отдельным процессом и гоняет
+# его keep-alive клиентами по случайным кодам. Итог — запросов/с и
+# задержки p50/p99.
+
+def fill(store, count, batch=50_000):
+    codes = []
+    for start in range(0, count, batch):
+        urls = [f"https://hh.ru/vacancy/{number}?utm_source=yandex&utm_medium=cpc"
+                f"&utm_campaign=adtech-b2c_vr_cpa_yandex_mk_supergeo_channel_reg_{number}"
+                for number in range(start, min(start + batch, count))]
+        codes += store.shorten_many(urls)
+    return codes
+
+async def connection_loop(host, port, codes, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            code = random.choice(codes)
+            started = time.perf_counter()
+            writer.write(f"GET /{code} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("latin-1"))
+            head = await reader.readuntil(b"\r\n\r\n")
+            if not head.startswith(b"HTTP/1.1 302"):
+                errors.append(head.split(b"\r\n", 1)[0].decode("latin-1"))
+            latencies.append(time.perf_counter() - started)
+    finally:
+        writer.close()
+
+def client_process(host, port, connections, duration, codes, queue):
+    async def run():
+        latencies = []
+        errors = []
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(connection_loop(host, port, codes, deadline, latencies, errors)
+                               for _ in range(connections)))
+        return latencies, errors
+
+    queue.put(asyncio.run(run()))
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный тест редиректа коротких ссылок")
+    parser.add_argument("--links", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=100_000, help="прямых поисков в хранилище")
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--client-processes", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=10)
+    args = parser.parse_args()
+
+    directory = tempfile.TemporaryDirectory()
+    path = os.path.join(directory.name, "redirect.sqlite3")
+    try:
+        started = time.perf_counter()
+        codes = fill(ShortLinkStore(path), args.links)
+        elapsed = time.perf_counter() - started
+        print(f"ссылок: {args.links:,}, заполнение: {elapsed:.1f} с ({args.links / elapsed:,.0f} ссылок/с)")
+
+        # Новый экземпляр — кэш пуст, каждый поиск идёт в SQLite
+        store = ShortLinkStore(path)
+        sample = random.choices(codes, k=args.lookups)
+        latencies = []
+        for code in sample:
+            started = time.perf_counter()
+            store.resolve(code)
+            latencies.append(time.perf_counter() - started)
+        p50, p99 = statistics.median(latencies), percentile(latencies, 0.99)
+        print(f"поиск в хранилище, мкс: p50 {p50 * 1e6:.1f}, p99 {p99 * 1e6:.1f}")
+
+        host, port = "127.0.0.1", free_port()
+        env = dict(os.environ, NAME_GENERATOR_DB=path)
+        server = subprocess.Popen([sys.executable, "-m", "name_generator.redirect", "--host", host,
+                                   "--port", str(port)], cwd=ROOT, env=env, stdout=subprocess.DEVNULL)
+        try:
+            wait_for_port(host, port)
+            queue = multiprocessing.Queue()
+            per_process = max(1, args.connections // args.client_processes)
+            # Клиентам хватает выборки кодов: передавать миллион строк в каждый процесс незачем
+            client_codes = random.sample(codes, min(len(codes), 100_000))
+            processes = [
+                multiprocessing.Process(target=client_process,
+                                        args=(host, port, per_process, args.duration, client_codes, queue))
+                for _ in range(args.client_processes)
+            ]
+            for process in processes:
+                process.start()
+            latencies = []
+            errors = []
+            for _ in processes:
+                process_latencies, process_errors = queue.get()
+                latencies += process_latencies
+                errors += process_errors
+            for process in processes:
+                process.join()
+        finally:
+            server.terminate()
+            server.wait()
+    finally:
+        directory.cleanup()
+
+    p50, p99 = statistics.median(latencies), percentile(latencies, 0.99)
+    print(f"редирект: соединений {per_process * args.client_processes}, длительность {args.duration:.0f} с")
+    print(f"запросов/с: {len(latencies) / args.duration:,.0f}")
+    print(f"задержка, мс: p50 {p50 * 1000:.2f}, p99 {p99 * 1000:.2f}")
+    print(f"ошибок: {len(errors)}")
+    if errors:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
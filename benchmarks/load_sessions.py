@@ -0,0 +1,402 @@
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_app import NAMING_STEPS, git_revision
+from latency import percentile
+from load_api import free_port, wait_for_port
+
+# ============================================================
+# НАГРУЗОЧНЫЙ ТЕСТ: ОДНОВРЕМЕННЫЕ СЕССИИ РЕДАКТОРОВ
+# ============================================================
+#
+# python benchmarks/load_sessions.py --sessions 1 5 10 20 --duration 20
+# python benchmarks/load_sessions.py --sessions 10 --max-p95 300 --max-p99 800
+# python benchmarks/load_sessions.py --url http://127.0.0.1:8501 --sessions 5
+#
+# Без --url поднимает streamlit run app.py на временной базе. Каждая
+# сессия — отдельное websocket-соединение /_stcore/stream с тем же
+# протоколом, что у браузера: BackMsg.rerun_script с состоянием виджетов,
+# в ответ ForwardMsg-дельты до script_finished. Задержка перезапуска —
+# от отправки клика до script_finished.
+#
+# Сценарий сессии повторяется до конца уровня: открытие страницы,
+# 8 полей нейминга и utm_source/utm_medium (кнопки), ссылка, три
+# выпадающих списка UTM, сброс. Значения выбираются случайно из
+# отрисованных кнопок, между кликами — пауза --think (±50%).
+#
+# Для каждого N из --sessions: перезапусков/с, p50/p95/p99, ошибки,
+# CPU сервера (доля одного ядра) и пик RSS. С --max-p95/--max-p99
+# выход с кодом 1, если порог превышен на любом уровне или были
+# ошибки — так отчёт служит проверкой перед релизом.
+
+BASE_LINK = "https://expert.hh.ru/webinar/kobrending"
+UTM_SELECTS = ("utm_content", "utm_term", "utm_vacancy")
+
+FINISHED_OK = (0, 3)  # FINISHED_SUCCESSFULLY, FINISHED_FRAGMENT_RUN_SUCCESSFULLY
+FINISHED_EARLY_FOR_RERUN = 2
+
+def user_key(widget_id):
+    # "$$ID-<хэш>-<key>": у виджетов без key в конце "None"
+    return widget_id.split("-", 2)[2] if widget_id.count("-") >= 2 else ""
+
+class Session:
+    __slots__ = ("ws", "query_string", "page_script_hash", "widgets", "buttons", "values")
+
+    def __init__(self, ws, query_string=""):
+        self.ws = ws
+        self.query_string = query_string
+        self.page_script_hash = ""
+        # key → (id, тип, элемент) последнего прогона
+        self.widgets = {}
+        # [(label, id)] кнопок без key
+        self.buttons = []
+        # key → (тип значения, значение), отправляются с каждым прогоном
+        self.values = {}
+
+    def _state(self, trigger_id=None):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+
+        message = BackMsg()
+        client = message.rerun_script
+        client.query_string = self.query_string
+        client.page_script_hash = self.page_script_hash
+        for key, (kind, value) in self.values.items():
+            if key in self.widgets:
+                state = client.widget_states.widgets.add()
+                state.id = self.widgets[key][0]
+                setattr(state, kind, value)
+        if trigger_id:
+            state = client.widget_states.widgets.add()
+            state.id = trigger_id
+            state.trigger_value = True
+        return message.SerializeToString()
+
+    async def rerun(self, trigger_id=None):
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        started = time.perf_counter()
+        await self.ws.send(self._state(trigger_id))
+        widgets = {}
+        buttons = []
+        error = None
+        while True:
+            message = ForwardMsg()
+            message.ParseFromString(await self.ws.recv())
+            kind = message.WhichOneof("type")
+            if kind == "new_session":
+                self.page_script_hash = message.new_session.page_script_hash
+            elif kind == "delta" and message.delta.WhichOneof("type") == "new_element":
+                element = message.delta.new_element
+                element_type = element.WhichOneof("type")
+                if element_type == "exception":
+                    error = error or f"{element.exception.type}: {element.exception.message}"
+                elif element_type in ("button", "text_input", "selectbox"):
+                    widget = getattr(element, element_type)
+                    key = user_key(widget.id)
+                    if key and key != "None":
+                        widgets[key] = (widget.id, element_type, widget)
+                    elif element_type == "button":
+                        buttons.append((widget.label, widget.id))
+            elif kind == "script_finished":
+                status = message.script_finished
+                if status == FINISHED_EARLY_FOR_RERUN:
+                    # st.rerun() в скрипте: клик закончится следующим прогоном
+                    widgets, buttons = {}, []
+                    continue
+                if status not in FINISHED_OK:
+                    error = error or f"script_finished={status}"
+                break
+        self.widgets = widgets
+        self.buttons = buttons
+        return time.perf_counter() - started, error
+
+    def button(self, label_prefix):
+        return next((widget_id for label, widget_id in self.buttons if label.startswith(label_prefix)), None)
+
+def build_steps(vocabularies, rng):
+    # Шаг: (название, функция сессии → id кнопки-триггера или None).
+    # None без ошибки — шаг меняет значение виджета, а не нажимает кнопку
+    def click_value(field, pattern):
+        def action(session):
+            keys = [pattern.format(value) for value in vocabularies[field]]
+            keys = [key for key in keys if key in session.widgets and not session.widgets[key][2].disabled]
+            if not keys:
+                raise LookupError(f"нет доступных кнопок {pattern.format('*')}")
+            return session.widgets[rng.choice(keys)][0]
+        return action
+
+    def set_base_link(session):
+        session.values["base_link"] = ("string_value", BASE_LINK)
+
+    def select(key):
+        def action(session):
+            widget_key = f"{key}_select_dropdown"
+            if widget_key not in session.widgets:
+                raise LookupError(f"нет списка {widget_key}")
+            options = [option for option in session.widgets[widget_key][2].options if option in vocabularies[key]]
+            if not options:
+                raise LookupError(f"в {widget_key} нет значений словаря")
+            session.values[widget_key] = ("string_value", rng.choice(options))
+        return action
+
+    def reset(session):
+        widget_id = session.button("🔄")
+        if widget_id is None:
+            raise LookupError("нет кнопки сброса")
+        session.values.clear()
+        return widget_id
+
+    steps = [(f"click_{step}", click_value(field, pattern)) for step, field, pattern in NAMING_STEPS]
+    steps.append(("set_base_link", set_base_link))
+    steps += [(f"select_{key}", select(key)) for key in UTM_SELECTS]
+    steps.append(("reset", reset))
+    return steps
+
+async def session_loop(url, deadline, think, seed, latencies, errors):
+    import websockets
+
+    from name_generator.vocabulary import DEFAULT_VOCABULARIES
+
+    rng = random.Random(seed)
+    steps = build_steps(DEFAULT_VOCABULARIES, rng)
+
+    async def pause():
+        if think:
+            await asyncio.sleep(think * rng.uniform(0.5, 1.5))
+
+    # Сессии стартуют вразнобой, как открывают вкладки люди
+    await asyncio.sleep(rng.uniform(0, think))
+    while time.perf_counter() < deadline:
+        try:
+            async with websockets.connect(url, subprotocols=["streamlit"], max_size=None) as ws:
+                session = Session(ws)
+                elapsed, error = await session.rerun()
+                latencies.append(("load", elapsed))
+                if error:
+                    errors.append(f"load: {error}")
+                for name, action in steps:
+                    if time.perf_counter() >= deadline:
+                        break
+                    await pause()
+                    try:
+                        trigger_id = action(session)
+                    except LookupError as exc:
+                        errors.append(f"{name}: {exc}")
+                        continue
+                    elapsed, error = await session.rerun(trigger_id)
+                    latencies.append((name, elapsed))
+                    if error:
+                        errors.append(f"{name}: {error}")
+        except (OSError, websockets.WebSocketException) as exc:
+            errors.append(f"соединение: {exc!r}")
+            await asyncio.sleep(0.5)
+
+def client_process(url, sessions, duration, think, seed, queue):
+    async def run():
+        latencies = []
+        errors = []
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(session_loop(url, deadline, think, seed + number, latencies, errors)
+                               for number in range(sessions)))
+        return latencies, errors
+
+    queue.put(asyncio.run(run()))
+
+# ============================================================
+# РЕСУРСЫ СЕРВЕРА (/proc, без psutil)
+# ============================================================
+
+def cpu_seconds(pid):
+    with open(f"/proc/{pid}/stat") as handle:
+        fields = handle.read().rpartition(")")[2].split()
+    # utime и stime — 14-е и 15-е поля, после имени процесса — 12-е и 13-е
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+def rss_bytes(pid):
+    with open(f"/proc/{pid}/status") as handle:
+        for line in handle:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+class ResourceSampler(threading.Thread):
+    def __init__(self, pid, interval=0.2):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.peak_rss = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.peak_rss = max(self.peak_rss, rss_bytes(self.pid))
+            except OSError:
+                return
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+# ============================================================
+# УРОВНИ НАГРУЗКИ
+# ============================================================
+
+def run_level(url, sessions, args, pid):
+    queue = multiprocessing.Queue()
+    processes_count = min(args.client_processes, sessions)
+    shares = [sessions // processes_count + (number < sessions % processes_count)
+              for number in range(processes_count)]
+    processes = [
+        multiprocessing.Process(target=client_process,
+                                args=(url, share, args.duration, args.think, args.seed + number * 1000, queue))
+        for number, share in enumerate(shares)
+    ]
+    sampler = ResourceSampler(pid) if pid else None
+    cpu_before = cpu_seconds(pid) if pid else 0
+    started = time.perf_counter()
+    if sampler:
+        sampler.start()
+    for process in processes:
+        process.start()
+    latencies = []
+    errors = []
+    for _ in processes:
+        process_latencies, process_errors = queue.get()
+        latencies += process_latencies
+        errors += process_errors
+    for process in processes:
+        process.join()
+    wall = time.perf_counter() - started
+    if sampler:
+        sampler.stop()
+
+    values = sorted(elapsed for _, elapsed in latencies)
+    result = {
+        "sessions": sessions,
+        "reruns": len(values),
+        "reruns_per_s": round(len(values) / wall, 1),
+        "ms_p50": round(percentile(values, 0.5) * 1000, 1) if values else None,
+        "ms_p95": round(percentile(values, 0.95) * 1000, 1) if values else None,
+        "ms_p99": round(percentile(values, 0.99) * 1000, 1) if values else None,
+        "ms_max": round(values[-1] * 1000, 1) if values else None,
+        "errors": len(errors),
+        "error_samples": sorted(set(errors))[:5],
+    }
+    if pid:
+        result["server_cpu_percent"] = round((cpu_seconds(pid) - cpu_before) / wall * 100, 1)
+        result["server_rss_mb"] = round(sampler.peak_rss / 2**20, 1)
+    return result
+
+def gate(results, args):
+    failures = []
+    for result in results:
+        label = f"N={result['sessions']}"
+        if result["errors"] > args.max_errors:
+            failures.append(f"{label}: ошибок {result['errors']} (допустимо {args.max_errors})")
+        if not result["reruns"]:
+            failures.append(f"{label}: ни одного перезапуска")
+            continue
+        for name, limit in (("ms_p95", args.max_p95), ("ms_p99", args.max_p99)):
+            if limit is not None and result[name] > limit:
+                failures.append(f"{label}: {name[3:]} {result[name]:.0f} мс > {limit:.0f} мс")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный тест одновременных сессий app.py")
+    parser.add_argument("--url", help="адрес уже запущенного приложения, например http://127.0.0.1:8501")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10, 20],
+                        help="число одновременных сессий на каждом уровне")
+    parser.add_argument("--duration", type=float, default=20, help="длительность уровня, с")
+    parser.add_argument("--think", type=float, default=0.5, help="средняя пауза между кликами, с")
+    parser.add_argument("--client-processes", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-p95", type=float, metavar="MS", help="порог p95 задержки перезапуска")
+    parser.add_argument("--max-p99", type=float, metavar="MS", help="порог p99 задержки перезапуска")
+    parser.add_argument("--max-errors", type=int, default=0)
+    parser.add_argument("--output", default="load_sessions.json")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    import streamlit
+
+    server = None
+    directory = tempfile.TemporaryDirectory()
+    if args.url:
+        base = args.url.rstrip("/")
+        host, _, port = base.split("://", 1)[-1].partition(":")
+        port = int(port.partition("/")[0] or 80)
+    else:
+        host, port = "127.0.0.1", free_port()
+        base = f"http://{host}:{port}"
+        env = dict(os.environ, NAME_GENERATOR_DB=os.path.join(directory.name, "sessions.sqlite3"))
+        server = subprocess.Popen([sys.executable, "-m", "streamlit", "run", "app.py", "--server.headless", "true",
+                                   "--server.port", str(port), "--server.address", host,
+                                   "--browser.gatherUsageStats", "false"],
+                                  cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = "ws" + base[4:] + "/_stcore/stream"
+
+    results = []
+    try:
+        wait_for_port(host, port, timeout=60)
+        print(f"{'сессий':>6} {'перезап/с':>10} {'p50':>8} {'p95':>8} {'p99':>8} {'ошибок':>7}"
+              + (f" {'CPU %':>7} {'RSS МБ':>7}" if server else ""))
+        for sessions in args.sessions:
+            result = run_level(url, sessions, args, server.pid if server else None)
+            results.append(result)
+            line = (f"{sessions:>6} {result['reruns_per_s']:>10.1f} {result['ms_p50'] or 0:>8.1f} "
+                    f"{result['ms_p95'] or 0:>8.1f} {result['ms_p99'] or 0:>8.1f} {result['errors']:>7}")
+            if server:
+                line += f" {result['server_cpu_percent']:>7.1f} {result['server_rss_mb']:>7.1f}"
+            print(line)
+            for sample in result["error_samples"]:
+                print(f"         {sample}")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        directory.cleanup()
+
+    failures = gate(results, args)
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "streamlit": streamlit.__version__,
+            "cpu_count": os.cpu_count(),
+            "duration_s": args.duration,
+            "think_s": args.think,
+            "thresholds": {"ms_p95": args.max_p95, "ms_p99": args.max_p99, "errors": args.max_errors},
+        },
+        "results": {str(result["sessions"]): result for result in results},
+        "passed": not failures,
+        "failures": failures,
+    }
+    with open(args.output, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, ensure_ascii=False, indent=2)
+    print(f"\nРезультаты: {args.output}")
+    if failures:
+        print("Порог не пройден:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from latency import percentile
+from name_generator.vocabulary import DEFAULT_VOCABULARIES, VocabularyStore
+
+# ============================================================
+# НАГРУЗОЧНЫЙ ТЕСТ СЛОВАРЕЙ
+# ============================================================
+#
+# python benchmarks/stress_vocabulary.py --sessions 300 --stores 2
+#
+# Каждая «сессия» — поток, который в цикле читает снимок (как прогон
+# скрипта) и время от времени добавляет своё уникальное значение.
+# --stores N открывает N экземпляров VocabularyStore на одну базу,
+# как N процессов сервера. В конце проверяется, что ни одно добавление
+# не потерялось, а задержка чтения сравнивается по четвертям теста.
+
+FIELDS = list(DEFAULT_VOCABULARIES)
+
+def session(store, number, reads, add_every, latencies, added, barrier):
+    rng = random.Random(number)
+    barrier.wait()
+    for i in range(reads):
+        started = time.perf_counter()
+        snapshot = store.snapshot()
+        snapshot.options(FIELDS[i % len(FIELDS)])
+        latencies.append((started, time.perf_counter() - started))
+        if add_every and i % add_every == 0:
+            field = rng.choice(FIELDS)
+            value = f"s{number}-{i}"
+            if store.add(field, value):
+                added.append((field, value))
+
+def main():
+    parser = argparse.ArgumentParser(description="Параллельные чтения и добавления в словари")
+    parser.add_argument("--sessions", type=int, default=300)
+    parser.add_argument("--stores", type=int, default=2)
+    parser.add_argument("--reads", type=int, default=200, help="чтений на сессию")
+    parser.add_argument("--add-every", type=int, default=50, help="добавление раз в N чтений")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "stress.sqlite3")
+        stores = [VocabularyStore(path) for _ in range(args.stores)]
+        start_version = stores[0].snapshot().version
+
+        latencies = []
+        added = []
+        barrier = threading.Barrier(args.sessions)
+        threads = [
+            threading.Thread(target=session, args=(stores[number % len(stores)], number, args.reads,
+                                                   args.add_every, latencies, added, barrier))
+            for number in range(args.sessions)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        # Снимки других «процессов» догоняют базу после REFRESH_INTERVAL
+        time.sleep(1.1)
+        lost = []
+        for number, store in enumerate(stores):
+            snapshot = store.snapshot()
+            lost += [(number, field, value) for field, value in added if not snapshot.contains(field, value)]
+        fresh = VocabularyStore(path).snapshot()
+        lost += [("db", field, value) for field, value in added if not fresh.contains(field, value)]
+        version_ok = fresh.version == start_version + len(added)
+
+    print(f"сессий: {args.sessions}, хранилищ: {args.stores}, время: {elapsed:.2f} с")
+    print(f"чтений: {len(latencies):,}, добавлений: {len(added):,}")
+    print(f"версия словаря: {'OK' if version_ok else 'РАСХОЖДЕНИЕ'}")
+    print(f"потерянных добавлений: {len(lost)}")
+
+    latencies.sort()
+    quarter = len(latencies) // 4
+    print("задержка чтения по четвертям теста, мкс (p50 / p99):")
+    for index in range(4):
+        values = [latency for _, latency in latencies[index * quarter:(index + 1) * quarter]]
+        print(f"  Q{index + 1}: {statistics.median(values) * 1e6:7.1f} / {percentile(values, 0.99) * 1e6:7.1f}")
+
+    if lost or not version_ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+# Движок нейминга и UTM без зависимости от Streamlit.
+# UI (app.py) и пакетные режимы используют одни и те же функции,
+# поэтому результат в интерфейсе и в пакетной обработке совпадает побайтно.
+
+from name_generator.engine import (
+    DEFAULT_STRICT_NAMING,
+    DEFAULT_VARIABLE_NAMING,
+    DEFAULT_UTM_PARAMS,
+    NAMING_FIELDS,
+    FIELD_VOCABULARY,
+    UTM_KEYS,
+    validate_url,
+    build_name,
+    build_utm_url,
+    build_names,
+    build_utm_urls,
+)
+
+__all__ = [
+    "DEFAULT_STRICT_NAMING",
+    "DEFAULT_VARIABLE_NAMING",
+    "DEFAULT_UTM_PARAMS",
+    "NAMING_FIELDS",
+    "FIELD_VOCABULARY",
+    "UTM_KEYS",
+    "validate_url",
+    "build_name",
+    "build_utm_url",
+    "build_names",
+    "build_utm_urls",
+]
@@ -0,0 +1,5 @@
+import sys
+
+from name_generator.cli import main
+
+sys.exit(main())
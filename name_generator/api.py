@@ -0,0 +1,87 @@
+from name_generator.engine import FIELD_VOCABULARY, NAMING_FIELDS, UTM_KEYS, build_name, build_utm_url, validate_url
+
+# ============================================================
+# ОБРАБОТКА ЗАПИСЕЙ ДЛЯ HTTP API
+# ============================================================
+#
+# Одна запись — словарь с ключами из NAMING_FIELDS, base_link и UTM_KEYS
+# (как строка CSV в массовой загрузке). campaign_types — список или строка
+# через "&". Ответ: нейминг, UTM-ссылка и ошибки в тех же формулировках,
+# что и в отчёте массовой загрузки (bulk.validate_frame).
+#
+# Модуль не зависит ни от pandas, ни от Streamlit: его используют сервер
+# API и консольная утилита.
+
+class RecordError(ValueError):
+    pass
+
+def _text(record, key):
+    value = record.get(key)
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        raise RecordError(f"{key}: ожидается строка")
+    return value
+
+def _types(record):
+    value = record.get("campaign_types")
+    if value is None or value == "":
+        return []
+    if isinstance(value, str):
+        return [part for part in value.split("&") if part]
+    if isinstance(value, list) and all(isinstance(part, str) for part in value):
+        return [part for part in value if part]
+    raise RecordError("campaign_types: ожидается список строк или строка через '&'")
+
+def validate_record(fields, types, base_link, vocabularies):
+    # fields — значения полей нейминга без campaign_types;
+    # vocabularies — {название словаря: множество значений}
+    errors = []
+    for field in NAMING_FIELDS:
+        allowed = vocabularies.get(FIELD_VOCABULARY[field], ())
+        if field == "campaign_types":
+            if not types:
+                errors.append(f"{field}: не заполнено")
+                continue
+            bad = [value for value in types if value not in allowed]
+            if bad:
+                errors.append(f"{field}: нет в словаре '{'&'.join(bad)}'")
+            continue
+        value = fields[field]
+        if not value:
+            errors.append(f"{field}: не заполнено")
+        elif value not in allowed:
+            errors.append(f"{field}: нет в словаре '{value}'")
+    if base_link and not validate_url(base_link):
+        errors.append("base_link: некорректная ссылка")
+    return errors
+
+def process_record(record, vocabularies):
+    if not isinstance(record, dict):
+        raise RecordError("ожидается JSON-объект")
+    fields = {field: _text(record, field) for field in NAMING_FIELDS if field != "campaign_types"}
+    types = _types(record)
+    base_link = _text(record, "base_link")
+    utm = {key: _text(record, key) for key in UTM_KEYS}
+
+    name = build_name(fields["product"], fields["stream"], fields["expense"], fields["source"], types,
+                      fields["client_geo"], fields["targeting"], fields["goal"])
+    # Пустой utm_campaign заполняется неймингом, как в сайдбаре
+    utm["utm_campaign"] = utm["utm_campaign"] or name
+    errors = validate_record(fields, types, base_link, vocabularies)
+    return {
+        "name": name,
+        "utm_url": build_utm_url(base_link, **utm),
+        "valid": not errors,
+        "errors": errors,
+    }
+
+def process_records(records, vocabularies):
+    # Ошибка формата одной записи не прерывает пакет
+    results = []
+    for record in records:
+        try:
+            results.append(process_record(record, vocabularies))
+        except RecordError as exc:
+            results.append({"valid": False, "errors": [str(exc)]})
+    return results
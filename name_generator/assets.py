@@ -0,0 +1,38 @@
+import os
+
+# ============================================================
+# СТАТИКА: ЛОГОТИП
+# ============================================================
+#
+# python -m name_generator assets
+#
+# Всё, что нужно для первой отрисовки, лежит в static/ и раздаётся самим
+# Streamlit (server.enableStaticServing): внешних запросов при открытии
+# страницы нет. Команда пересобирает static/logo.png из min-hh-red.png:
+# уменьшает до двойной ширины показа в сайдбаре и переводит в палитру
+# (нужен Pillow).
+#
+# Шрифт не раздаётся: тема (.streamlit/config.toml) просит Golos Text,
+# если он установлен в системе, иначе берётся системный sans-serif.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATIC_DIR = os.path.join(ROOT, "static")
+
+LOGO_SOURCE = os.path.join(ROOT, "min-hh-red.png")
+LOGO_TARGET = os.path.join(STATIC_DIR, "logo.png")
+# Логотип показывается шириной 240px: запас x2 для экранов с высокой плотностью
+LOGO_WIDTH = 480
+LOGO_COLORS = 64
+
+def build_logo(source=LOGO_SOURCE, target=LOGO_TARGET, width=LOGO_WIDTH, colors=LOGO_COLORS):
+    try:
+        from PIL import Image
+    except ImportError as exc:
+        raise RuntimeError("Для сборки логотипа установите пакет Pillow") from exc
+
+    with Image.open(source) as image:
+        height = round(image.height * width / image.width)
+        resized = image.convert("RGBA").resize((width, height), Image.LANCZOS)
+    # Палитра с альфа-каналом: у логотипа два цвета и сглаживание краёв
+    resized.quantize(colors=colors, method=Image.FASTOCTREE).save(target, optimize=True)
+    return target
@@ -0,0 +1,209 @@
+import zipfile
+
+from name_generator.engine import (
+    DEFAULT_STRICT_NAMING,
+    DEFAULT_VARIABLE_NAMING,
+    FIELD_VOCABULARY,
+    NAMING_FIELDS,
+    UTM_KEYS,
+    validate_url,
+    build_names,
+    build_utm_urls,
+)
+
+# ============================================================
+# МАССОВАЯ ОБРАБОТКА CSV/XLSX ПО ЧАНКАМ
+# ============================================================
+
+DEFAULT_CHUNKSIZE = 5000
+
+INPUT_COLUMNS = NAMING_FIELDS + ("base_link",) + UTM_KEYS
+RESULT_COLUMNS = ("name", "utm_url", "errors")
+
+def default_vocabularies():
+    return {**DEFAULT_STRICT_NAMING, **DEFAULT_VARIABLE_NAMING}
+
+def validate_frame(frame, vocabularies=None):
+    # Возвращает колонку с описанием ошибок ("" — строка корректна)
+    import pandas as pd
+
+    if vocabularies is None:
+        vocabularies = default_vocabularies()
+
+    errors = pd.Series("", index=frame.index, dtype=object)
+
+    def add(mask, message):
+        nonlocal errors
+        if not isinstance(message, pd.Series):
+            message = pd.Series(message, index=frame.index)
+        message = message.where(mask, "")
+        joiner = ((errors != "") & (message != "")).map({True: "; ", False: ""})
+        errors = errors + joiner + message
+
+    for field in NAMING_FIELDS:
+        values = frame[field].fillna("").astype(str) if field in frame else pd.Series("", index=frame.index)
+        allowed = vocabularies[FIELD_VOCABULARY[field]]
+
+        add(values == "", f"{field}: не заполнено")
+
+        if field == "campaign_types":
+            parts = values.str.split("&").explode()
+            bad_parts = parts[(parts != "") & ~parts.isin(allowed)]
+            if len(bad_parts):
+                bad = bad_parts.groupby(level=0).agg("&".join).reindex(frame.index, fill_value="")
+                add(bad != "", f"{field}: нет в словаре '" + bad + "'")
+        else:
+            add((values != "") & ~values.isin(allowed), f"{field}: нет в словаре '" + values + "'")
+
+    if "base_link" in frame:
+        links = frame["base_link"].fillna("").astype(str)
+        checked = {link: validate_url(link) for link in links.unique() if link}
+        add((links != "") & ~links.map(checked).fillna(True).astype(bool), "base_link: некорректная ссылка")
+
+    return errors.rename("errors")
+
+def normalize_frame(frame, vocabularies=None):
+    # Значения плана приводятся к словарному виду (normalize.normalize_series):
+    # «Adtech-B2C » и «RTK-Seller» совпадут со словарём, кириллица — транслит
+    from name_generator.normalize import normalize_series
+
+    if vocabularies is None:
+        vocabularies = default_vocabularies()
+    for field in NAMING_FIELDS:
+        if field not in frame:
+            continue
+        options = vocabularies.get(FIELD_VOCABULARY[field], ())
+        if field == "campaign_types":
+            parts = frame[field].fillna("").astype(str).str.split("&").explode()
+            parts = normalize_series(parts, options=options)
+            frame[field] = parts[parts != ""].groupby(level=0).agg("&".join).reindex(frame.index, fill_value="")
+        else:
+            frame[field] = normalize_series(frame[field], options=options)
+    # utm_campaign — нейминг (с "&" и "_"), по нему сверяются расходы:
+    # оставляем как есть
+    for key in UTM_KEYS:
+        if key in frame and key != "utm_campaign":
+            frame[key] = normalize_series(frame[key], "utm", vocabularies.get(key))
+    return frame
+
+def process_chunk(frame, vocabularies=None, normalize=False):
+    frame = frame.copy()
+    if normalize:
+        frame = normalize_frame(frame, vocabularies)
+    frame["name"] = build_names(frame)
+    frame["utm_url"] = build_utm_urls(frame, names=frame["name"])
+    frame["errors"] = validate_frame(frame, vocabularies)
+    return frame
+
+# ============================================================
+# ЧТЕНИЕ
+# ============================================================
+
+def sniff_separator(header):
+    # Excel с русской локалью сохраняет CSV через ";", поэтому смотрим на заголовок
+    if isinstance(header, bytes):
+        header = header.decode("utf-8", errors="ignore")
+    return max((";", ",", "\t"), key=header.count)
+
+def _read_header(source):
+    if hasattr(source, "readline"):
+        position = source.tell()
+        header = source.readline()
+        source.seek(position)
+        return header
+    with open(source, "rb") as handle:
+        return handle.readline()
+
+def read_csv_chunks(source, chunksize=DEFAULT_CHUNKSIZE):
+    import pandas as pd
+
+    try:
+        yield from pd.read_csv(
+            source, chunksize=chunksize, dtype=str, keep_default_na=False,
+            sep=sniff_separator(_read_header(source)), encoding="utf-8-sig",
+        )
+    except UnicodeDecodeError as exc:
+        raise ValueError("файл не в кодировке UTF-8, пересохраните CSV в UTF-8") from exc
+
+def read_xlsx_chunks(source, chunksize=DEFAULT_CHUNKSIZE):
+    import pandas as pd
+
+    try:
+        from openpyxl import load_workbook
+        from openpyxl.utils.exceptions import InvalidFileException
+    except ImportError as exc:
+        raise RuntimeError("Для чтения XLSX установите пакет openpyxl") from exc
+
+    # read_only-режим openpyxl отдаёт строки потоком, не загружая лист целиком.
+    # Битый архив или старый .xls сводятся к ValueError, как и ошибки CSV
+    try:
+        workbook = load_workbook(source, read_only=True, data_only=True)
+    except (zipfile.BadZipFile, InvalidFileException, KeyError) as exc:
+        raise ValueError("файл не похож на книгу XLSX") from exc
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        header = ["" if cell is None else str(cell).strip() for cell in header]
+        batch = []
+        for row in rows:
+            batch.append(["" if cell is None else str(cell) for cell in row])
+            if len(batch) >= chunksize:
+                yield pd.DataFrame(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        workbook.close()
+
+def read_chunks(source, filename, chunksize=DEFAULT_CHUNKSIZE):
+    if filename.lower().endswith((".xlsx", ".xlsm")):
+        return read_xlsx_chunks(source, chunksize)
+    return read_csv_chunks(source, chunksize)
+
+# ============================================================
+# ЗАПИСЬ
+# ============================================================
+
+def add_short_urls(frame, shortlinks):
+    # Короткие ссылки только для корректных строк, одной транзакцией на чанк
+    from name_generator.shortlinks import is_safe_url, short_url
+
+    urls = frame["utm_url"].where(frame["errors"] == "", "")
+    codes = shortlinks.shorten_many([url if is_safe_url(url) else "" for url in urls])
+    frame["short_url"] = [short_url(code) if code else "" for code in codes]
+    return frame
+
+def process_file(source, filename, output, chunksize=DEFAULT_CHUNKSIZE,
+                 vocabularies=None, on_progress=None, errors_output=None, shortlinks=None, normalize=False):
+    # Результат пишется в output (текстовый файл) по мере обработки чанков,
+    # поэтому в памяти одновременно находится только один чанк.
+    # shortlinks (ShortLinkStore) добавляет колонку short_url, normalize —
+    # нормализует значения плана перед проверкой.
+    stats = {"rows": 0, "invalid": 0}
+    columns = None
+    result_columns = ("name", "utm_url", "short_url", "errors") if shortlinks is not None else RESULT_COLUMNS
+
+    for chunk in read_chunks(source, filename, chunksize):
+        chunk.columns = [str(column).strip() for column in chunk.columns]
+        result = process_chunk(chunk, vocabularies, normalize)
+        if shortlinks is not None:
+            result = add_short_urls(result, shortlinks)
+        result.index = range(stats["rows"] + 1, stats["rows"] + len(result) + 1)
+
+        first_chunk = columns is None
+        if first_chunk:
+            columns = list(chunk.columns) + [c for c in result_columns if c not in chunk.columns]
+        result.to_csv(output, columns=columns, header=first_chunk, index=False)
+
+        invalid = result[result["errors"] != ""]
+        if errors_output is not None:
+            invalid.to_csv(errors_output, columns=["name", "errors"], header=first_chunk, index_label="row")
+
+        stats["rows"] += len(result)
+        stats["invalid"] += len(invalid)
+        if on_progress is not None:
+            on_progress(stats)
+
+    return stats
@@ -0,0 +1,351 @@
+import argparse
+import collections
+import csv
+import io
+import itertools
+import json
+import os
+import sys
+
+from name_generator.api import RecordError, process_record
+from name_generator.bulk import INPUT_COLUMNS, RESULT_COLUMNS, sniff_separator
+from name_generator.engine import NAMING_FIELDS
+from name_generator.exports import LAYOUTS, export_format, open_export
+
+# ============================================================
+# КОНСОЛЬНАЯ УТИЛИТА
+# ============================================================
+#
+# python -m name_generator build plan.csv > result.csv
+# cat plan.ndjson | python -m name_generator build --to csv --errors errors.csv
+# python -m name_generator build huge.csv --workers 4 -o result.csv
+# python -m name_generator build plan.csv --short > result.csv
+# python -m name_generator build plan.csv --export yandex_direct --export-file direct.xlsx
+# python -m name_generator reconcile --costs direct.csv vk.csv --sessions metrika.csv --by product stream
+#
+# Записи читаются и пишутся потоком, в памяти — только текущие порции.
+# Правила те же, что в сайдбаре и API (api.process_record). Код выхода:
+# 0 — все строки корректны, 1 — есть строки с ошибками, 2 — ошибка ввода.
+#
+# Утилита запускается из shell-циклов тысячами раз, поэтому на старте
+# не импортирует ни Streamlit, ни pandas.
+
+# Строк в одной порции для пула процессов
+WORKER_CHUNK = 2000
+
+# ============================================================
+# ЧТЕНИЕ
+# ============================================================
+
+def _open_input(path):
+    if path == "-":
+        return io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8-sig", newline="")
+    return open(path, encoding="utf-8-sig", newline="")
+
+def _detect_format(path, first_line):
+    if path.lower().endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    if path.lower().endswith((".csv", ".txt", ".tsv")):
+        return "csv"
+    return "ndjson" if first_line.lstrip().startswith("{") else "csv"
+
+def read_records(first_line, rest, input_format, delimiter=None):
+    # first_line уже прочитана для определения формата, rest — остальные строки.
+    # Возвращает (колонки, итератор (номер строки, запись или текст ошибки))
+    lines = itertools.chain([first_line], rest) if first_line else iter(())
+    if input_format == "ndjson":
+        def parse(lines):
+            for number, line in enumerate((line for line in lines if line.strip()), 1):
+                try:
+                    yield number, json.loads(line)
+                except ValueError as exc:
+                    yield number, f"некорректный JSON: {exc}"
+        return list(INPUT_COLUMNS), parse(lines)
+
+    delimiter = delimiter or sniff_separator(first_line)
+    rows = csv.reader(lines, delimiter=delimiter)
+    header = [column.strip() for column in next(rows, [])]
+    return header, ((number, dict(zip(header, row))) for number, row in enumerate(rows, 1))
+
+# ============================================================
+# ОБРАБОТКА
+# ============================================================
+
+_vocabularies = None
+
+def _init_worker(vocabularies):
+    global _vocabularies
+    _vocabularies = vocabularies
+
+def process_items(items, vocabularies=None):
+    vocabularies = _vocabularies if vocabularies is None else vocabularies
+    results = []
+    for number, record in items:
+        if isinstance(record, str):
+            result = {"name": "", "utm_url": "", "valid": False, "errors": [record]}
+            record = {}
+        else:
+            try:
+                result = process_record(record, vocabularies)
+            except RecordError as exc:
+                result = {"name": "", "utm_url": "", "valid": False, "errors": [str(exc)]}
+                record = record if isinstance(record, dict) else {}
+        results.append((number, record, result))
+    return results
+
+def _chunks(items, size):
+    while True:
+        chunk = list(itertools.islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+def add_short_urls(results, store, base=None):
+    # Короткие ссылки для корректных строк порции — одной транзакцией
+    from name_generator.shortlinks import is_safe_url, short_url
+
+    urls = [result["utm_url"] if result["valid"] and is_safe_url(result["utm_url"]) else ""
+            for _, _, result in results]
+    for (_, _, result), code in zip(results, store.shorten_many(urls)):
+        result["short_url"] = short_url(code, base) if code else ""
+    return results
+
+def process_stream(items, vocabularies, workers=1):
+    if workers <= 1:
+        for chunk in _chunks(items, WORKER_CHUNK):
+            yield from process_items(chunk, vocabularies)
+        return
+
+    # Pool.imap вычитывает вход целиком, поэтому порции отправляются
+    # вручную: в работе не больше двух на процесс, порядок сохраняется
+    import multiprocessing
+
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(vocabularies,)) as pool:
+        pending = collections.deque()
+        for chunk in _chunks(items, WORKER_CHUNK):
+            pending.append(pool.apply_async(process_items, (chunk,)))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
+
+# ============================================================
+# ЗАПИСЬ
+# ============================================================
+
+def _csv_value(value):
+    if isinstance(value, list):
+        return "&".join(str(part) for part in value)
+    return "" if value is None else str(value)
+
+class CsvWriter:
+    def __init__(self, handle, columns, result_columns=RESULT_COLUMNS):
+        self.columns = list(columns) + [column for column in result_columns if column not in columns]
+        self.writer = csv.writer(handle)
+        self.writer.writerow(self.columns)
+
+    def write(self, record, result):
+        row = {**record, "name": result["name"], "utm_url": result["utm_url"],
+               "errors": "; ".join(result["errors"])}
+        if "short_url" in result:
+            row["short_url"] = result["short_url"]
+        self.writer.writerow([_csv_value(row.get(column)) for column in self.columns])
+
+class NdjsonWriter:
+    def __init__(self, handle, columns, result_columns=RESULT_COLUMNS):
+        self.handle = handle
+
+    def write(self, record, result):
+        self.handle.write(json.dumps({**record, **result}, ensure_ascii=False) + "\n")
+
+WRITERS = {"csv": CsvWriter, "ndjson": NdjsonWriter}
+
+# ============================================================
+# КОМАНДЫ
+# ============================================================
+
+def command_build(args):
+    from name_generator.vocabulary import read_vocabularies
+
+    if bool(args.export) != bool(args.export_file):
+        print("--export и --export-file указываются вместе", file=sys.stderr)
+        return 2
+    try:
+        source = _open_input(args.input)
+    except OSError as exc:
+        print(f"Не удалось открыть {args.input}: {exc}", file=sys.stderr)
+        return 2
+
+    with source:
+        first_line = source.readline()
+        input_format = args.input_format or _detect_format(args.input, first_line)
+        columns, items = read_records(first_line, source, input_format, args.delimiter)
+        vocabularies = read_vocabularies(args.db).members
+
+        output = (io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", newline="", write_through=False)
+                  if args.output == "-" else open(args.output, "w", encoding="utf-8", newline=""))
+        errors_file = open(args.errors, "w", encoding="utf-8", newline="") if args.errors else None
+        errors_writer = csv.writer(errors_file) if errors_file else None
+        if errors_writer:
+            errors_writer.writerow(["row", "name", "errors"])
+
+        results = process_stream(items, vocabularies, args.workers)
+        result_columns = RESULT_COLUMNS
+        if args.short:
+            from name_generator.shortlinks import ShortLinkStore
+
+            store = ShortLinkStore(args.db)
+            result_columns = ("name", "utm_url", "short_url", "errors")
+            results = (row for chunk in _chunks(results, WORKER_CHUNK)
+                       for row in add_short_urls(chunk, store, args.short_base))
+
+        writer = WRITERS[args.to or input_format](output, columns, result_columns)
+        # Выгрузка для кабинета пишется параллельно основному выводу, только корректные строки
+        exporter = open_export(args.export_file, args.export, export_format(args.export_file)) if args.export else None
+        rows = invalid = 0
+        try:
+            for number, record, result in results:
+                writer.write(record, result)
+                if exporter and result["valid"]:
+                    exporter.write({**record, **result})
+                rows += 1
+                if not result["valid"]:
+                    invalid += 1
+                    message = "; ".join(result["errors"])
+                    if errors_writer:
+                        errors_writer.writerow([number, result["name"], message])
+                    elif invalid <= args.max_errors:
+                        print(f"строка {number}: {message}", file=sys.stderr)
+        finally:
+            output.flush()
+            if args.output != "-":
+                output.close()
+            if errors_file:
+                errors_file.close()
+            if exporter:
+                exporter.close()
+
+    if invalid:
+        print(f"Строк: {rows}, с ошибками: {invalid}", file=sys.stderr)
+        return 1
+    return 0
+
+def command_assets(args):
+    from name_generator import assets
+
+    try:
+        path = assets.build_logo()
+    except (OSError, RuntimeError) as exc:
+        print(f"Логотип не собран: {exc}", file=sys.stderr)
+        return 2
+    print(f"{path}: {os.path.getsize(path):,} байт")
+    return 0
+
+def _column_overrides(values):
+    # ["costs.cost=Потрачено"] → {"costs": {"cost": "Потрачено"}}
+    from name_generator.reconcile import SOURCES
+
+    overrides = {}
+    for value in values or ():
+        target, _, header = value.partition("=")
+        kind, _, field = target.partition(".")
+        if kind not in SOURCES or field not in SOURCES[kind].fields or not header.strip():
+            raise ValueError(f"--map {value}: ожидается ВЫГРУЗКА.ПОЛЕ=ЗАГОЛОВОК, например costs.cost=Потрачено")
+        overrides.setdefault(kind, {})[field] = header
+    return overrides
+
+def command_reconcile(args):
+    from name_generator import reconcile
+    from name_generator.vocabulary import read_vocabularies
+
+    try:
+        overrides = _column_overrides(args.map)
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    cache = None if args.no_cache else reconcile.PartialCache(args.db)
+
+    partials = {"costs": [], "sessions": []}
+    for kind, paths in (("costs", args.costs), ("sessions", args.sessions or ())):
+        for path in paths:
+            try:
+                partial, stats = reconcile.load_partial(path, path, kind, cache, overrides.get(kind),
+                                                        args.chunksize)
+            except (OSError, ValueError) as exc:
+                print(f"{path}: {exc}", file=sys.stderr)
+                return 2
+            partials[kind].append(partial)
+            status = "из кэша" if stats["cached"] else "прочитан"
+            print(f"{path}: {status}, строк {stats['rows']:,}, кампаний {stats['campaigns']:,}", file=sys.stderr)
+
+    campaigns = reconcile.reconcile(partials["costs"], partials["sessions"], read_vocabularies(args.db).members)
+    summary = reconcile.summarize(campaigns, args.by)
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    try:
+        summary.to_csv(output, index=False)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    if args.campaigns:
+        campaigns.to_csv(args.campaigns, index=False)
+
+    totals = reconcile.totals(campaigns)
+    print(f"Кампаний: {totals['campaigns']:,}, со сессиями и расходом: {totals['matched']:,}, "
+          f"вне нейминга: {totals['outside_naming']:,}", file=sys.stderr)
+    print(f"Расход: {totals['cost']:,.2f}, сессий: {totals['sessions']:,.0f}, "
+          f"расход без сессий: {totals['unmatched_cost_share']:.1%}", file=sys.stderr)
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m name_generator",
+                                     description="Генератор нейминга и UTM из командной строки")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="нейминг и UTM-ссылки для CSV/NDJSON")
+    build.add_argument("input", nargs="?", default="-", help="файл или - для stdin (по умолчанию)")
+    build.add_argument("-o", "--output", default="-", help="файл или - для stdout (по умолчанию)")
+    build.add_argument("--from", dest="input_format", choices=("csv", "ndjson"),
+                       help="формат входа (по умолчанию — по расширению или первой строке)")
+    build.add_argument("--to", choices=("csv", "ndjson"), help="формат выхода (по умолчанию — как вход)")
+    build.add_argument("--delimiter", help="разделитель CSV (по умолчанию — по заголовку)")
+    build.add_argument("--workers", type=int, default=1, help="процессов для обработки")
+    build.add_argument("--errors", help="CSV-отчёт об ошибках (row, name, errors) вместо stderr")
+    build.add_argument("--max-errors", type=int, default=100,
+                       help="сколько ошибок печатать в stderr (по умолчанию 100)")
+    build.add_argument("--db", help="база словарей (по умолчанию NAME_GENERATOR_DB или data/)")
+    build.add_argument("--short", action="store_true",
+                       help="добавить колонку short_url: короткие ссылки сохраняются в базе --db")
+    build.add_argument("--short-base", help="адрес редиректа (по умолчанию NAME_GENERATOR_SHORT_BASE)")
+    build.add_argument("--export", choices=tuple(LAYOUTS), help="выгрузка для рекламного кабинета")
+    build.add_argument("--export-file", help="файл выгрузки: .xlsx или .csv")
+    build.set_defaults(handler=command_build)
+
+    assets = commands.add_parser("assets", help="пересобрать логотип в static/")
+    assets.set_defaults(handler=command_assets)
+
+    reconcile = commands.add_parser("reconcile", help="сверка расходов с сессиями по сегментам нейминга")
+    reconcile.add_argument("--costs", nargs="+", required=True, metavar="CSV",
+                           help="выгрузки расходов из кабинетов: кампания, расход, клики")
+    reconcile.add_argument("--sessions", nargs="+", metavar="CSV",
+                           help="выгрузки сессий из аналитики: utm_campaign, сессии, конверсии")
+    reconcile.add_argument("--by", nargs="+", choices=NAMING_FIELDS, default=["product", "stream"],
+                           help="поля нейминга для группировки (по умолчанию product stream)")
+    reconcile.add_argument("-o", "--output", default="-", help="итог по сегментам: файл или - для stdout")
+    reconcile.add_argument("--campaigns", help="CSV с разбивкой по кампаниям")
+    reconcile.add_argument("--map", action="append", metavar="ВЫГРУЗКА.ПОЛЕ=ЗАГОЛОВОК",
+                           help="своё название колонки, например costs.cost=Потрачено (можно повторять)")
+    reconcile.add_argument("--chunksize", type=int, default=100_000, help="строк в чанке при чтении")
+    reconcile.add_argument("--no-cache", action="store_true",
+                           help="не использовать кэш частичных результатов по файлам")
+    reconcile.add_argument("--db", help="база словарей и кэша (по умолчанию NAME_GENERATOR_DB или data/)")
+    reconcile.set_defaults(handler=command_reconcile)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except BrokenPipeError:
+        # Вывод оборван (например, | head) — это не ошибка
+        sys.stderr.close()
+        return 0
@@ -0,0 +1,22 @@
+import os
+
+import streamlit.components.v1 as components
+
+# ============================================================
+# КНОПКИ КОПИРОВАНИЯ
+# ============================================================
+#
+# Компонент объявляется один раз при импорте модуля. С постоянным key
+# Streamlit не пересоздаёт iframe между прогонами, а передаёт ему только
+# новый список значений; фронтенд перерисовывает кнопки, лишь когда
+# список изменился.
+
+_FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "frontend", "copy_button")
+
+_copy_button = components.declare_component("copy_button", path=_FRONTEND_DIR)
+
+def copy_buttons(items, key):
+    # items: [(подпись, текст, цвет)]. Возвращает последнее событие
+    # копирования {"label", "text", "ts"} или None.
+    payload = [{"label": label, "text": text, "color": color} for label, text, color in items]
+    return _copy_button(items=payload, key=key, default=None)
@@ -0,0 +1,92 @@
+import dataclasses
+
+from name_generator.engine import FIELD_VOCABULARY, NAMING_FIELDS, UTM_KEYS, build_name, build_utm_url
+
+# ============================================================
+# ЧЕРНОВИК КАМПАНИИ
+# ============================================================
+#
+# Всё, что пользователь выбрал в форме, — один неизменяемый объект.
+# В session_state лежит только он; изменения делаются через replace(),
+# сброс — новый пустой черновик. Черновик сериализуется в query-параметры
+# страницы: заполненную форму можно открыть по ссылке за один прогон.
+
+# Поля черновика, которые выбираются из словаря: поле → название словаря
+DRAFT_VOCABULARY = {**FIELD_VOCABULARY, **{key: key for key in UTM_KEYS if key != "utm_campaign"}}
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class CampaignDraft:
+    product: str = ""
+    stream: str = ""
+    expense: str = ""
+    source: str = ""
+    campaign_types: tuple = ()
+    client_geo: str = ""
+    targeting: str = ""
+    goal: str = ""
+    base_link: str = ""
+    utm_source: str = ""
+    utm_medium: str = ""
+    # Пустой utm_campaign — автозаполнение неймингом
+    utm_campaign: str = ""
+    utm_content: str = ""
+    utm_term: str = ""
+    utm_vacancy: str = ""
+
+    def replace(self, **changes):
+        return dataclasses.replace(self, **changes)
+
+    def with_params(self, params, vocabularies=None):
+        # Поля из params поверх текущих: частичный пресет не трогает остальные
+        return CampaignDraft.from_query_params({**self.to_query_params(), **params}, vocabularies)
+
+    def toggle_type(self, value):
+        types = self.campaign_types
+        types = tuple(item for item in types if item != value) if value in types else types + (value,)
+        return self.replace(campaign_types=types)
+
+    def name(self):
+        return build_name(*(getattr(self, field) for field in NAMING_FIELDS))
+
+    def utm_url(self):
+        name = self.name()
+        values = [getattr(self, key) for key in UTM_KEYS]
+        values[UTM_KEYS.index("utm_campaign")] = self.utm_campaign or name
+        return build_utm_url(self.base_link, *values)
+
+    def segments(self):
+        return {field: getattr(self, field) for field in NAMING_FIELDS}
+
+    # -------------------- query-параметры --------------------
+
+    def to_query_params(self):
+        # Только заполненные поля; типы кампании — через "&", как в нейминге
+        params = {}
+        for field in dataclasses.fields(self):
+            value = getattr(self, field.name)
+            if isinstance(value, tuple):
+                value = "&".join(value)
+            if value:
+                params[field.name] = value
+        return params
+
+    @classmethod
+    def from_query_params(cls, params, vocabularies=None):
+        # Неизвестные параметры пропускаются. Если передан снимок словарей,
+        # значения не из словаря отбрасываются — их нельзя выбрать в форме.
+        values = {}
+        for field in dataclasses.fields(cls):
+            value = params.get(field.name, "")
+            if isinstance(value, list):
+                value = value[-1] if value else ""
+            if not value:
+                continue
+            vocabulary = DRAFT_VOCABULARY.get(field.name)
+            if field.name == "campaign_types":
+                types = tuple(dict.fromkeys(part for part in value.split("&") if part))
+                if vocabularies is not None:
+                    types = tuple(part for part in types if vocabularies.contains(vocabulary, part))
+                values[field.name] = types
+            elif vocabularies is None or vocabulary is None or vocabularies.contains(vocabulary, value):
+                values[field.name] = value
+        return cls(**values)
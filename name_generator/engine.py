@@ -0,0 +1,249 @@
+import functools
+import re
+from urllib.parse import quote, unquote_plus
+
+# ============================================================
+# КОНФИГУРАЦИЯ ДАННЫХ
+# ============================================================
+
+DEFAULT_STRICT_NAMING = {
+    "Продукт": ["adtech-b2b", "adtech-b2c"],
+    "Стрим": ["magnitsupergeo", "lpv", "vebinar", "multi", "clickme", "client", "cobrand",
+              "omnikanalnost", "brandlift", "vr", "career", "retargeting", "reactiv",
+              "adtech", "meetup", "onedayoffer"],
+    "Статья расхода": ["vr", "cpa", "nch", "lpv", "career"],
+    "Источник": ["yandex", "telegram", "vk", "tgads", "rockettelegram", "gooroo", "vc", "yandexpromopages"],
+}
+
+DEFAULT_VARIABLE_NAMING = {
+    "Тип кампании": ["cpcepkall", "mk", "inapp", "media", "leadform", "telegram", "feed",
+                     "autofeed", "epkrsya", "cpaepkall", "post", "search", "article",
+                     "resumes", "common", "vacancy", "banner300x600", "banner100x250",
+                     "employer", "text", "video", "banner", "image"],
+    "Клиент/гео": ["rostelecomoperatorcallcenter", "astrakhan", "voditel", "b2c", "multigeo",
+                   "supergeo", "vit", "special", "remote", "common", "efes", "february",
+                   "multycallcentre", "multyvoditel", "podrabotka", "5napravleniy", "bezopyta",
+                   "vakhta", "obnoviresume", "kaknenado", "statyasovetirezume", "kartavacanse",
+                   "RTK-operatorkc", "RTK-seller", "periodmart", "yandex-storekeeper",
+                   "vkusnoitochka", "webinarkobrend"],
+    "Таргетинг": ["channel", "users", "bdhh", "msk2km", "joblisting", "bigdata",
+                  "segment6-12", "segment12-24", "segment24-60", "chatbot", "key-autotarget",
+                  "segmenteconomist", "segment-themes-t1", "segment-channel-t1",
+                  "segment1224-themes-t1", "segment1224-channel-t1", "segmentcallcentre",
+                  "channel-t1", "channel-t2", "channel-t3", "channel-t4", "channel-themes-t1",
+                  "segment612-themes-t1", "segment612-channel-t1", "segmenthh", "segment-t1", "segment-t2"],
+    "Цель": ["response", "tresponse", "reg", "regb2c", "install", "reginstall", "leadform",
+             "lead", "response-tresponse", "clickredlk-clicksohranitizmeneniyalk", "cuerresponse",
+             "zapolnenyekontaktnihdanih", "impressions"],
+}
+
+DEFAULT_UTM_PARAMS = {
+    "utm_source": ["yandex", "tgads", "clickme", "vk", "gooroo", "tg", "vc", "yandexpromopages"],
+    "utm_medium": ["cpc", "cpm", "cpa", "post", "posev", "cpc_yandex_direct"],
+    "utm_content": ["ad1", "{ad_id}", "ad2", "t1", "t2", "t3", "v1", "v2", "v3", "i1"],
+    "utm_term": ["none", "{keyword}", "kartavacanse", "5obraztsov", "sovetirezume", "kaknenado",
+                 "posadkavacancy", "statyaudalenka", "statya5napravleniy", "obshayabezopyta",
+                 "obshayaposadkavacancy", "posadkaresume", "obshayapodrabotka", "podrabotka",
+                 "vakhta", "remote", "obnoviresume", "multy_callcentre", "seller", "waiter",
+                 "multyvoditel", "statyamyths", "rosteloperatorcc", "bezopyta", "RTK-seller",
+                 "yandex-storekeeper", "msk", "yandexeda-courier"],
+    "utm_vacancy": ["116482958", "114556060", "{utm_vacancy}", "121286221", "33086", "125468351"],
+}
+
+# Порядок полей нейминга (совпадает с ключами session_state и колонками пакетного режима)
+NAMING_FIELDS = ("product", "stream", "expense", "source", "campaign_types",
+                 "client_geo", "targeting", "goal")
+
+# Поле нейминга → название словаря в DEFAULT_STRICT_NAMING / DEFAULT_VARIABLE_NAMING
+FIELD_VOCABULARY = {
+    "product": "Продукт",
+    "stream": "Стрим",
+    "expense": "Статья расхода",
+    "source": "Источник",
+    "campaign_types": "Тип кампании",
+    "client_geo": "Клиент/гео",
+    "targeting": "Таргетинг",
+    "goal": "Цель",
+}
+
+# Разделители нейминга: между полями и между несколькими типами кампании
+NAME_SEPARATOR = "_"
+TYPES_SEPARATOR = "&"
+
+# Порядок UTM-параметров в ссылке
+UTM_KEYS = ("utm_source", "utm_medium", "utm_campaign", "utm_content", "utm_term", "utm_vacancy")
+
+# ============================================================
+# ОДИНОЧНАЯ СБОРКА
+# ============================================================
+
+_URL_PATTERN = re.compile(
+    r'^https?://'
+    r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'
+    r'localhost|'
+    r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'
+    r'(?::\d+)?'
+    r'(?:/?|[/?]\S+)$', re.IGNORECASE)
+
+@functools.lru_cache(maxsize=4096)
+def validate_url(url):
+    return bool(_URL_PATTERN.match(url))
+
+def build_name(product, stream, expense, source, campaign_types, client_geo, targeting, goal):
+    parts = []
+    if product:
+        parts.append(product)
+    if stream:
+        parts.append(stream)
+    if expense:
+        parts.append(expense)
+    if source:
+        parts.append(source)
+    if campaign_types:
+        parts.append(TYPES_SEPARATOR.join(campaign_types))
+    if client_geo:
+        parts.append(client_geo)
+    if targeting:
+        parts.append(targeting)
+    if goal:
+        parts.append(goal)
+    return NAME_SEPARATOR.join(parts) if parts else ""
+
+# Макросы площадок ({ad_id}, {keyword}, {utm_vacancy}) должны дойти до
+# площадки как есть, поэтому фигурные скобки не кодируются
+_SAFE_CHARS = "/{}"
+
+@functools.lru_cache(maxsize=65536)
+def encode_value(value):
+    return quote(value, safe=_SAFE_CHARS)
+
+@functools.lru_cache(maxsize=4096)
+def _split_base_link(base_link, replaced_keys):
+    # Делит ссылку на (адрес, оставшийся query, fragment). Параметры из
+    # replaced_keys выкидываются из query — их значения задаёт UTM.
+    # Остальные параметры сохраняются без перекодирования.
+    rest, _, fragment = base_link.partition("#")
+    head, _, query = rest.partition("?")
+    kept = [
+        pair for pair in query.split("&")
+        if pair and unquote_plus(pair.partition("=")[0]) not in replaced_keys
+    ]
+    return head, "&".join(kept), fragment
+
+def _compose_url(head, kept_query, utm_query, fragment):
+    query = "&".join(part for part in (kept_query, utm_query) if part)
+    return head + ("?" + query if query else "") + ("#" + fragment if fragment else "")
+
+def build_utm_url(base_link, utm_source="", utm_medium="", utm_campaign="",
+                  utm_content="", utm_term="", utm_vacancy=""):
+    values = (utm_source, utm_medium, utm_campaign, utm_content, utm_term, utm_vacancy)
+    params = [(key, value) for key, value in zip(UTM_KEYS, values) if value]
+    if not params:
+        return base_link
+
+    utm_query = "&".join(f"{key}={encode_value(value)}" for key, value in params)
+    head, kept_query, fragment = _split_base_link(base_link, frozenset(key for key, _ in params))
+    return _compose_url(head, kept_query, utm_query, fragment)
+
+# ============================================================
+# ПАКЕТНАЯ СБОРКА (pandas)
+# ============================================================
+
+def _text_column(data, key, index):
+    import pandas as pd
+
+    if key not in data:
+        return pd.Series("", index=index, dtype=str)
+    column = pd.Series(data[key], index=index) if not isinstance(data[key], pd.Series) else data[key]
+    if pd.api.types.is_float_dtype(column):
+        # Числовая колонка с пропусками читается как float: id 116482958
+        # превратился бы в "116482958.0". Целые значения пишем без дробной части
+        values = column.dropna()
+        if values.map(float.is_integer).all():
+            return column.astype("Int64").astype("string").fillna("").astype(str)
+    return column.fillna("").astype(str)
+
+def _types_column(data, index):
+    import pandas as pd
+
+    if "campaign_types" not in data:
+        return pd.Series("", index=index, dtype=str)
+    column = data["campaign_types"]
+    if not isinstance(column, pd.Series):
+        column = pd.Series(column, index=index)
+    # В пакетном режиме типы приходят либо списком, либо уже склеенными через "&"
+    return column.map(
+        lambda value: TYPES_SEPARATOR.join(value) if isinstance(value, (list, tuple)) else value
+    ).fillna("").astype(str)
+
+def _join_nonempty(columns, separator):
+    result = columns[0]
+    for column in columns[1:]:
+        joiner = ((result != "") & (column != "")).map({True: separator, False: ""}).astype(str)
+        result = result + joiner + column
+    return result
+
+def _frame_index(data):
+    import pandas as pd
+
+    if isinstance(data, pd.DataFrame):
+        return data.index
+    for value in data.values():
+        if isinstance(value, pd.Series):
+            return value.index
+        return pd.RangeIndex(len(value))
+    return pd.RangeIndex(0)
+
+def build_names(data):
+    # data: DataFrame или словарь «колонка → массив» с ключами из NAMING_FIELDS
+    index = _frame_index(data)
+    columns = [
+        _types_column(data, index) if key == "campaign_types" else _text_column(data, key, index)
+        for key in NAMING_FIELDS
+    ]
+    return _join_nonempty(columns, NAME_SEPARATOR).rename("name")
+
+def _encoded_column(column):
+    # Значения кодируются один раз на уникальное значение колонки
+    import pandas as pd
+
+    codes, uniques = pd.factorize(column)
+    encoded = pd.Series([encode_value(value) for value in uniques], dtype=object)
+    return pd.Series(encoded.to_numpy()[codes], index=column.index, dtype=str)
+
+def build_utm_urls(data, names=None):
+    # utm_campaign берётся из колонки, а если она пустая — из нейминга (как в сайдбаре)
+    import pandas as pd
+
+    index = _frame_index(data)
+    if names is None:
+        names = build_names(data)
+
+    base = _text_column(data, "base_link", index)
+    parts = []
+    keys_mask = pd.Series(0, index=index)
+    for bit, key in enumerate(UTM_KEYS):
+        value = _text_column(data, key, index)
+        if key == "utm_campaign":
+            value = value.where(value != "", names)
+        present = value != ""
+        keys_mask = keys_mask + present.astype(int) * (1 << bit)
+        parts.append((key + "=" + _encoded_column(value)).where(present, ""))
+    utm_query = _join_nonempty(parts, "&")
+
+    # Разбор базовой ссылки зависит только от пары (ссылка, набор ключей),
+    # таких пар в выгрузке единицы — считаем их по одному разу
+    pair_codes, pairs = pd.factorize(pd.MultiIndex.from_arrays([base, keys_mask]))
+    split = [
+        _split_base_link(link, frozenset(key for bit, key in enumerate(UTM_KEYS) if mask >> bit & 1))
+        for link, mask in pairs
+    ]
+    head, kept_query, fragment = (
+        pd.Series([item[i] for item in split], dtype=object).to_numpy()[pair_codes] for i in range(3)
+    )
+    head = pd.Series(head, index=index, dtype=str)
+    query = _join_nonempty([pd.Series(kept_query, index=index, dtype=str), utm_query], "&")
+    fragment = pd.Series(fragment, index=index, dtype=str)
+
+    urls = head + ("?" + query).where(query != "", "") + ("#" + fragment).where(fragment != "", "")
+    return urls.where(utm_query != "", base).rename("utm_url")
@@ -0,0 +1,205 @@
+import csv
+import io
+import os
+
+from name_generator.engine import TYPES_SEPARATOR, UTM_KEYS
+from name_generator.normalize import fit_length
+
+# ============================================================
+# ВЫГРУЗКИ ДЛЯ РЕКЛАМНЫХ КАБИНЕТОВ
+# ============================================================
+#
+# Строка выгрузки — запись плана вместе с результатом генерации
+# (name, utm_url, errors), как в результате массовой загрузки и CLI.
+# Строки с ошибками не выгружаются: в кабинет уходят только корректные.
+#
+# Писатели пишут построчно: CSV — сразу в файл, XLSX — через write_only
+# режим openpyxl (строки сбрасываются во временный файл), поэтому память
+# не зависит от числа строк. Колонки, которые генератор не знает
+# (тексты, фразы), остаются пустыми и заполняются в кабинете.
+#
+# Названия длиннее лимита кабинета сокращаются детерминированно
+# (normalize.fit_length): начало + хэш полного нейминга. Ссылка и
+# utm_campaign в ней не меняются.
+
+# Лимиты длины названий кампании/группы/объявления в кабинетах
+NAME_LIMITS = {
+    "yandex_direct": 255,
+    "vk_ads": 100,
+}
+
+def _value(key):
+    return lambda row: row.get(key) or ""
+
+def _types(row):
+    value = row.get("campaign_types") or ""
+    return ", ".join(value if isinstance(value, list) else value.split(TYPES_SEPARATOR))
+
+def split_utm_url(url):
+    # utm_url → (ссылка без UTM-меток, метки). build_utm_url ставит метки
+    # в конец query, поэтому отделяется хвост из пар utm_*; прочие
+    # параметры базовой ссылки и fragment остаются в ссылке
+    rest, _, fragment = url.partition("#")
+    head, _, query = rest.partition("?")
+    pairs = query.split("&") if query else []
+    split = len(pairs)
+    while split and pairs[split - 1].partition("=")[0] in UTM_KEYS:
+        split -= 1
+    link = head + ("?" + "&".join(pairs[:split]) if split else "") + ("#" + fragment if fragment else "")
+    return link, "&".join(pairs[split:])
+
+def join_utm_url(link, tags):
+    # Обратная операция — так кабинет дописывает метки к ссылке
+    if not tags:
+        return link
+    rest, _, fragment = link.partition("#")
+    rest += ("&" if "?" in rest else "?") + tags
+    return rest + ("#" + fragment if fragment else "")
+
+def _utm_link(row):
+    return split_utm_url(row.get("utm_url") or "")[0]
+
+def _utm_query(row):
+    return split_utm_url(row.get("utm_url") or "")[1]
+
+def _constant(value):
+    return lambda row: value
+
+def _name(platform):
+    limit = NAME_LIMITS.get(platform)
+    return lambda row: fit_length(row.get("name") or "", limit)
+
+class Layout:
+    __slots__ = ("key", "title", "sheet", "columns", "encoding", "delimiter")
+
+    def __init__(self, key, title, sheet, columns, encoding="utf-8-sig", delimiter=";"):
+        self.key = key
+        self.title = title
+        self.sheet = sheet
+        # [(заголовок, функция строки → значение)]
+        self.columns = columns
+        self.encoding = encoding
+        self.delimiter = delimiter
+
+    @property
+    def header(self):
+        return [header for header, _ in self.columns]
+
+    def values(self, row):
+        return [get(row) for _, get in self.columns]
+
+LAYOUTS = {
+    # Шаблон импорта Директ Коммандера: одна строка — группа с объявлением.
+    # Коммандер под Windows ждёт CSV в cp1251 через ";"
+    "yandex_direct": Layout("yandex_direct", "Яндекс Директ (Коммандер)", "Тексты", [
+        ("Название кампании", _name("yandex_direct")),
+        ("Название группы", _name("yandex_direct")),
+        ("Тип объявления", _constant("Текстово-графическое")),
+        ("Фраза (с минус-словами)", _constant("")),
+        ("Заголовок 1", _constant("")),
+        ("Заголовок 2", _constant("")),
+        ("Текст", _constant("")),
+        ("Ссылка", _value("utm_url")),
+        ("Отображаемая ссылка", _constant("")),
+        ("Метки", _types),
+    ], encoding="cp1251"),
+    # Массовое создание в VK Рекламе: ссылка и UTM-метки отдельными колонками.
+    # Кабинет сам дописывает метки к ссылке, поэтому в «Ссылке» их нет
+    "vk_ads": Layout("vk_ads", "VK Реклама", "Объявления", [
+        ("Кампания", _name("vk_ads")),
+        ("Группа объявлений", _name("vk_ads")),
+        ("Объявление", _name("vk_ads")),
+        ("Ссылка", _utm_link),
+        ("UTM-метки", _utm_query),
+    ], encoding="utf-8-sig", delimiter=","),
+}
+
+EXPORT_FORMATS = ("xlsx", "csv")
+EXPORT_MIME = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+}
+
+def export_format(path):
+    return "xlsx" if path.lower().endswith((".xlsx", ".xlsm")) else "csv"
+
+# ============================================================
+# ПИСАТЕЛИ
+# ============================================================
+
+class CsvExportWriter:
+    def __init__(self, output, layout):
+        # output — путь или бинарный файл; кодировка задаётся раскладкой,
+        # символы вне cp1251 заменяются "?"
+        self._own = isinstance(output, (str, os.PathLike))
+        self._binary = open(output, "wb") if self._own else output
+        self._handle = io.TextIOWrapper(self._binary, encoding=layout.encoding, errors="replace",
+                                        newline="", write_through=False)
+        self._layout = layout
+        self._writer = csv.writer(self._handle, delimiter=layout.delimiter)
+        self._writer.writerow(layout.header)
+        self.rows = 0
+
+    def write(self, row):
+        self._writer.writerow(self._layout.values(row))
+        self.rows += 1
+
+    def close(self):
+        self._handle.flush()
+        if self._own:
+            self._handle.close()
+        else:
+            # Файл вызывающего остаётся открытым
+            self._handle.detach()
+
+class XlsxExportWriter:
+    def __init__(self, output, layout):
+        try:
+            from openpyxl import Workbook
+            from openpyxl.cell import WriteOnlyCell
+            from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+            from openpyxl.styles import Font
+        except ImportError as exc:
+            raise RuntimeError("Для выгрузки в XLSX установите пакет openpyxl") from exc
+
+        self._output = output
+        self._layout = layout
+        self._illegal = ILLEGAL_CHARACTERS_RE
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet(layout.sheet)
+        header = []
+        for title in layout.header:
+            cell = WriteOnlyCell(self._sheet, value=title)
+            cell.font = Font(bold=True)
+            header.append(cell)
+        self._sheet.append(header)
+        self.rows = 0
+
+    def write(self, row):
+        self._sheet.append([self._illegal.sub("", value) if isinstance(value, str) else value
+                            for value in self._layout.values(row)])
+        self.rows += 1
+
+    def close(self):
+        self._workbook.save(self._output)
+
+EXPORT_WRITERS = {"csv": CsvExportWriter, "xlsx": XlsxExportWriter}
+
+def open_export(output, platform, export_format):
+    return EXPORT_WRITERS[export_format](output, LAYOUTS[platform])
+
+def export_rows(rows, output, platform, export_format):
+    # rows — итератор словарей-строк результата; возвращает число выгруженных
+    writer = open_export(output, platform, export_format)
+    try:
+        for row in rows:
+            if not row.get("errors"):
+                writer.write(row)
+    finally:
+        writer.close()
+    return writer.rows
+
+def read_result_rows(path):
+    # Строки CSV-результата массовой загрузки, потоком
+    with open(path, encoding="utf-8-sig", newline="") as handle:
+        yield from csv.DictReader(handle)
@@ -0,0 +1,137 @@
+import threading
+
+from name_generator.engine import NAMING_FIELDS
+from name_generator.storage import DataVersion, connect
+
+# ============================================================
+# ИСТОРИЯ СГЕНЕРИРОВАННЫХ НЕЙМИНГОВ
+# ============================================================
+#
+# Каждый скопированный нейминг с UTM-ссылкой попадает в таблицу history.
+# Сегменты нейминга лежат в отдельных колонках с индексами, полнотекстовый
+# поиск идёт через FTS5 (external content, синхронизируется триггерами).
+#
+# Проверка «этот нейминг уже кто-то использовал» не ходит в таблицу:
+# при старте в память загружается словарь «нейминг → (автор, дата)»
+# первого использования, дальше он дочитывается только новыми строками,
+# когда PRAGMA data_version показывает запись из другого соединения.
+
+SEGMENT_FIELDS = tuple(field for field in NAMING_FIELDS if field != "campaign_types")
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    utm_url TEXT NOT NULL DEFAULT '',
+    author TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime')),
+    {", ".join(f"{field} TEXT NOT NULL DEFAULT ''" for field in NAMING_FIELDS)}
+);
+CREATE UNIQUE INDEX IF NOT EXISTS history_unique ON history (name, utm_url, author);
+CREATE INDEX IF NOT EXISTS history_created ON history (created_at);
+{"".join(f"CREATE INDEX IF NOT EXISTS history_{field} ON history ({field}, created_at);" for field in SEGMENT_FIELDS)}
+CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5 (
+    name, utm_url, author, campaign_types,
+    content='history', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS history_fts_insert AFTER INSERT ON history BEGIN
+    INSERT INTO history_fts (rowid, name, utm_url, author, campaign_types)
+    VALUES (new.id, new.name, new.utm_url, new.author, new.campaign_types);
+END;
+CREATE TRIGGER IF NOT EXISTS history_fts_delete AFTER DELETE ON history BEGIN
+    INSERT INTO history_fts (history_fts, rowid, name, utm_url, author, campaign_types)
+    VALUES ('delete', old.id, old.name, old.utm_url, old.author, old.campaign_types);
+END;
+"""
+
+COLUMNS = ("id", "created_at", "author", "name", "utm_url") + NAMING_FIELDS
+
+def _fts_phrase(text):
+    # Пользовательский ввод — всегда фраза, а не синтаксис запроса FTS5.
+    # Токенизатор делит нейминг по "_", "&" и "-", так что фраза
+    # "segment6-12" совпадёт ровно с этим значением сегмента.
+    return '"' + text.replace('"', '""') + '"'
+
+class HistoryStore:
+    def __init__(self, path=None):
+        self._conn = connect(path)
+        self._lock = threading.Lock()
+        self._used = {}
+        self._last_id = 0
+        with self._lock:
+            self._conn.executescript(SCHEMA)
+            self._data_version = DataVersion(self._conn)
+            self._load_new()
+
+    def _load_new(self):
+        # Дочитывает строки, появившиеся после последней загрузки; для
+        # нейминга запоминается только первое использование
+        rows = self._conn.execute(
+            "SELECT id, name, author, created_at FROM history WHERE id > ? ORDER BY id",
+            (self._last_id,),
+        )
+        for row_id, name, author, created_at in rows:
+            self._used.setdefault(name, (author, created_at))
+            self._last_id = row_id
+
+    def _refresh(self):
+        if self._data_version.changed():
+            self._load_new()
+
+    def first_use(self, name):
+        # (автор, дата) первого использования нейминга или None
+        if not name:
+            return None
+        with self._lock:
+            self._refresh()
+            return self._used.get(name)
+
+    def record(self, name, utm_url="", author="", segments=None):
+        # Возвращает False, если такая же запись (нейминг, ссылка, автор) уже есть
+        if not name:
+            return False
+        segments = dict(segments or {})
+        types = segments.get("campaign_types", "")
+        if isinstance(types, (list, tuple)):
+            segments["campaign_types"] = "&".join(types)
+        values = [segments.get(field, "") or "" for field in NAMING_FIELDS]
+        with self._lock:
+            self._refresh()
+            inserted = self._conn.execute(
+                f"INSERT OR IGNORE INTO history (name, utm_url, author, {', '.join(NAMING_FIELDS)}) "
+                f"VALUES (?, ?, ?, {', '.join('?' * len(NAMING_FIELDS))})",
+                [name, utm_url, author.strip()] + values,
+            ).rowcount
+            self._data_version.mark()
+            self._load_new()
+        return bool(inserted)
+
+    def search(self, text="", segments=None, limit=200):
+        # text — полнотекстовый поиск по неймингу, ссылке и автору;
+        # segments — точные значения сегментов {поле: значение}
+        conditions = []
+        params = []
+        match = [_fts_phrase(word) + "*" for word in text.split()]
+        for field, value in (segments or {}).items():
+            if not value:
+                continue
+            if field == "campaign_types":
+                # Тип кампании — один из значений через "&", ищется через FTS
+                match.append("campaign_types : " + _fts_phrase(value))
+            elif field in SEGMENT_FIELDS:
+                conditions.append(f"{field} = ?")
+                params.append(value)
+        if match:
+            conditions.append("id IN (SELECT rowid FROM history_fts WHERE history_fts MATCH ?)")
+            params.append(" AND ".join(match))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM history {where} ORDER BY id DESC LIMIT ?",
+                params + [limit],
+            ).fetchall()
+        return [dict(zip(COLUMNS, row)) for row in rows]
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
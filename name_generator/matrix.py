@@ -0,0 +1,78 @@
+import csv
+import itertools
+import math
+
+from name_generator.engine import NAMING_FIELDS, UTM_KEYS, build_name, build_utm_url
+
+# ============================================================
+# МАТРИЦА КОМБИНАЦИЙ (ДЕКАРТОВО ПРОИЗВЕДЕНИЕ)
+# ============================================================
+#
+# selection — словарь «поле → список значений». Пустой список означает,
+# что поле не заполнено. Комбинации никогда не собираются в список:
+# количество считается произведением длин, страница — прямым вычислением
+# комбинации по её номеру, экспорт — генератором.
+
+# utm_campaign не перебирается: он всегда равен неймингу комбинации
+MATRIX_FIELDS = NAMING_FIELDS + tuple(key for key in UTM_KEYS if key != "utm_campaign")
+
+EXPORT_COLUMNS = MATRIX_FIELDS + ("name", "utm_url")
+
+def _axes(selection):
+    return [list(selection.get(field) or [""]) for field in MATRIX_FIELDS]
+
+def count_combinations(selection):
+    return math.prod(len(axis) for axis in _axes(selection))
+
+def _build_row(values, base_link):
+    row = dict(zip(MATRIX_FIELDS, values))
+    name = build_name(
+        row["product"], row["stream"], row["expense"], row["source"],
+        [row["campaign_types"]] if row["campaign_types"] else [],
+        row["client_geo"], row["targeting"], row["goal"],
+    )
+    row["name"] = name
+    row["utm_url"] = build_utm_url(
+        base_link, row["utm_source"], row["utm_medium"], name,
+        row["utm_content"], row["utm_term"], row["utm_vacancy"],
+    )
+    return row
+
+def combination_at(selection, index, base_link="", axes=None):
+    # Номер комбинации раскладывается в смешанной системе счисления,
+    # порядок совпадает с itertools.product (последнее поле меняется быстрее всех)
+    if axes is None:
+        axes = _axes(selection)
+    values = []
+    for axis in reversed(axes):
+        index, position = divmod(index, len(axis))
+        values.append(axis[position])
+    return _build_row(reversed(values), base_link)
+
+def iter_combinations(selection, base_link="", start=0, stop=None):
+    axes = _axes(selection)
+    total = math.prod(len(axis) for axis in axes)
+    stop = total if stop is None else min(stop, total)
+    if start >= stop:
+        return
+    if start == 0:
+        for values in itertools.islice(itertools.product(*axes), stop):
+            yield _build_row(values, base_link)
+        return
+    for index in range(start, stop):
+        yield combination_at(selection, index, base_link, axes)
+
+def get_page(selection, page, page_size, base_link=""):
+    start = page * page_size
+    return list(iter_combinations(selection, base_link, start, start + page_size))
+
+def write_csv(selection, output, base_link="", on_progress=None, progress_every=50000):
+    writer = csv.DictWriter(output, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    written = 0
+    for row in iter_combinations(selection, base_link):
+        writer.writerow(row)
+        written += 1
+        if on_progress is not None and written % progress_every == 0:
+            on_progress(written)
+    return written
@@ -0,0 +1,215 @@
+import contextlib
+import os
+import threading
+import time
+
+# ============================================================
+# МЕТРИКИ ПРОГОНОВ (ОПЦИОНАЛЬНО)
+# ============================================================
+#
+# Включаются переменной окружения NAME_GENERATOR_METRICS=1.
+#   NAME_GENERATOR_METRICS_FILE      — файл, куда периодически пишется
+#                                      снимок в текстовом формате Prometheus;
+#   NAME_GENERATOR_METRICS_INTERVAL  — период записи файла, секунды (15);
+#   NAME_GENERATOR_METRICS_PORT      — порт HTTP-эндпоинта /metrics.
+#
+# Когда метрики выключены, section() возвращает общий nullcontext,
+# а остальные функции выходят на первой проверке флага.
+#
+# widgets_per_run — число интерактивных виджетов прогона: app.py вызывает
+# add_widgets рядом с каждым st.button/st.text_input/st.selectbox и
+# компонентом копирования. Текст, подсказки и HTML не считаются.
+
+ENABLED = os.environ.get("NAME_GENERATOR_METRICS", "") not in ("", "0")
+
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+RERUN_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500)
+WIDGET_BUCKETS = (10, 25, 50, 100, 250, 500, 1000)
+
+# Сессия считается активной, если её прогон был за последние N секунд
+ACTIVE_SESSION_WINDOW = 300
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += value
+        self.count += 1
+
+    def render(self, name, labels=""):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels}{"," if labels else ""}le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels}{"," if labels else ""}le="+Inf"}} {self.count}')
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {self.total:.3f}")
+        lines.append(f"{name}_count{suffix} {self.count}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sections = {}
+        self._run = Histogram(BUCKETS_MS)
+        self._widgets = Histogram(WIDGET_BUCKETS)
+        self._sessions = {}
+        self._reruns_total = 0
+
+    def observe_section(self, name, ms):
+        with self._lock:
+            histogram = self._sections.get(name)
+            if histogram is None:
+                histogram = self._sections[name] = Histogram(BUCKETS_MS)
+            histogram.observe(ms)
+
+    def observe_run(self, session_id, ms, widgets):
+        with self._lock:
+            self._run.observe(ms)
+            self._widgets.observe(widgets)
+            self._reruns_total += 1
+            # Сессия переносится в конец словаря, поэтому в начале —
+            # давно не активные: их и удаляем
+            now = time.monotonic()
+            reruns, _ = self._sessions.pop(session_id, (0, 0))
+            self._sessions[session_id] = (reruns + 1, now)
+            self._evict_sessions(now)
+
+    def _evict_sessions(self, now):
+        while self._sessions:
+            session_id = next(iter(self._sessions))
+            if now - self._sessions[session_id][1] <= ACTIVE_SESSION_WINDOW:
+                return
+            del self._sessions[session_id]
+
+    def render_prometheus(self):
+        with self._lock:
+            self._evict_sessions(time.monotonic())
+            active = self._sessions
+            per_session = Histogram(RERUN_BUCKETS)
+            for reruns, _ in active.values():
+                per_session.observe(reruns)
+
+            lines = ["# TYPE name_generator_section_ms histogram"]
+            for name, histogram in sorted(self._sections.items()):
+                lines += histogram.render("name_generator_section_ms", f'section="{name}"')
+            lines.append("# TYPE name_generator_run_ms histogram")
+            lines += self._run.render("name_generator_run_ms")
+            lines.append("# TYPE name_generator_widgets_per_run histogram")
+            lines += self._widgets.render("name_generator_widgets_per_run")
+            lines.append("# TYPE name_generator_reruns_total counter")
+            lines.append(f"name_generator_reruns_total {self._reruns_total}")
+            lines.append("# TYPE name_generator_active_sessions gauge")
+            lines.append(f"name_generator_active_sessions {len(active)}")
+            lines.append("# TYPE name_generator_reruns_per_session histogram")
+            lines += per_session.render("name_generator_reruns_per_session")
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+# ============================================================
+# API ДЛЯ ПРИЛОЖЕНИЯ
+# ============================================================
+
+_NULL_SECTION = contextlib.nullcontext()
+_current = threading.local()
+
+class _Section:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        registry.observe_section(self.name, (time.perf_counter() - self.started) * 1000)
+
+def section(name):
+    return _Section(name) if ENABLED else _NULL_SECTION
+
+def begin_run(session_id):
+    # Каждая сессия Streamlit выполняется в своём потоке,
+    # поэтому состояние текущего прогона хранится в threading.local
+    if not ENABLED:
+        return
+    start_exporters()
+    _current.session_id = session_id
+    _current.started = time.perf_counter()
+    _current.widgets = 0
+
+def add_widgets(count):
+    if ENABLED:
+        _current.widgets = getattr(_current, "widgets", 0) + count
+
+def end_run():
+    if not ENABLED or getattr(_current, "started", None) is None:
+        return
+    registry.observe_run(_current.session_id, (time.perf_counter() - _current.started) * 1000,
+                         _current.widgets)
+    _current.started = None
+
+# ============================================================
+# ЭКСПОРТ
+# ============================================================
+
+_exporters_lock = threading.Lock()
+_exporters_started = False
+
+def _flush_loop(path, interval):
+    while True:
+        time.sleep(interval)
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            handle.write(registry.render_prometheus())
+        os.replace(temporary, path)
+
+def _serve(port):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    ThreadingHTTPServer(("0.0.0.0", port), Handler).serve_forever()
+
+def start_exporters():
+    global _exporters_started
+    if _exporters_started:
+        return
+    with _exporters_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+    path = os.environ.get("NAME_GENERATOR_METRICS_FILE")
+    if path:
+        interval = float(os.environ.get("NAME_GENERATOR_METRICS_INTERVAL", "15"))
+        threading.Thread(target=_flush_loop, args=(path, interval), daemon=True,
+                         name="metrics-flush").start()
+    port = os.environ.get("NAME_GENERATOR_METRICS_PORT")
+    if port:
+        threading.Thread(target=_serve, args=(int(port),), daemon=True,
+                         name="metrics-http").start()
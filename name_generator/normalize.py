@@ -0,0 +1,140 @@
+import functools
+import hashlib
+import re
+
+from name_generator.translit import CYRILLIC_TO_LATIN
+
+# ============================================================
+# НОРМАЛИЗАЦИЯ ЗНАЧЕНИЙ
+# ============================================================
+#
+# Своё значение поля (кнопка ➕, строка плана) приводится к виду, который
+# не ломает склейку нейминга и сопоставление в аналитике:
+#
+#   «Яндекс Еда_Курьер» → «yandeks-eda-kurer»
+#
+# кириллица транслитерируется, регистр — нижний, разделители нейминга
+# ("_", "&") и пробелы превращаются в "-", остальные символы вне белого
+# списка удаляются. Вся посимвольная работа — один str.translate по
+# таблице; таблица достраивается при первой встрече символа и дальше
+# работает как обычный словарь.
+#
+# Значение, совпадающее со значением словаря после нормализации,
+# заменяется словарным («RTK-Seller» → «RTK-seller»): существующие значения
+# не переписываются.
+
+# Белые списки: сегмент нейминга и значение UTM-метки. В UTM допустимы
+# макросы кабинетов ({ad_id}, {keyword}) и "_". utm_campaign не
+# нормализуется: это нейминг, и "&" между типами кампании в нём нужен
+KINDS = {
+    "segment": "abcdefghijklmnopqrstuvwxyz0123456789-",
+    "utm": "abcdefghijklmnopqrstuvwxyz0123456789-_.{}",
+}
+
+# Символы, которые становятся дефисом (если сами не в белом списке)
+DASH_CHARS = " \t_&/\\|.,;:+—–"
+
+# Длина хэша при сокращении до лимита кабинета
+HASH_LENGTH = 6
+
+_DASHES = re.compile(r"-{2,}")
+_MACRO = re.compile(r"(\{[^{}]*\})")
+
+class _Table(dict):
+    # Таблица для str.translate: промах считается один раз и запоминается
+    __slots__ = ("allowed",)
+
+    def __init__(self, allowed):
+        super().__init__()
+        self.allowed = frozenset(allowed)
+
+    def __missing__(self, code):
+        char = chr(code)
+        lower = char.lower()
+        if lower in self.allowed:
+            value = lower
+        elif lower in CYRILLIC_TO_LATIN:
+            value = CYRILLIC_TO_LATIN[lower]
+        elif char in DASH_CHARS or char.isspace():
+            value = "-"
+        else:
+            value = None
+        self[code] = value
+        return value
+
+TABLES = {kind: _Table(allowed) for kind, allowed in KINDS.items()}
+
+def field_kind(vocabulary_field):
+    return "utm" if vocabulary_field.startswith("utm_") else "segment"
+
+def normalize_value(value, kind="segment"):
+    if kind == "utm" and "{" in value:
+        # Макросы кабинетов ({AD_ID}, {keyword}) кабинет подставляет как
+        # есть — регистр и символы внутри скобок не трогаем
+        parts = _MACRO.split(value)
+        value = "".join(part if index % 2 else part.translate(TABLES[kind]) for index, part in enumerate(parts))
+    else:
+        value = value.translate(TABLES[kind])
+    if "--" in value:
+        value = _DASHES.sub("-", value)
+    return value.strip("-")
+
+def _options_key(options):
+    # Снимок словаря отдаёт кортеж; множества и списки упорядочиваются,
+    # чтобы индекс кэшировался и не зависел от порядка обхода
+    return options if isinstance(options, tuple) else tuple(sorted(options))
+
+@functools.lru_cache(maxsize=64)
+def canonical_index(options, kind="segment"):
+    # Нормализованная форма → значение словаря (первое при совпадении).
+    # Строится один раз на версию словаря
+    index = {}
+    for option in options:
+        index.setdefault(normalize_value(option, kind), option)
+    return index
+
+def canonicalize(value, options, kind="segment"):
+    if value in options:
+        return value
+    normalized = normalize_value(value, kind)
+    return canonical_index(_options_key(options), kind).get(normalized, normalized)
+
+# ============================================================
+# ЛИМИТ ДЛИНЫ
+# ============================================================
+#
+# Сокращение детерминированное: начало значения + "-" + хэш полного
+# значения. Разные длинные названия с общим началом остаются разными,
+# одно и то же название всегда сокращается одинаково.
+
+def _digest(value):
+    return hashlib.blake2b(value.encode("utf-8"), digest_size=8).hexdigest()[:HASH_LENGTH]
+
+def fit_length(value, limit):
+    if not limit or len(value) <= limit:
+        return value
+    head = value[:max(limit - HASH_LENGTH - 1, 0)].rstrip("-_&")
+    return f"{head}-{_digest(value)}" if head else _digest(value)[:limit]
+
+# ============================================================
+# ПАКЕТНЫЙ РЕЖИМ (pandas)
+# ============================================================
+
+def normalize_series(values, kind="segment", options=None):
+    # В колонке плана повторяются одни и те же значения: нормализуются
+    # только уникальные, результат разносится по строкам через map.
+    # Значения из словаря options возвращаются в словарном написании
+    values = values.fillna("").astype(str)
+    if options is not None:
+        options = frozenset(options)
+        index = canonical_index(_options_key(options), kind)
+        mapping = {}
+        for value in values.unique():
+            if value in options:
+                mapping[value] = value
+            else:
+                normalized = normalize_value(value, kind)
+                mapping[value] = index.get(normalized, normalized)
+    else:
+        mapping = {value: normalize_value(value, kind) for value in values.unique()}
+    return values.map(mapping)
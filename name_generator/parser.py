@@ -0,0 +1,147 @@
+from name_generator.engine import FIELD_VOCABULARY, NAMING_FIELDS
+
+# ============================================================
+# РАЗБОР НЕЙМИНГА ОБРАТНО НА ПОЛЯ
+# ============================================================
+#
+# split("_") неоднозначен: значения могут содержать "-", "&" и даже "_".
+# Поэтому для каждого поля из словаря строится префиксное дерево (trie),
+# и разбор идёт слева направо: на каждой позиции дерево поля отдаёт все
+# словарные значения, которые начинаются здесь и заканчиваются на
+# разделителе. Результаты для пар (позиция, поле) запоминаются, так что
+# время разбора линейно по длине имени.
+#
+# Сегмент, которого нет в словаре, берётся до ближайшего разделителя и
+# помечается как неизвестный. Из всех разборов выбирается тот, где больше
+# словарных значений.
+
+_END = ""
+_TYPES_FIELD = "campaign_types"
+
+def _build_trie(values):
+    root = {}
+    for value in values:
+        node = root
+        for char in value:
+            node = node.setdefault(char, {})
+        node[_END] = value
+    return root
+
+def _trie_matches(trie, name, pos):
+    # Все словарные значения, начинающиеся в позиции pos: (значение, конец)
+    node = trie
+    for end in range(pos, len(name)):
+        node = node.get(name[end])
+        if node is None:
+            return
+        if _END in node:
+            yield node[_END], end + 1
+
+class NameParser:
+    def __init__(self, vocabularies=None):
+        if vocabularies is None:
+            from name_generator.bulk import default_vocabularies
+            vocabularies = default_vocabularies()
+        self._tries = {
+            field: _build_trie(vocabularies.get(FIELD_VOCABULARY[field], ()))
+            for field in NAMING_FIELDS
+        }
+
+    # -------------------- одиночный разбор --------------------
+
+    def _tokens(self, field, name, pos, stops):
+        # Кандидаты для поля: словарные значения и один «неизвестный» сегмент
+        known_ends = set()
+        for value, end in _trie_matches(self._tries[field], name, pos):
+            if end == len(name) or name[end] in stops:
+                known_ends.add(end)
+                yield value, end, True
+        end = pos
+        while end < len(name) and name[end] not in stops:
+            end += 1
+        if end > pos and end not in known_ends:
+            yield name[pos:end], end, False
+
+    def parse(self, name):
+        memo = {}
+        last = len(NAMING_FIELDS) - 1
+
+        def best(pos, index):
+            # Возвращает (очки, [(поле, значение, известно)]) для хвоста имени
+            key = (pos, index)
+            if key in memo:
+                return memo[key]
+            if pos == len(name):
+                result = (0, [])
+            elif index > last:
+                result = None
+            else:
+                field = NAMING_FIELDS[index]
+                result = None
+                if field == _TYPES_FIELD:
+                    candidates = self._types_candidates(name, pos)
+                else:
+                    # Последнее поле забирает остаток строки целиком
+                    stops = "" if index == last else "_"
+                    candidates = (
+                        ([(field, value, known)], end)
+                        for value, end, known in self._tokens(field, name, pos, stops)
+                    )
+                for parts, end in candidates:
+                    if end < len(name):
+                        if name[end] != "_":
+                            continue
+                        end += 1
+                    rest = best(end, index + 1)
+                    if rest is None:
+                        continue
+                    score = rest[0] + sum(2 if known else -1 for _, _, known in parts)
+                    if result is None or score > result[0]:
+                        result = (score, parts + rest[1])
+            memo[key] = result
+            return result
+
+        parsed = best(0, 0) if name else (0, [])
+        return self._to_record(parsed[1] if parsed else [(NAMING_FIELDS[0], name, False)])
+
+    def _types_candidates(self, name, pos):
+        # Тип кампании — одно или несколько значений через "&"
+        def walk(pos, acc):
+            for value, end, known in self._tokens(_TYPES_FIELD, name, pos, "_&"):
+                parts = acc + [(_TYPES_FIELD, value, known)]
+                if end < len(name) and name[end] == "&":
+                    yield from walk(end + 1, parts)
+                else:
+                    yield parts, end
+        return walk(pos, [])
+
+    @staticmethod
+    def _to_record(parts):
+        record = {field: "" for field in NAMING_FIELDS}
+        types = []
+        unknown = []
+        for field, value, known in parts:
+            if field == _TYPES_FIELD:
+                types.append(value)
+            else:
+                record[field] = value
+            if not known:
+                unknown.append(f"{field}:{value}")
+        record[_TYPES_FIELD] = "&".join(types)
+        record["unknown"] = "; ".join(unknown)
+        record["valid"] = not unknown and all(record[field] for field in NAMING_FIELDS)
+        return record
+
+    # -------------------- пакетный разбор --------------------
+
+    def parse_series(self, names):
+        # Выгрузки содержат много повторов: каждое уникальное имя
+        # разбирается один раз, результат раздаётся по кодам factorize
+        import pandas as pd
+
+        codes, uniques = pd.factorize(names.fillna("").astype(str))
+        parsed = pd.DataFrame.from_records([self.parse(name) for name in uniques],
+                                           columns=list(NAMING_FIELDS) + ["unknown", "valid"])
+        result = parsed.take(codes)
+        result.index = names.index
+        return result
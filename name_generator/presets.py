@@ -0,0 +1,83 @@
+import json
+import threading
+
+from name_generator.engine import NAMING_FIELDS
+from name_generator.storage import DataVersion, connect
+
+# ============================================================
+# ПРЕСЕТЫ ФОРМЫ
+# ============================================================
+#
+# Пресет — именованный набор полей черновика (query-параметры
+# CampaignDraft), полный или частичный. Хранится в общей базе; список
+# держится в памяти процесса и перечитывается, только когда
+# PRAGMA data_version показывает запись из другого соединения.
+# Чаще применяемые пресеты идут первыми.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS presets (
+    name TEXT PRIMARY KEY,
+    params TEXT NOT NULL,
+    uses INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+CREATE INDEX IF NOT EXISTS presets_uses ON presets (uses DESC, name);
+"""
+
+class Preset:
+    __slots__ = ("name", "params", "uses")
+
+    def __init__(self, name, params, uses):
+        self.name = name
+        self.params = params
+        self.uses = uses
+
+    def is_partial(self):
+        return not all(field in self.params for field in NAMING_FIELDS)
+
+class PresetStore:
+    def __init__(self, path=None):
+        self._conn = connect(path)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.executescript(SCHEMA)
+            self._data_version = DataVersion(self._conn)
+            self._presets = self._load()
+
+    def _load(self):
+        rows = self._conn.execute("SELECT name, params, uses FROM presets ORDER BY uses DESC, name")
+        return tuple(Preset(name, json.loads(params), uses) for name, params, uses in rows)
+
+    def _write(self, sql, params):
+        with self._lock:
+            changed = self._conn.execute(sql, params).rowcount
+            self._data_version.mark()
+            self._presets = self._load()
+        return bool(changed)
+
+    def all(self):
+        with self._lock:
+            if self._data_version.changed():
+                self._presets = self._load()
+            return self._presets
+
+    def get(self, name):
+        return next((preset for preset in self.all() if preset.name == name), None)
+
+    def save(self, name, params):
+        # Сохранение под существующим именем перезаписывает поля, счётчик остаётся
+        name = name.strip()
+        if not name or not params:
+            return False
+        return self._write(
+            "INSERT INTO presets (name, params) VALUES (?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET params = excluded.params, "
+            "updated_at = datetime('now', 'localtime')",
+            (name, json.dumps(params, ensure_ascii=False)),
+        )
+
+    def delete(self, name):
+        return self._write("DELETE FROM presets WHERE name = ?", (name,))
+
+    def mark_used(self, name):
+        return self._write("UPDATE presets SET uses = uses + 1 WHERE name = ?", (name,))
@@ -0,0 +1,349 @@
+import hashlib
+import io
+import json
+import threading
+
+from name_generator.engine import NAMING_FIELDS
+from name_generator.storage import connect
+
+# ============================================================
+# СВЕРКА РАСХОДОВ С СЕССИЯМИ ПО СЕГМЕНТАМ НЕЙМИНГА
+# ============================================================
+#
+# python -m name_generator reconcile --costs direct.csv vk.csv --sessions metrika.csv --by product stream
+#
+# Расходы из выгрузок кабинетов (кампания → расход, клики) и сессии из
+# выгрузок аналитики (utm_campaign → сессии, конверсии) сводятся по
+# кампании: нейминг и есть utm_campaign. Название кампании разбирается
+# на восемь полей (parser.NameParser), и итог группируется по сегментам.
+#
+# Файлы читаются чанками, в памяти — только текущий чанк и суммы по
+# кампаниям. Суммы по файлу (частичный результат) кэшируются в общей
+# базе по хэшу содержимого: при повторной сверке заново читаются только
+# новые или изменённые файлы. Разбор названий не кэшируется — он зависит
+# от словарей и идёт по уникальным кампаниям, а не по строкам.
+#
+# Кампании и сегменты хранятся в pandas category: строк в выгрузках
+# много, уникальных значений мало.
+
+DEFAULT_CHUNKSIZE = 100_000
+
+# Версия формата частичного результата: при смене старый кэш не читается
+PARTIAL_VERSION = 2
+
+# Колонки ищутся по заголовку без учёта регистра. Первое поле — кампания,
+# required — без колонки файл не читается; count_rows — без колонки
+# каждая строка считается за единицу (выгрузка «одна строка — сессия»)
+class Source:
+    __slots__ = ("kind", "title", "fields", "required", "count_rows")
+
+    def __init__(self, kind, title, fields, required, count_rows=()):
+        self.kind = kind
+        self.title = title
+        # {поле: (варианты заголовка)}
+        self.fields = fields
+        self.required = required
+        self.count_rows = count_rows
+
+    @property
+    def measures(self):
+        return tuple(field for field in self.fields if field != "campaign")
+
+SOURCES = {
+    "costs": Source("costs", "Расходы", {
+        "campaign": ("campaign", "campaign name", "campaign_name", "кампания", "название кампании",
+                     "utm_campaign"),
+        "cost": ("cost", "spend", "amount spent", "расход", "расход (руб.)", "расход, ₽", "расход, руб.",
+                 "потрачено", "затраты", "стоимость"),
+        "clicks": ("clicks", "клики"),
+    }, required=("campaign", "cost")),
+    "sessions": Source("sessions", "Сессии", {
+        "campaign": ("utm_campaign", "utm campaign", "метка utm_campaign", "campaign", "session campaign",
+                     "кампания"),
+        "sessions": ("sessions", "visits", "сессии", "сеансы", "визиты"),
+        "conversions": ("conversions", "goals", "конверсии", "достижения целей", "достижения цели"),
+    }, required=("campaign",), count_rows=("sessions",)),
+}
+
+METRICS = ("cost", "clicks", "sessions", "conversions")
+
+# Сегмент кампаний, название которых не разбирается по словарям
+OUTSIDE_NAMING = "(вне нейминга)"
+
+# Сколько строк в начале файла просматривается в поисках заголовка:
+# отчёты Директа начинаются со строки с названием отчёта
+HEADER_SCAN_LINES = 20
+HEAD_BYTES = 64 * 1024
+
+# Строкой, а не re.compile: так pandas чистит колонку средствами pyarrow
+_NOT_NUMBER = r"[^\d,.\-]"
+
+# ============================================================
+# ЧТЕНИЕ ВЫГРУЗОК
+# ============================================================
+
+def _head(source):
+    # Загруженный файл (BytesIO) читается всегда с начала: его могли уже
+    # прочитать при подсчёте хэша или прошлой сверке
+    if hasattr(source, "read"):
+        source.seek(0)
+        head = source.read(HEAD_BYTES)
+        source.seek(0)
+        return head
+    with open(source, "rb") as handle:
+        return handle.read(HEAD_BYTES)
+
+def _decode(head):
+    # Кабинеты отдают UTF-8 (с BOM или без), Excel под Windows — cp1251
+    try:
+        return head.decode("utf-8-sig"), "utf-8-sig"
+    except UnicodeDecodeError as exc:
+        if exc.start > len(head) - 4:
+            # Обрезанный на границе буфера символ — не повод менять кодировку
+            return head[:exc.start].decode("utf-8-sig"), "utf-8-sig"
+        return head.decode("cp1251", errors="replace"), "cp1251"
+
+def _split_header(line, separator):
+    return [cell.strip().strip('"').strip().lower() for cell in line.split(separator)]
+
+def detect_layout(source, spec, overrides=None):
+    # → (номер строки заголовка, разделитель, кодировка, {поле: колонка})
+    overrides = {field: header.strip().lower() for field, header in (overrides or {}).items()}
+    text, encoding = _decode(_head(source))
+    lines = text.splitlines()[:HEADER_SCAN_LINES]
+    campaign_names = (overrides["campaign"],) if "campaign" in overrides else spec.fields["campaign"]
+    for number, line in enumerate(lines):
+        separator = max((";", ",", "\t"), key=line.count)
+        cells = _split_header(line, separator)
+        if not any(name in cells for name in campaign_names):
+            continue
+        columns = {}
+        # Поля со своим заголовком разбираются первыми: колонку, указанную
+        # явно, не может занять поле, найденное по вариантам
+        for field in sorted(spec.fields, key=lambda field: field not in overrides):
+            names = (overrides[field],) if field in overrides else spec.fields[field]
+            position = next((cells.index(name) for name in names if name in cells), None)
+            if position is not None and position not in columns.values():
+                columns[field] = position
+        missing = [field for field in spec.required if field not in columns]
+        if missing:
+            raise ValueError(f"нет колонок: {', '.join(missing)} (заголовок: {line.strip()[:200]})")
+        return number, separator, encoding, columns
+    raise ValueError(f"не найден заголовок с колонкой кампании ({', '.join(campaign_names)})")
+
+def _to_number(values):
+    # «1 234,56 ₽», «1,234.56», «1234.56» → число; нечисловое → NaN
+    import pandas as pd
+
+    text = values.str.replace(_NOT_NUMBER, "", regex=True)
+    both = text.str.contains(",", regex=False) & text.str.contains(".", regex=False)
+    text = text.where(~both, text.str.replace(",", "", regex=False)).str.replace(",", ".", regex=False)
+    text = text.where(text != "")
+    try:
+        return text.astype("float64")
+    except ValueError:
+        # «1.2.3», одинокий «-»: медленный разбор с NaN только для таких чанков
+        return pd.to_numeric(text, errors="coerce")
+
+def aggregate_file(source, kind, overrides=None, chunksize=DEFAULT_CHUNKSIZE):
+    # Суммы по кампаниям одного файла: (DataFrame campaign[category] + меры, статистика)
+    import pandas as pd
+
+    spec = SOURCES[kind]
+    skip, separator, encoding, columns = detect_layout(source, spec, overrides)
+    positions = sorted(columns.values())
+    names = {position: field for field, position in columns.items()}
+    stats = {"rows": 0, "skipped": 0, "not_numbers": 0}
+    partials = []
+
+    if hasattr(source, "seek"):
+        source.seek(0)
+    reader = pd.read_csv(source, sep=separator, encoding=encoding, skiprows=skip, header=0, usecols=positions,
+                         dtype=str, keep_default_na=False, chunksize=chunksize, encoding_errors="replace",
+                         on_bad_lines="skip", engine="c")
+    for chunk in reader:
+        chunk.columns = [names[position] for position in positions]
+        stats["rows"] += len(chunk)
+        campaigns = chunk["campaign"].str.strip()
+        keep = campaigns != ""
+        stats["skipped"] += int((~keep).sum())
+        frame = pd.DataFrame({"campaign": campaigns[keep]})
+        for measure in spec.measures:
+            if measure in chunk:
+                raw = chunk.loc[keep, measure]
+                numbers = _to_number(raw)
+                stats["not_numbers"] += int((numbers.isna() & (raw.str.strip() != "")).sum())
+                frame[measure] = numbers.fillna(0.0)
+            else:
+                frame[measure] = 1.0 if measure in spec.count_rows else 0.0
+        partials.append(frame.groupby("campaign", sort=False).sum())
+
+    measures = list(spec.measures)
+    if partials:
+        summed = pd.concat(partials).groupby(level=0, sort=False).sum()
+    else:
+        summed = pd.DataFrame(columns=measures, dtype=float)
+    summed = summed.reset_index(names="campaign")
+    summed["campaign"] = summed["campaign"].astype(str).astype("category")
+    stats["campaigns"] = len(summed)
+    return summed[["campaign"] + measures], stats
+
+# ============================================================
+# КЭШ ЧАСТИЧНЫХ РЕЗУЛЬТАТОВ
+# ============================================================
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reconcile_partials (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime'))
+) WITHOUT ROWID;
+"""
+
+def file_digest(source):
+    # Хэш содержимого: путь или бинарный файл
+    digest = hashlib.blake2b(digest_size=16)
+    handle = source if hasattr(source, "read") else open(source, "rb")
+    handle.seek(0)
+    try:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    finally:
+        if handle is source:
+            handle.seek(0)
+        else:
+            handle.close()
+    return digest.hexdigest()
+
+def partial_key(digest, kind, overrides=None):
+    options = ";".join(f"{field}={header}" for field, header in sorted((overrides or {}).items()))
+    return f"{PARTIAL_VERSION}:{kind}:{digest}:{options}"
+
+def _dump_partial(frame, stats):
+    # Частичный результат в кэше — JSON по колонкам: кампании и суммы
+    columns = {column: frame[column].tolist() for column in frame.columns if column != "campaign"}
+    return json.dumps({"campaigns": frame["campaign"].astype(str).tolist(), "columns": columns, "stats": stats},
+                      ensure_ascii=False, separators=(",", ":"))
+
+def _load_partial(payload):
+    import pandas as pd
+
+    data = json.loads(payload)
+    frame = pd.DataFrame({"campaign": pd.Categorical(data["campaigns"]), **data["columns"]})
+    return frame, data["stats"]
+
+class PartialCache:
+    def __init__(self, path=None):
+        self._conn = connect(path)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.executescript(SCHEMA)
+            # Результаты старых версий формата уже не прочитать
+            self._conn.execute("DELETE FROM reconcile_partials WHERE key NOT LIKE ?", (f"{PARTIAL_VERSION}:%",))
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM reconcile_partials WHERE key = ?", (key,)).fetchone()
+        return _load_partial(row[0]) if row else None
+
+    def put(self, key, kind, filename, partial):
+        payload = _dump_partial(*partial)
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO reconcile_partials (key, kind, filename, payload) "
+                               "VALUES (?, ?, ?, ?)", (key, kind, filename, payload))
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM reconcile_partials").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM reconcile_partials")
+
+def load_partial(source, filename, kind, cache=None, overrides=None, chunksize=DEFAULT_CHUNKSIZE):
+    # → (DataFrame, статистика); статистика отмечает, взят ли результат из кэша
+    key = partial_key(file_digest(source), kind, overrides) if cache is not None else None
+    cached = cache.get(key) if cache is not None else None
+    if cached is not None:
+        frame, stats = cached
+        return frame, {**stats, "file": filename, "kind": kind, "cached": True}
+    frame, stats = aggregate_file(source, kind, overrides, chunksize)
+    if cache is not None:
+        cache.put(key, kind, filename, (frame, stats))
+    return frame, {**stats, "file": filename, "kind": kind, "cached": False}
+
+# ============================================================
+# СВЕДЕНИЕ
+# ============================================================
+
+def _combine(partials, measures, categories):
+    import pandas as pd
+
+    if not partials:
+        frame = pd.DataFrame({"campaign": pd.Categorical([], categories=categories)})
+        for measure in measures:
+            frame[measure] = pd.Series(dtype=float)
+        return frame.set_index("campaign")
+    frames = [partial.assign(campaign=partial["campaign"].cat.set_categories(categories))
+              for partial in partials]
+    return pd.concat(frames, ignore_index=True).groupby("campaign", observed=True).sum()
+
+def reconcile(cost_partials, session_partials, vocabularies=None):
+    # Кампании из обоих источников: расходы и сессии рядом, поля нейминга.
+    # matched — есть и расход, и сессии
+    import pandas as pd
+    from pandas.api.types import union_categoricals
+
+    from name_generator.parser import NameParser
+
+    partials = list(cost_partials) + list(session_partials)
+    categories = (union_categoricals([partial["campaign"] for partial in partials], ignore_order=True).categories
+                  if partials else pd.Index([], dtype=object))
+    costs = _combine(cost_partials, SOURCES["costs"].measures, categories)
+    sessions = _combine(session_partials, SOURCES["sessions"].measures, categories)
+
+    campaigns = costs.join(sessions, how="outer").reset_index()
+    campaigns["matched"] = campaigns["campaign"].isin(costs.index) & campaigns["campaign"].isin(sessions.index)
+    campaigns[list(METRICS)] = campaigns[list(METRICS)].fillna(0.0)
+
+    # Кампании уже уникальны: каждое название разбирается один раз
+    names = campaigns["campaign"].astype(str)
+    parsed = NameParser(vocabularies).parse_series(names) if len(names) else None
+    for field in NAMING_FIELDS:
+        values = parsed[field].where(parsed["valid"], OUTSIDE_NAMING) if parsed is not None else names
+        campaigns[field] = values.astype("category")
+    campaigns["valid"] = parsed["valid"].astype(bool) if parsed is not None else pd.Series(dtype=bool)
+    campaigns["unknown"] = parsed["unknown"] if parsed is not None else pd.Series(dtype=str)
+    return campaigns[["campaign"] + list(NAMING_FIELDS) + ["valid", "unknown", "matched"] + list(METRICS)]
+
+def _ratios(frame):
+    sessions = frame["sessions"].where(frame["sessions"] > 0)
+    conversions = frame["conversions"].where(frame["conversions"] > 0)
+    frame["cost_per_session"] = (frame["cost"] / sessions).round(2)
+    frame["cost_per_conversion"] = (frame["cost"] / conversions).round(2)
+    return frame
+
+def summarize(campaigns, by=NAMING_FIELDS):
+    # Итог по сегментам: суммы мер, число кампаний, стоимость сессии и конверсии
+    by = list(by)
+    grouped = campaigns.groupby(by, observed=True, sort=True)
+    summary = grouped[list(METRICS)].sum()
+    summary.insert(0, "campaigns", grouped.size())
+    return _ratios(summary.reset_index())
+
+def totals(campaigns):
+    result = {metric: float(campaigns[metric].sum()) for metric in METRICS}
+    result["campaigns"] = len(campaigns)
+    result["matched"] = int(campaigns["matched"].sum())
+    result["outside_naming"] = int((~campaigns["valid"]).sum())
+    # Доля расхода, для которой не нашлось ни одной сессии
+    unmatched_cost = float(campaigns.loc[campaigns["sessions"] == 0, "cost"].sum())
+    result["unmatched_cost_share"] = unmatched_cost / result["cost"] if result["cost"] else 0.0
+    return result
+
+def to_csv_bytes(frame):
+    buffer = io.StringIO()
+    frame.to_csv(buffer, index=False)
+    return buffer.getvalue().encode("utf-8-sig")
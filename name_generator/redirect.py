@@ -0,0 +1,103 @@
+import argparse
+import asyncio
+
+from name_generator.server import MAX_HEADER_BYTES, REASONS, _parse_head
+from name_generator.shortlinks import ShortLinkStore, is_safe_url
+
+# ============================================================
+# РЕДИРЕКТ КОРОТКИХ ССЫЛОК
+# ============================================================
+#
+# python -m name_generator.redirect --port 8700
+#
+#   GET|HEAD /health   — статус
+#   GET|HEAD /<код>    — 302 на полную UTM-ссылку, 404 для неизвестного кода
+#
+# Один поток asyncio: поиск кода — словарь в памяти, при промахе — запрос
+# по первичному ключу SQLite. Базовый адрес коротких ссылок для интерфейса
+# и выгрузок задаёт NAME_GENERATOR_SHORT_BASE.
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8700
+
+REDIRECT_REASONS = {**REASONS, 302: "Found"}
+
+class RedirectServer:
+    def __init__(self, store=None):
+        self.store = store or ShortLinkStore()
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    return
+                except asyncio.LimitOverrunError:
+                    self.respond(writer, 431, b"", keep_alive=False)
+                    return
+                method, path, version, headers = _parse_head(head)
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+                # Тело у GET/HEAD не ожидается: запрос с телом не разбираем
+                if "content-length" in headers or "transfer-encoding" in headers:
+                    keep_alive = False
+                self.dispatch(writer, method, path, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            writer.close()
+
+    def dispatch(self, writer, method, path, keep_alive):
+        if method not in ("GET", "HEAD"):
+            self.respond(writer, 405, b"", keep_alive)
+            return
+        head_only = method == "HEAD"
+        code = path.lstrip("/")
+        if code == "health":
+            self.respond(writer, 200, b"ok", keep_alive, head_only=head_only)
+            return
+        url = self.store.resolve(code) if code else None
+        if url is None:
+            self.respond(writer, 404, b"", keep_alive, head_only=head_only)
+            return
+        self.respond(writer, 302, b"", keep_alive, location=url, head_only=head_only)
+
+    @staticmethod
+    def respond(writer, status, body, keep_alive=True, location=None, head_only=False):
+        # Ссылка в Location уже закодирована build_utm_url, но может
+        # содержать кириллицу из базового адреса — отправляем как UTF-8.
+        # Ссылку не http(s) или с CR/LF (записанную в базу в обход
+        # ShortLinkStore) не отдаём: вместо редиректа — 404
+        if location is not None and not is_safe_url(location):
+            status, location = 404, None
+        head = (
+            f"HTTP/1.1 {status} {REDIRECT_REASONS[status]}\r\n"
+            + (f"Location: {location}\r\n" if location else "")
+            + f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("utf-8") + (b"" if head_only else body))
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, store=None):
+    redirect = RedirectServer(store)
+    server = await asyncio.start_server(redirect.handle, host, port, limit=MAX_HEADER_BYTES)
+    print(f"Редирект: http://{host}:{port}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Редирект коротких ссылок")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import functools
+import json
+import os
+
+# ============================================================
+# СХЕМА ПОЛЕЙ ФОРМЫ
+# ============================================================
+#
+# Порядок полей, их словари, множественный выбор, виджет и зависимости
+# («поле доступно, когда заполнены requires») описаны здесь, а не
+# условиями в app.py: страница рисует поля циклом по схеме.
+#
+# widget: "buttons" — кнопки значений (multi — несколько через
+# engine.TYPES_SEPARATOR), "dropdown" — выпадающий список, "text" —
+# текстовое поле, пустое значение которого заполняется неймингом.
+
+class FieldSpec:
+    __slots__ = ("key", "label", "vocabulary", "number", "multi", "requires", "widget", "columns",
+                 "state_key", "hint")
+
+    def __init__(self, key, label, vocabulary=None, number=None, multi=False, requires=(), widget="buttons",
+                 columns=4, state_key=None, hint="🔒 Заполните предыдущее поле"):
+        self.key = key
+        self.label = label
+        self.vocabulary = vocabulary
+        self.number = number
+        self.multi = multi
+        self.requires = requires
+        self.widget = widget
+        self.columns = columns
+        # Префикс ключей виджетов поля в session_state
+        self.state_key = state_key or key
+        self.hint = hint
+
+    def is_enabled(self, draft):
+        return all(getattr(draft, field) for field in self.requires)
+
+NAMING_SCHEMA = (
+    FieldSpec("product", "Продукт", "Продукт", "1", columns=2),
+    FieldSpec("stream", "Стрим", "Стрим", "2", requires=("product",), columns=4),
+    FieldSpec("expense", "Статья расхода", "Статья расхода", "3", requires=("stream",), columns=5),
+    FieldSpec("source", "Источник", "Источник", "4", requires=("expense",), columns=4),
+    FieldSpec("campaign_types", "Тип кампании (можно несколько)", "Тип кампании", "5", multi=True,
+              requires=("source",), columns=4),
+    FieldSpec("client_geo", "Клиент/профиль/гео", "Клиент/гео", "6", requires=("campaign_types",), columns=5),
+    FieldSpec("targeting", "Таргетинг", "Таргетинг", "7", requires=("client_geo",), columns=5),
+    FieldSpec("goal", "Цель", "Цель", "8", requires=("targeting",), columns=4),
+)
+
+UTM_SCHEMA = (
+    FieldSpec("utm_source", "utm_source", "utm_source", state_key="utm_source_select", requires=("product",),
+              columns=4, hint="🔒 Заполните нейминг"),
+    FieldSpec("utm_medium", "utm_medium", "utm_medium", state_key="utm_medium_select", requires=("utm_source",),
+              columns=3, hint="🔒 Выберите utm_source"),
+    FieldSpec("utm_campaign", "utm_campaign", widget="text", requires=("utm_medium",),
+              hint="🔒 Заполните utm_medium"),
+    FieldSpec("utm_content", "utm_content", "utm_content", widget="dropdown", state_key="utm_content_select",
+              requires=("utm_medium",)),
+    FieldSpec("utm_term", "utm_term", "utm_term", widget="dropdown", state_key="utm_term_select",
+              requires=("utm_medium",)),
+    FieldSpec("utm_vacancy", "utm_vacancy", "utm_vacancy", widget="dropdown", state_key="utm_vacancy_select",
+              requires=("utm_medium",)),
+)
+
+SCHEMA = NAMING_SCHEMA + UTM_SCHEMA
+SCHEMA_BY_KEY = {spec.key: spec for spec in SCHEMA}
+
+# ============================================================
+# ПРАВИЛА СОВМЕСТИМОСТИ ЗНАЧЕНИЙ
+# ============================================================
+#
+# Правило: «если поле if_field имеет одно из значений if_values, то поле
+# then_field может принимать только allowed». По умолчанию правил нет.
+# Они загружаются из JSON-файла, путь — в NAME_GENERATOR_SCHEMA:
+#
+#   {"rules": [
+#       {"if": {"stream": ["vr"]}, "then": {"expense": ["vr", "cpa"]}}
+#   ]}
+#
+# Несколько правил на одно поле пересекаются.
+
+class Rule:
+    __slots__ = ("if_field", "if_values", "then_field", "allowed")
+
+    def __init__(self, if_field, if_values, then_field, allowed):
+        self.if_field = if_field
+        self.if_values = frozenset(if_values)
+        self.then_field = then_field
+        self.allowed = frozenset(allowed)
+
+def _rule_field(field):
+    spec = SCHEMA_BY_KEY.get(field)
+    if spec is None or spec.vocabulary is None:
+        raise ValueError(f"правила совместимости: неизвестное поле '{field}'")
+    return field
+
+def _rule_values(number, field, values):
+    # Одиночное значение допустимо строкой: "vr" — то же, что ["vr"].
+    # frozenset("vr") дал бы {"v", "r"}
+    if isinstance(values, str):
+        return (values,)
+    if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+        raise ValueError(f"правила совместимости: в правиле {number} значения '{field}' — строка или список строк")
+    return values
+
+def parse_rules(data):
+    items = data.get("rules", []) if isinstance(data, dict) else None
+    if not isinstance(items, list):
+        raise ValueError("правила совместимости: ожидается {\"rules\": [...]}")
+    rules = []
+    for number, item in enumerate(items, 1):
+        if not isinstance(item, dict) or not isinstance(item.get("if"), dict) or not isinstance(item.get("then"), dict):
+            raise ValueError(f"правила совместимости: в правиле {number} нужны объекты 'if' и 'then'")
+        for if_field, if_values in item["if"].items():
+            for then_field, allowed in item["then"].items():
+                rules.append(Rule(_rule_field(if_field), _rule_values(number, if_field, if_values),
+                                  _rule_field(then_field), _rule_values(number, then_field, allowed)))
+    return tuple(rules)
+
+@functools.lru_cache(maxsize=None)
+def load_rules(path=None):
+    path = path or os.environ.get("NAME_GENERATOR_SCHEMA")
+    if not path:
+        return ()
+    with open(path, encoding="utf-8") as handle:
+        return parse_rules(json.load(handle))
+
+class CompatibilityMatrix:
+    # Правила компилируются под конкретную версию словарей: значение поля —
+    # номер бита, для каждой пары (if_field, значение) хранится маска
+    # допустимых значений then_field. Отбор вариантов поля — несколько
+    # поисков в словаре и AND масок, независимо от длины словарей.
+
+    def __init__(self, rules, snapshot):
+        self.version = snapshot.version
+        self._options = {}
+        self._index = {}
+        self._full = {}
+        for spec in SCHEMA:
+            if spec.vocabulary is not None:
+                options = snapshot.options(spec.vocabulary)
+                self._options[spec.key] = options
+                self._index[spec.key] = {value: i for i, value in enumerate(options)}
+                self._full[spec.key] = (1 << len(options)) - 1
+
+        # then_field → {if_field: {значение: маска}}
+        self._tables = {}
+        for rule in rules:
+            index = self._index[rule.then_field]
+            full = self._full[rule.then_field]
+            mask = 0
+            for value in rule.allowed:
+                if value in index:
+                    mask |= 1 << index[value]
+            table = self._tables.setdefault(rule.then_field, {}).setdefault(rule.if_field, {})
+            for value in rule.if_values:
+                table[value] = table.get(value, full) & mask
+        self._filtered = {}
+
+    def mask(self, field, draft):
+        full = self._full.get(field, 0)
+        mask = full
+        for if_field, table in self._tables.get(field, {}).items():
+            selected = getattr(draft, if_field)
+            for value in selected if isinstance(selected, tuple) else (selected,):
+                if value:
+                    mask &= table.get(value, full)
+        return mask
+
+    def allowed(self, field, draft):
+        # Допустимые варианты поля при текущем выборе (в порядке словаря)
+        mask = self.mask(field, draft)
+        if mask == self._full.get(field, 0):
+            return self._options.get(field, ())
+        key = (field, mask)
+        if key not in self._filtered:
+            self._filtered[key] = tuple(
+                value for i, value in enumerate(self._options[field]) if mask >> i & 1
+            )
+        return self._filtered[key]
+
+    def is_allowed(self, field, value, draft):
+        i = self._index.get(field, {}).get(value)
+        return i is None or bool(self.mask(field, draft) >> i & 1)
+
+    def is_restricted(self, field):
+        return field in self._tables
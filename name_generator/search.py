@@ -0,0 +1,64 @@
+from name_generator.translit import swap_layout, transliterate
+
+# ============================================================
+# ПОИСК ПО СЛОВАРЮ (TYPE-AHEAD)
+# ============================================================
+#
+# Индекс строится один раз на версию словаря:
+#   - префиксы длиной до PREFIX_LENGTH → номера значений;
+#   - биграммы → номера значений (для поиска по подстроке).
+# Запрос и значения приводятся к латинице в нижнем регистре, поэтому
+# «вахта», «VAKHTA» и «vakhta» находят одно и то же.
+
+PREFIX_LENGTH = 3
+
+def _bigrams(text):
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+class VocabularyIndex:
+    def __init__(self, values):
+        self.values = tuple(values)
+        self._keys = [transliterate(value) for value in self.values]
+        self._prefixes = {}
+        self._bigrams = {}
+        for position, key in enumerate(self._keys):
+            for length in range(1, min(len(key), PREFIX_LENGTH) + 1):
+                self._prefixes.setdefault(key[:length], []).append(position)
+            for bigram in _bigrams(key):
+                self._bigrams.setdefault(bigram, set()).add(position)
+
+    def __len__(self):
+        return len(self.values)
+
+    def _prefix_matches(self, query):
+        candidates = self._prefixes.get(query[:PREFIX_LENGTH], ())
+        if len(query) <= PREFIX_LENGTH:
+            return candidates
+        return (position for position in candidates if self._keys[position].startswith(query))
+
+    def _substring_matches(self, query):
+        if len(query) < 2:
+            return ()
+        postings = sorted((self._bigrams.get(bigram, set()) for bigram in _bigrams(query)), key=len)
+        candidates = set.intersection(*postings)
+        return (position for position in sorted(candidates) if query in self._keys[position])
+
+    def search(self, query, limit=20):
+        # Порядок: точное совпадение, начало значения, подстрока;
+        # внутри группы — исходный порядок словаря. Сбор останавливается
+        # на limit, поэтому стоимость не зависит от размера словаря.
+        query = query.strip()
+        if not query:
+            return list(self.values[:limit])
+
+        variants = tuple(dict.fromkeys((transliterate(query), swap_layout(query))))
+        exact = [position for variant in variants for position in self._prefix_matches(variant)
+                 if self._keys[position] == variant]
+        found = dict.fromkeys(exact)
+        for variant in variants:
+            for matches in (self._prefix_matches(variant), self._substring_matches(variant)):
+                for position in matches:
+                    if len(found) >= limit:
+                        return [self.values[position] for position in found]
+                    found.setdefault(position)
+        return [self.values[position] for position in found]
@@ -0,0 +1,324 @@
+import argparse
+import asyncio
+import json
+
+from name_generator.api import RecordError, process_record, process_records
+from name_generator.shortlinks import ShortLinkStore, is_safe_url, short_url
+from name_generator.vocabulary import VocabularyStore
+
+# ============================================================
+# HTTP API (asyncio, только стандартная библиотека)
+# ============================================================
+#
+# python -m name_generator.server --port 8600
+#
+#   GET  /health            — статус и версия словарей
+#   GET  /v1/vocabularies   — текущие словари
+#   POST /v1/name           — одна запись (JSON-объект)
+#   POST /v1/batch          — JSON-массив записей, ответ {"items": [...]};
+#                             {"items": [...], "short": true} добавляет
+#                             short_url к корректным записям
+#   POST /v1/shorten        — {"urls": [...]}, ответ {"items": [{"url",
+#                             "code", "short_url"}]}
+#   POST /v1/stream         — NDJSON на входе и на выходе: строка ответа
+#                             на каждую строку запроса, отдаётся по мере
+#                             обработки (Transfer-Encoding: chunked)
+#
+# Сервер работает рядом с приложением Streamlit: словари читаются из той
+# же базы (NAME_GENERATOR_DB), добавленные в интерфейсе значения видны
+# API без перезапуска.
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8600
+
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 16 * 1024 * 1024
+# Для /v1/stream ответ отправляется порциями по столько строк
+STREAM_FLUSH_LINES = 256
+# Максимальная длина одной строки NDJSON в /v1/stream
+MAX_LINE_BYTES = 1024 * 1024
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           411: "Length Required", 413: "Payload Too Large", 431: "Request Header Fields Too Large"}
+
+class HttpError(Exception):
+    def __init__(self, status, message, close=False):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        # Тело запроса могло остаться недочитанным — соединение закрывается
+        self.close = close
+
+class StreamAborted(HttpError):
+    # Ответ /v1/stream уже начат и завершён строкой с ошибкой:
+    # второй ответ не отправляется, соединение закрывается
+    def __init__(self, status, message):
+        super().__init__(status, message, close=True)
+
+def _parse_head(head):
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ", 2)
+    except ValueError:
+        raise HttpError(400, "некорректная строка запроса", close=True)
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+    return method, target.partition("?")[0], version, headers
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def _body_length(headers):
+    # Длина тела по Content-Length или None для chunked; ошибки разметки
+    # тела выясняются до начала ответа
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        return None
+    if "content-length" not in headers:
+        raise HttpError(411, "нужен Content-Length или Transfer-Encoding: chunked", close=True)
+    try:
+        length = int(headers["content-length"])
+    except ValueError:
+        length = -1
+    if length < 0:
+        raise HttpError(400, "некорректный Content-Length", close=True)
+    return length
+
+async def _iter_body(reader, headers):
+    # Тело по Content-Length или chunked, порциями по мере поступления
+    remaining = _body_length(headers)
+    if remaining is None:
+        while True:
+            size_line = await reader.readuntil(b"\r\n")
+            try:
+                size = int(size_line.split(b";", 1)[0], 16)
+            except ValueError:
+                raise HttpError(400, "некорректный chunked-запрос", close=True)
+            if size == 0:
+                # Завершающие заголовки (trailer) не поддерживаются
+                await reader.readuntil(b"\r\n")
+                return
+            yield await reader.readexactly(size)
+            await reader.readexactly(2)
+    else:
+        while remaining > 0:
+            data = await reader.read(min(remaining, 65536))
+            if not data:
+                raise asyncio.IncompleteReadError(b"", remaining)
+            remaining -= len(data)
+            yield data
+
+async def _read_body(reader, headers):
+    if (_body_length(headers) or 0) > MAX_BODY_BYTES:
+        raise HttpError(413, f"тело запроса больше {MAX_BODY_BYTES} байт", close=True)
+    chunks = []
+    size = 0
+    async for chunk in _iter_body(reader, headers):
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise HttpError(413, f"тело запроса больше {MAX_BODY_BYTES} байт", close=True)
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+def _parse_json(body):
+    try:
+        return json.loads(body)
+    except (UnicodeDecodeError, ValueError) as exc:
+        raise HttpError(400, f"некорректный JSON: {exc}")
+
+class ApiServer:
+    def __init__(self, store=None, shortlinks=None):
+        self.store = store or VocabularyStore()
+        self._shortlinks = shortlinks
+        self.routes = {
+            ("GET", "/health"): self.health,
+            ("GET", "/v1/vocabularies"): self.vocabularies,
+            ("POST", "/v1/name"): self.name,
+            ("POST", "/v1/batch"): self.batch,
+            ("POST", "/v1/stream"): self.stream,
+            ("POST", "/v1/shorten"): self.shorten,
+        }
+
+    @property
+    def shortlinks(self):
+        # Таблица коротких ссылок создаётся при первом обращении
+        if self._shortlinks is None:
+            self._shortlinks = ShortLinkStore()
+        return self._shortlinks
+
+    # -------------------- соединение --------------------
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    return
+                except asyncio.LimitOverrunError:
+                    self.respond(writer, 431, {"error": "слишком длинные заголовки"}, keep_alive=False)
+                    return
+                method, path, version, headers = _parse_head(head)
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+                try:
+                    await self.dispatch(method, path, headers, reader, writer, keep_alive)
+                except StreamAborted:
+                    return
+                except HttpError as exc:
+                    keep_alive = keep_alive and not exc.close
+                    self.respond(writer, exc.status, {"error": exc.message}, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except HttpError as exc:
+            self.respond(writer, exc.status, {"error": exc.message}, keep_alive=False)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, path, headers, reader, writer, keep_alive):
+        handler = self.routes.get((method, path))
+        if handler is None:
+            allowed = [route_method for route_method, route_path in self.routes if route_path == path]
+            raise HttpError(405 if allowed else 404, f"{method} {path}: не поддерживается", close=True)
+        if handler == self.stream:
+            await self.stream(headers, reader, writer, keep_alive)
+            return
+        body = await _read_body(reader, headers) if method == "POST" else b""
+        self.respond(writer, 200, handler(body), keep_alive)
+
+    @staticmethod
+    def respond(writer, status, payload, keep_alive=True):
+        body = _dumps(payload)
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body
+        )
+
+    # -------------------- обработчики --------------------
+
+    def health(self, body):
+        return {"status": "ok", "vocabulary_version": self.store.snapshot().version}
+
+    def vocabularies(self, body):
+        snapshot = self.store.snapshot()
+        return {"version": snapshot.version, "vocabularies": snapshot.values}
+
+    def name(self, body):
+        try:
+            return process_record(_parse_json(body), self.store.snapshot().members)
+        except RecordError as exc:
+            raise HttpError(400, str(exc))
+
+    def batch(self, body):
+        records = _parse_json(body)
+        short = False
+        if isinstance(records, dict):
+            short = records.get("short") is True
+            records = records.get("items")
+        if not isinstance(records, list):
+            raise HttpError(400, "ожидается JSON-массив записей или {\"items\": [...]}")
+        results = process_records(records, self.store.snapshot().members)
+        if short:
+            urls = [result["utm_url"] if result["valid"] and is_safe_url(result["utm_url"]) else ""
+                    for result in results]
+            for result, code in zip(results, self.shortlinks.shorten_many(urls)):
+                result["short_url"] = short_url(code) if code else ""
+        return {"items": results}
+
+    def shorten(self, body):
+        data = _parse_json(body)
+        urls = data.get("urls") if isinstance(data, dict) else None
+        if not isinstance(urls, list) or not all(isinstance(url, str) and url for url in urls):
+            raise HttpError(400, "ожидается {\"urls\": [...]} с непустыми строками")
+        try:
+            codes = self.shortlinks.shorten_many(urls)
+        except ValueError as exc:
+            raise HttpError(400, str(exc))
+        return {"items": [{"url": url, "code": code, "short_url": short_url(code)}
+                          for url, code in zip(urls, codes)]}
+
+    async def stream(self, headers, reader, writer, keep_alive):
+        # Ответ начинается до конца запроса: каждая полная строка NDJSON
+        # обрабатывается сразу, память не зависит от размера потока
+        _body_length(headers)
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: application/x-ndjson; charset=utf-8\r\n"
+            b"Transfer-Encoding: chunked\r\n"
+            + f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+        )
+        vocabularies = self.store.snapshot().members
+        pending = bytearray()
+        output = []
+
+        async def flush():
+            if output:
+                data = b"".join(output)
+                writer.write(f"{len(data):x}\r\n".encode("latin-1") + data + b"\r\n")
+                output.clear()
+                await writer.drain()
+
+        def process_line(line):
+            if len(line) > MAX_LINE_BYTES:
+                raise HttpError(413, f"строка NDJSON длиннее {MAX_LINE_BYTES} байт")
+            if not line.strip():
+                return
+            try:
+                result = process_record(json.loads(line), vocabularies)
+            except (RecordError, UnicodeDecodeError, ValueError) as exc:
+                result = {"valid": False, "errors": [str(exc)]}
+            output.append(_dumps(result) + b"\n")
+
+        try:
+            async for chunk in _iter_body(reader, headers):
+                # Неполная строка копится в bytearray: дописывание не копирует
+                # уже накопленное, а её длина ограничена MAX_LINE_BYTES
+                head, newline, tail = chunk.rpartition(b"\n")
+                if newline:
+                    pending += head
+                    for line in pending.split(b"\n"):
+                        process_line(line)
+                    pending = bytearray(tail)
+                else:
+                    pending += tail
+                if len(pending) > MAX_LINE_BYTES:
+                    raise HttpError(413, f"строка NDJSON длиннее {MAX_LINE_BYTES} байт")
+                if len(output) >= STREAM_FLUSH_LINES:
+                    await flush()
+            process_line(pending)
+        except HttpError as exc:
+            # Заголовки ответа уже отправлены: ошибка уходит последней
+            # строкой потока, соединение закрывается
+            output.append(_dumps({"error": exc.message}) + b"\n")
+            await flush()
+            writer.write(b"0\r\n\r\n")
+            raise StreamAborted(exc.status, exc.message) from exc
+        await flush()
+        writer.write(b"0\r\n\r\n")
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, store=None):
+    api = ApiServer(store)
+    server = await asyncio.start_server(api.handle, host, port, limit=MAX_HEADER_BYTES)
+    print(f"API: http://{host}:{port}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP API генератора нейминга и UTM")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import hashlib
+import os
+import re
+import threading
+
+from name_generator.engine import validate_url
+from name_generator.storage import connect
+
+# ============================================================
+# КОРОТКИЕ ССЫЛКИ
+# ============================================================
+#
+# Код короткой ссылки — base62 от хэша полной UTM-ссылки: одна и та же
+# ссылка всегда получает один и тот же код, повторное сокращение ничего
+# не пишет. Пары код → ссылка лежат в общей базе (первичный ключ по коду,
+# без rowid), редирект отдаёт name_generator.redirect.
+#
+# При коллизии (код уже занят другой ссылкой) код удлиняется на символ:
+# берётся более длинный префикс того же хэша.
+#
+# Сокращаются только http(s)-ссылки без управляющих символов: ссылка
+# уходит в заголовок Location, и CR/LF в ней дописали бы ответу свои
+# заголовки, а javascript: превратил бы редирект в открытый.
+
+ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+# 62^7 ≈ 3.5·10^12 кодов: вероятность коллизии на миллионе ссылок ~10^-7
+CODE_LENGTH = 7
+
+DEFAULT_SHORT_BASE = "http://127.0.0.1:8700/"
+
+# Сколько разрешённых кодов держать в памяти процесса
+RESOLVE_CACHE_SIZE = 100_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS short_links (
+    code TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    created_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime'))
+) WITHOUT ROWID;
+"""
+
+def _hash_digits(url):
+    # 128 бит blake2b → 22 символа base62. Младшие разряды идут первыми:
+    # старший разряд 128-битного числа почти всегда 0–7, а префикс кода
+    # должен быть равномерным
+    number = int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=16).digest(), "big")
+    digits = []
+    for _ in range(22):
+        number, rest = divmod(number, 62)
+        digits.append(ALPHABET[rest])
+    return "".join(digits)
+
+# validate_url пропускает перевод строки в конце ($ в регулярке), поэтому
+# управляющие символы проверяются отдельно
+_CONTROL_CHARS = re.compile(r"[\x00-\x1f\x7f]")
+
+def is_safe_url(url):
+    return isinstance(url, str) and validate_url(url) and not _CONTROL_CHARS.search(url)
+
+def short_code(url, length=CODE_LENGTH):
+    return _hash_digits(url)[:length]
+
+def get_short_base():
+    base = os.environ.get("NAME_GENERATOR_SHORT_BASE", DEFAULT_SHORT_BASE)
+    return base if base.endswith("/") else base + "/"
+
+def short_url(code, base=None):
+    return (base or get_short_base()) + code
+
+class ShortLinkStore:
+    def __init__(self, path=None):
+        self._conn = connect(path)
+        self._lock = threading.Lock()
+        # Пара код → ссылка не меняется после записи, поэтому кэш
+        # не нужно инвалидировать — только ограничивать по размеру
+        self._cache = {}
+        with self._lock:
+            self._conn.executescript(SCHEMA)
+
+    def _remember(self, code, url):
+        if len(self._cache) >= RESOLVE_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[code] = url
+
+    def _lookup(self, code):
+        url = self._cache.get(code)
+        if url is None:
+            row = self._conn.execute("SELECT url FROM short_links WHERE code = ?", (code,)).fetchone()
+            if row is not None:
+                url = row[0]
+                self._remember(code, url)
+        return url
+
+    def _shorten(self, url):
+        if not is_safe_url(url):
+            raise ValueError(f"недопустимая ссылка для сокращения: {url[:200]!r}")
+        digits = _hash_digits(url)
+        for length in range(CODE_LENGTH, len(digits) + 1):
+            code = digits[:length]
+            stored = self._lookup(code)
+            if stored is None:
+                # Тот же код мог только что записать другой процесс
+                self._conn.execute("INSERT OR IGNORE INTO short_links (code, url) VALUES (?, ?)", (code, url))
+                stored = self._lookup(code)
+            if stored == url:
+                return code
+        raise ValueError("не удалось подобрать код короткой ссылки")
+
+    def peek(self, url):
+        # Код, который получит ссылка, без записи в базу: для показа
+        # до того, как ссылку скопировали
+        if not is_safe_url(url):
+            raise ValueError(f"недопустимая ссылка для сокращения: {url[:200]!r}")
+        digits = _hash_digits(url)
+        with self._lock:
+            for length in range(CODE_LENGTH, len(digits) + 1):
+                stored = self._lookup(digits[:length])
+                if stored is None or stored == url:
+                    return digits[:length]
+        raise ValueError("не удалось подобрать код короткой ссылки")
+
+    def shorten(self, url):
+        if not url:
+            return ""
+        with self._lock:
+            return self._shorten(url)
+
+    def shorten_many(self, urls):
+        # Пачка ссылок — одна транзакция; пустые ссылки дают пустой код.
+        # Недопустимая ссылка — ValueError до записи
+        for url in urls:
+            if url and not is_safe_url(url):
+                raise ValueError(f"недопустимая ссылка для сокращения: {url[:200]!r}")
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                codes = [self._shorten(url) if url else "" for url in urls]
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                self._cache.clear()
+                raise
+            self._conn.execute("COMMIT")
+        return codes
+
+    def resolve(self, code):
+        with self._lock:
+            return self._lookup(code)
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM short_links").fetchone()[0]
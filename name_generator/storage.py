@@ -0,0 +1,51 @@
+import os
+import sqlite3
+
+# ============================================================
+# ОБЩЕЕ ХРАНИЛИЩЕ (SQLite)
+# ============================================================
+#
+# Все постоянные данные приложения лежат в одном файле SQLite.
+# Путь можно переопределить переменной окружения NAME_GENERATOR_DB.
+
+DEFAULT_DB_PATH = os.path.join("data", "name_generator.sqlite3")
+
+def get_db_path():
+    return os.environ.get("NAME_GENERATOR_DB", DEFAULT_DB_PATH)
+
+def connect(path=None):
+    path = path or get_db_path()
+    if path != ":memory:":
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    # Соединение делится между потоками сессий Streamlit, запись защищают
+    # блокировки владельцев. WAL позволяет читать параллельно с записью.
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+class DataVersion:
+    # PRAGMA data_version меняется, когда в базу пишет другое соединение,
+    # и не требует чтения таблиц. Хранилища с кэшем в памяти проверяют
+    # changed() перед чтением и перечитывают таблицу только после чужой записи.
+    __slots__ = ("_conn", "_version")
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._version = self.read()
+
+    def read(self):
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def mark(self):
+        # Запомнить текущую версию после своей записи
+        self._version = self.read()
+
+    def changed(self):
+        version = self.read()
+        if version == self._version:
+            return False
+        self._version = version
+        return True
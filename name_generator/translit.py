@@ -0,0 +1,27 @@
+# ============================================================
+# ТРАНСЛИТЕРАЦИЯ И РАСКЛАДКА
+# ============================================================
+#
+# Таблицы собираются один раз при импорте и применяются через
+# str.translate — без посимвольных циклов в Python.
+
+CYRILLIC_TO_LATIN = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e",
+    "ж": "zh", "з": "z", "и": "i", "й": "y", "к": "k", "л": "l", "м": "m",
+    "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u",
+    "ф": "f", "х": "kh", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "shch", "ъ": "",
+    "ы": "y", "ь": "", "э": "e", "ю": "yu", "я": "ya",
+}
+
+# Текст, набранный в русской раскладке вместо английской («ьл» → «mk»)
+RU_LAYOUT = "йцукенгшщзхъфывапролджэячсмитьбю"
+EN_LAYOUT = "qwertyuiop[]asdfghjkl;'zxcvbnm,."
+
+TRANSLIT_TABLE = str.maketrans(CYRILLIC_TO_LATIN)
+LAYOUT_TABLE = str.maketrans(RU_LAYOUT, EN_LAYOUT)
+
+def transliterate(text):
+    return text.lower().translate(TRANSLIT_TABLE)
+
+def swap_layout(text):
+    return text.lower().translate(LAYOUT_TABLE)
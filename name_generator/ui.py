@@ -0,0 +1,113 @@
+import functools
+import hashlib
+import os
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from name_generator.history import HistoryStore
+from name_generator.presets import PresetStore
+from name_generator.reconcile import PartialCache
+from name_generator.schema import CompatibilityMatrix, load_rules
+from name_generator.search import VocabularyIndex
+from name_generator.shortlinks import ShortLinkStore
+from name_generator.vocabulary import VocabularyStore
+
+# ============================================================
+# ОБЩИЕ РЕСУРСЫ STREAMLIT-СТРАНИЦ
+# ============================================================
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+
+@functools.lru_cache(maxsize=None)
+def _static_version(filename):
+    # Хэш содержимого в URL: браузер кэширует файл, пока он не изменился
+    with open(os.path.join(STATIC_DIR, filename), "rb") as handle:
+        return hashlib.md5(handle.read()).hexdigest()[:8]
+
+def static_url(filename):
+    # Streamlit отдаёт app/static/ без Cache-Control (только ETag и Last-Modified),
+    # браузер кэширует эвристически. Версия в URL позволяет прокси перед
+    # приложением отдавать /app/static/ с Cache-Control: immutable
+    return f"app/static/{filename}?v={_static_version(filename)}"
+
+def inject_styles():
+    # Стили раздаются статикой Streamlit (server.enableStaticServing).
+    # <link> добавляется в <head> страницы один раз за сессию: там он
+    # переживает перезапуски скрипта и переходы между страницами, и в
+    # прогоны не уходит ничего. Если файл изменился, ссылка обновляется.
+    href = static_url("style.css")
+    if st.session_state.get("styles_href") == href:
+        return
+    st.session_state.styles_href = href
+    st.html(
+        f"""<script>
+        (() => {{
+            let link = document.getElementById("name-generator-styles");
+            if (!link) {{
+                link = document.createElement("link");
+                link.id = "name-generator-styles";
+                link.rel = "stylesheet";
+                document.head.appendChild(link);
+            }}
+            if (link.getAttribute("href") !== "{href}") link.setAttribute("href", "{href}");
+        }})();
+        </script>""",
+        unsafe_allow_javascript=True,
+    )
+
+@st.cache_resource
+def get_vocabulary_store():
+    # Один экземпляр на процесс: снимок словарей общий для всех сессий
+    return VocabularyStore()
+
+@st.cache_resource
+def get_history_store():
+    # Словарь первых использований загружается один раз на процесс
+    return HistoryStore()
+
+@st.cache_resource
+def get_preset_store():
+    return PresetStore()
+
+@st.cache_resource
+def get_shortlink_store():
+    return ShortLinkStore()
+
+@st.cache_resource
+def get_reconcile_cache():
+    return PartialCache()
+
+def session_id():
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else ""
+
+def get_vocabularies():
+    return get_vocabulary_store().snapshot()
+
+def file_reader(path):
+    # Данные для st.download_button: файл читается только по клику
+    # «Скачать», а не на каждом прогоне страницы
+    def read():
+        with open(path, "rb") as handle:
+            return handle.read()
+    return read
+
+@st.cache_resource(max_entries=64)
+def get_search_index(field, version):
+    # Индекс пересобирается только при смене версии словаря
+    return VocabularyIndex(get_vocabularies().options(field))
+
+@st.cache_resource
+def get_rules():
+    # (правила, текст ошибки). Ошибка в файле правил не должна ронять
+    # каждый прогон: страница работает без правил и показывает ошибку
+    try:
+        return load_rules(), None
+    except (OSError, ValueError) as exc:
+        return (), str(exc)
+
+@st.cache_resource(max_entries=8)
+def get_compatibility(version):
+    # Правила совместимости компилируются в битовые маски один раз на версию словарей
+    return CompatibilityMatrix(get_rules()[0], get_vocabularies())
@@ -0,0 +1,173 @@
+import sqlite3
+import threading
+import time
+
+from name_generator.engine import DEFAULT_STRICT_NAMING, DEFAULT_VARIABLE_NAMING, DEFAULT_UTM_PARAMS
+from name_generator.storage import DataVersion, connect, get_db_path
+
+# ============================================================
+# СЛОВАРИ НЕЙМИНГА И UTM
+# ============================================================
+#
+# Словари хранятся в SQLite и переживают перезапуск. Чтение идёт из
+# неизменяемого снимка в памяти процесса (кортежи и frozenset + версия).
+#
+# Снимок никогда не меняется на месте: добавление значения строит новый
+# снимок (копируется только изменённое поле, остальные разделяются со
+# старым) и подменяет ссылку под блокировкой записи. Чтение блокировку
+# не берёт — присваивание ссылки атомарно, и сессия видит либо старую,
+# либо новую версию целиком. Изменения из других процессов подхватываются
+# не чаще раза в REFRESH_INTERVAL секунд по PRAGMA data_version.
+
+DEFAULT_VOCABULARIES = {**DEFAULT_STRICT_NAMING, **DEFAULT_VARIABLE_NAMING, **DEFAULT_UTM_PARAMS}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS vocabulary (
+    field TEXT NOT NULL,
+    value TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    added_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (field, value)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS vocabulary_order ON vocabulary (field, position);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('vocabulary_version', 0);
+"""
+
+REFRESH_INTERVAL = 1.0
+
+class VocabularySnapshot:
+    __slots__ = ("version", "values", "members")
+
+    def __init__(self, version, values):
+        self.version = version
+        self.values = {field: tuple(options) for field, options in values.items()}
+        self.members = {field: frozenset(options) for field, options in self.values.items()}
+
+    def options(self, field):
+        return self.values.get(field, ())
+
+    def contains(self, field, value):
+        return value in self.members.get(field, ())
+
+    def with_value(self, field, value, version):
+        # Новый снимок с добавленным значением; остальные поля разделяются
+        snapshot = VocabularySnapshot.__new__(VocabularySnapshot)
+        snapshot.version = version
+        snapshot.values = {**self.values, field: self.options(field) + (value,)}
+        snapshot.members = {**self.members, field: self.members.get(field, frozenset()) | {value}}
+        return snapshot
+
+class VocabularyStore:
+    def __init__(self, path=None, defaults=None):
+        self._conn = connect(path)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.executescript(SCHEMA)
+            self._seed(DEFAULT_VOCABULARIES if defaults is None else defaults)
+            self._data_version = DataVersion(self._conn)
+            self._snapshot = self._load()
+            self._checked_at = time.monotonic()
+
+    def _seed(self, defaults):
+        # Значения из кода добавляются при каждом старте, уже существующие пропускаются
+        with self._conn:
+            self._conn.execute("BEGIN")
+            for field, options in defaults.items():
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO vocabulary (field, value, position) VALUES (?, ?, ?)",
+                    [(field, value, position) for position, value in enumerate(options)],
+                )
+
+    def _read_version(self):
+        return self._conn.execute(
+            "SELECT value FROM meta WHERE key = 'vocabulary_version'"
+        ).fetchone()[0]
+
+    def _load(self):
+        # Версия и значения читаются в одной транзакции, иначе снимок
+        # может получить номер версии, в которую его значения не входят
+        values = {}
+        with self._conn:
+            self._conn.execute("BEGIN")
+            version = self._read_version()
+            rows = self._conn.execute("SELECT field, value FROM vocabulary ORDER BY field, position")
+            for field, value in rows:
+                values.setdefault(field, []).append(value)
+        return VocabularySnapshot(version, values)
+
+    def snapshot(self):
+        # Путь чтения без ожидания: ссылка на снимок читается как есть.
+        # Раз в REFRESH_INTERVAL один из читателей проверяет базу; если
+        # блокировка занята (идёт запись или проверка), берётся текущий снимок.
+        snapshot = self._snapshot
+        if time.monotonic() - self._checked_at < REFRESH_INTERVAL:
+            return snapshot
+        if not self._lock.acquire(blocking=False):
+            return snapshot
+        try:
+            self._checked_at = time.monotonic()
+            self._refresh()
+            return self._snapshot
+        finally:
+            self._lock.release()
+
+    def _refresh(self):
+        if self._data_version.changed():
+            if self._read_version() != self._snapshot.version:
+                self._snapshot = self._load()
+
+    def add(self, field, value):
+        # Возвращает False, если значение уже есть в словаре
+        value = value.strip()
+        if not value or self._snapshot.contains(field, value):
+            return False
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                version = self._read_version()
+                inserted = self._conn.execute(
+                    "INSERT OR IGNORE INTO vocabulary (field, value, position) "
+                    "SELECT ?, ?, COALESCE(MAX(position), -1) + 1 FROM vocabulary WHERE field = ?",
+                    (field, value, field),
+                ).rowcount
+                if inserted:
+                    self._conn.execute(
+                        "UPDATE meta SET value = value + 1 WHERE key = 'vocabulary_version'"
+                    )
+            self._data_version.mark()
+            if inserted and version == self._snapshot.version:
+                # Между нашим снимком и этой записью никто не писал —
+                # достаточно копии с одним новым значением
+                self._snapshot = self._snapshot.with_value(field, value, version + 1)
+            else:
+                self._snapshot = self._load()
+            self._checked_at = time.monotonic()
+        return bool(inserted)
+
+def read_vocabularies(path=None):
+    # Словари для консольных утилит: база открывается только на чтение
+    # и не засевается; если базы нет — берутся значения из кода
+    values = {field: list(options) for field, options in DEFAULT_VOCABULARIES.items()}
+    path = path or get_db_path()
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    except sqlite3.OperationalError:
+        return VocabularySnapshot(0, values)
+    try:
+        version = conn.execute("SELECT value FROM meta WHERE key = 'vocabulary_version'").fetchone()[0]
+        rows = conn.execute("SELECT field, value FROM vocabulary ORDER BY field, position").fetchall()
+    except sqlite3.OperationalError:
+        return VocabularySnapshot(0, values)
+    finally:
+        conn.close()
+    stored = {}
+    for field, value in rows:
+        stored.setdefault(field, []).append(value)
+    for field, options in stored.items():
+        known = set(values.get(field, ()))
+        values[field] = values.get(field, []) + [value for value in options if value not in known]
+    return VocabularySnapshot(version, values)
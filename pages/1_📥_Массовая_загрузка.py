@@ -0,0 +1,132 @@
+import os
+import tempfile
+
+import streamlit as st
+
+from name_generator.bulk import DEFAULT_CHUNKSIZE, INPUT_COLUMNS, process_file
+from name_generator.exports import EXPORT_FORMATS, EXPORT_MIME, LAYOUTS, export_rows, read_result_rows
+from name_generator.ui import file_reader, get_shortlink_store, get_vocabularies, inject_styles
+
+# ============================================================
+# НАСТРОЙКА СТРАНИЦЫ
+# ============================================================
+
+st.set_page_config(
+    page_title="Массовая загрузка — нейминг и UTM",
+    page_icon="📥",
+    layout="wide"
+)
+
+inject_styles()
+
+st.title("📥 Массовая генерация из CSV/XLSX")
+
+st.markdown(
+    "Файл обрабатывается частями: в памяти находится только текущий чанк, "
+    "результат пишется во временный файл по мере обработки."
+)
+
+with st.expander("Формат файла"):
+    st.markdown("Первая строка — заголовок. Ожидаемые колонки:")
+    st.code(", ".join(INPUT_COLUMNS), language=None)
+    st.markdown(
+        "Несколько типов кампании указываются через `&` (например, `mk&feed`). "
+        "Пустой `utm_campaign` заполняется неймингом."
+    )
+
+uploaded = st.file_uploader("Файл с планом кампаний", type=["csv", "txt", "xlsx"])
+chunksize = st.number_input("Размер чанка, строк", min_value=500, max_value=100000,
+                            value=DEFAULT_CHUNKSIZE, step=500)
+with_short = st.checkbox("Добавить короткие ссылки (колонка short_url)", key="bulk_short")
+normalize = st.checkbox("Нормализовать значения (транслит, регистр, разделители)", key="bulk_normalize",
+                        help="«Adtech-B2C» → «adtech-b2c», «Яндекс Еда» → «yandeks-eda»")
+
+if uploaded is not None and st.button("▶️ Обработать", type="primary"):
+    progress = st.progress(0.0, text="Обработка...")
+    total_bytes = uploaded.size or 1
+
+    def on_progress(stats):
+        done = min(uploaded.tell() / total_bytes, 1.0)
+        progress.progress(done, text=f"Обработано строк: {stats['rows']:,} (ошибок: {stats['invalid']:,})")
+
+    # Файлы результата, ошибок и выгрузок лежат в каталоге сессии. Каталог
+    # удаляется при обработке следующего файла, а TemporaryDirectory
+    # удаляет его сам, когда сессия (и её session_state) уходит из памяти
+    previous = st.session_state.pop("bulk_result", None)
+    if previous:
+        previous["workdir"].cleanup()
+    workdir = tempfile.TemporaryDirectory(prefix="bulk_")
+    result_path = os.path.join(workdir.name, "result.csv")
+    errors_path = os.path.join(workdir.name, "errors.csv")
+
+    with open(result_path, "w", newline="", encoding="utf-8-sig") as result_file, \
+            open(errors_path, "w", newline="", encoding="utf-8-sig") as errors_file:
+        try:
+            stats = process_file(uploaded, uploaded.name, result_file, chunksize=int(chunksize),
+                                 vocabularies=get_vocabularies().members,
+                                 on_progress=on_progress, errors_output=errors_file,
+                                 shortlinks=get_shortlink_store() if with_short else None,
+                                 normalize=normalize)
+        except (ValueError, RuntimeError) as exc:
+            error = exc
+        else:
+            error = None
+
+    if error is not None:
+        workdir.cleanup()
+        progress.empty()
+        st.error(f"❌ Не удалось прочитать файл: {error}")
+        st.stop()
+
+    progress.progress(1.0, text=f"Готово: {stats['rows']:,} строк")
+    st.session_state.bulk_result = {
+        "name": uploaded.name,
+        "stats": stats,
+        "workdir": workdir,
+        "result_path": result_path,
+        "errors_path": errors_path,
+    }
+
+bulk_result = st.session_state.get("bulk_result")
+if bulk_result:
+    stats = bulk_result["stats"]
+    col_rows, col_invalid = st.columns(2)
+    col_rows.metric("Строк обработано", f"{stats['rows']:,}")
+    col_invalid.metric("Строк с ошибками", f"{stats['invalid']:,}")
+
+    base_name = bulk_result["name"].rsplit(".", 1)[0]
+    st.download_button("⬇️ Скачать результат (CSV)", file_reader(bulk_result["result_path"]),
+                       file_name=f"{base_name}_result.csv", mime="text/csv", type="primary", on_click="ignore")
+
+    if stats["invalid"]:
+        st.warning("⚠️ Есть строки со значениями вне словарей")
+        st.download_button("⬇️ Скачать отчёт об ошибках", file_reader(bulk_result["errors_path"]),
+                           file_name=f"{base_name}_errors.csv", mime="text/csv", on_click="ignore")
+    else:
+        st.success("✓ Все строки соответствуют словарям")
+
+    # Выгрузка для кабинета собирается из файла результата потоком по кнопке
+    # и кэшируется в сессии для пары (кабинет, формат)
+    st.markdown("---")
+    st.subheader("📦 Выгрузка для рекламного кабинета")
+    col_platform, col_format = st.columns(2)
+    platform = col_platform.selectbox("Кабинет", tuple(LAYOUTS), format_func=lambda key: LAYOUTS[key].title,
+                                      key="export_platform")
+    export_format = col_format.selectbox("Формат", EXPORT_FORMATS, key="export_format")
+    exports = bulk_result.setdefault("exports", {})
+    export_key = (platform, export_format)
+
+    if export_key not in exports and st.button("📦 Подготовить выгрузку"):
+        export_path = os.path.join(bulk_result["workdir"].name, f"{platform}.{export_format}")
+        with st.spinner("Выгрузка..."):
+            rows = export_rows(read_result_rows(bulk_result["result_path"]), export_path,
+                               platform, export_format)
+        exports[export_key] = (export_path, rows)
+
+    if export_key in exports:
+        export_path, rows = exports[export_key]
+        st.download_button(f"⬇️ Скачать выгрузку ({rows:,} строк)", file_reader(export_path),
+                           file_name=f"{base_name}_{platform}.{export_format}",
+                           mime=EXPORT_MIME[export_format], type="primary", on_click="ignore")
+        if rows < stats["rows"]:
+            st.caption(f"Строки с ошибками ({stats['rows'] - rows:,}) в выгрузку не попали")
@@ -0,0 +1,101 @@
+import os
+import tempfile
+
+import streamlit as st
+
+from name_generator.engine import FIELD_VOCABULARY, UTM_KEYS, validate_url
+from name_generator.matrix import count_combinations, get_page, write_csv
+from name_generator.ui import file_reader, get_vocabularies, inject_styles
+
+# ============================================================
+# НАСТРОЙКА СТРАНИЦЫ
+# ============================================================
+
+st.set_page_config(
+    page_title="Матрица — нейминг и UTM",
+    page_icon="🧮",
+    layout="wide"
+)
+
+inject_styles()
+
+st.title("🧮 Матрица комбинаций")
+st.markdown(
+    "В каждом поле можно выбрать несколько значений — генерируются все сочетания. "
+    "Комбинации считаются на лету: на странице показывается только текущая порция."
+)
+
+PAGE_SIZES = [25, 50, 100, 500]
+
+# ============================================================
+# ВЫБОР ЗНАЧЕНИЙ
+# ============================================================
+
+vocabularies = get_vocabularies()
+selection = {}
+
+st.header("📌 Нейминг")
+naming_cols = st.columns(4)
+for i, (field, vocabulary_name) in enumerate(FIELD_VOCABULARY.items()):
+    with naming_cols[i % 4]:
+        selection[field] = st.multiselect(vocabulary_name, vocabularies.options(vocabulary_name), key=f"matrix_{field}")
+
+st.header("🎯 UTM")
+base_link = st.text_input("Базовая ссылка", placeholder="https://expert.hh.ru/webinar/kobrending", key="matrix_base_link")
+if base_link and not validate_url(base_link):
+    st.error("❌ Ссылка должна начинаться с http:// или https://")
+
+utm_cols = st.columns(5)
+for i, key in enumerate(key for key in UTM_KEYS if key != "utm_campaign"):
+    with utm_cols[i % 5]:
+        selection[key] = st.multiselect(key, vocabularies.options(key), key=f"matrix_{key}")
+
+# ============================================================
+# РЕЗУЛЬТАТ
+# ============================================================
+
+total = count_combinations(selection)
+st.metric("Комбинаций", f"{total:,}")
+
+if any(selection.values()):
+    col_size, col_page = st.columns(2)
+    with col_size:
+        page_size = st.selectbox("Строк на странице", PAGE_SIZES, key="matrix_page_size")
+    pages_total = max((total + page_size - 1) // page_size, 1)
+    with col_page:
+        page = st.number_input(f"Страница (из {pages_total:,})", min_value=1, max_value=pages_total,
+                               value=1, key="matrix_page")
+
+    rows = get_page(selection, page - 1, page_size, base_link)
+    st.dataframe(
+        [{"Нейминг": row["name"], "UTM": row["utm_url"]} for row in rows],
+        use_container_width=True,
+        hide_index=True,
+    )
+
+    export_signature = repr((sorted(selection.items()), base_link))
+    if st.button("📦 Подготовить CSV со всеми комбинациями", type="primary"):
+        progress = st.progress(0.0, text="Экспорт...")
+
+        def on_progress(written):
+            progress.progress(written / total, text=f"Записано: {written:,} из {total:,}")
+
+        # Файл лежит в каталоге сессии: прошлый экспорт удаляется перед новым,
+        # а TemporaryDirectory удаляет каталог вместе с session_state
+        previous = st.session_state.pop("matrix_export", None)
+        if previous:
+            previous["workdir"].cleanup()
+        workdir = tempfile.TemporaryDirectory(prefix="matrix_")
+        export_path = os.path.join(workdir.name, "matrix.csv")
+        with open(export_path, "w", newline="", encoding="utf-8-sig") as export_file:
+            written = write_csv(selection, export_file, base_link, on_progress=on_progress)
+        progress.progress(1.0, text=f"Готово: {written:,} строк")
+        st.session_state.matrix_export = {"signature": export_signature, "workdir": workdir, "path": export_path}
+
+    # Выгрузка показывается, только если выбор не менялся после экспорта
+    matrix_export = st.session_state.get("matrix_export")
+    if matrix_export and matrix_export["signature"] == export_signature:
+        st.download_button("⬇️ Скачать CSV", file_reader(matrix_export["path"]), file_name="matrix.csv",
+                           mime="text/csv", on_click="ignore")
+else:
+    st.info("⬆️ Выберите значения хотя бы в одном поле")
@@ -0,0 +1,62 @@
+import streamlit as st
+
+from name_generator.engine import FIELD_VOCABULARY
+from name_generator.ui import get_history_store, get_vocabularies, inject_styles
+
+# ============================================================
+# НАСТРОЙКА СТРАНИЦЫ
+# ============================================================
+
+st.set_page_config(
+    page_title="История — нейминг и UTM",
+    page_icon="🕘",
+    layout="wide"
+)
+
+inject_styles()
+
+st.title("🕘 История неймингов")
+st.markdown(
+    "Сюда попадает каждый скопированный нейминг с UTM-ссылкой. "
+    "Поиск — по части нейминга, ссылки или автора и по любому из сегментов."
+)
+
+SEARCH_LIMITS = [50, 200, 1000]
+
+# ============================================================
+# ФИЛЬТРЫ
+# ============================================================
+
+history = get_history_store()
+vocabularies = get_vocabularies()
+
+col_text, col_limit = st.columns([4, 1])
+with col_text:
+    text = st.text_input("Поиск", placeholder="например, supergeo или Анна", key="history_text")
+with col_limit:
+    limit = st.selectbox("Показать", SEARCH_LIMITS, index=1, key="history_limit")
+
+segments = {}
+segment_cols = st.columns(4)
+for i, (field, vocabulary_name) in enumerate(FIELD_VOCABULARY.items()):
+    with segment_cols[i % 4]:
+        segments[field] = st.selectbox(vocabulary_name, [""] + list(vocabularies.options(vocabulary_name)),
+                                       key=f"history_{field}")
+
+# ============================================================
+# РЕЗУЛЬТАТ
+# ============================================================
+
+rows = history.search(text, segments, limit=limit)
+st.caption(f"Найдено: {len(rows):,} (всего в истории: {history.count():,})")
+
+if rows:
+    st.dataframe(rows, use_container_width=True, hide_index=True, column_config={
+        "id": None,
+        "created_at": "Дата",
+        "author": "Автор",
+        "name": "Нейминг",
+        "utm_url": st.column_config.LinkColumn("UTM"),
+    })
+else:
+    st.info("Ничего не найдено")
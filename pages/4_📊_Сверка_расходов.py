@@ -0,0 +1,109 @@
+import streamlit as st
+
+from name_generator.engine import FIELD_VOCABULARY, NAMING_FIELDS
+from name_generator.reconcile import SOURCES, load_partial, reconcile, summarize, to_csv_bytes, totals
+from name_generator.ui import get_reconcile_cache, get_vocabularies, inject_styles
+
+# ============================================================
+# НАСТРОЙКА СТРАНИЦЫ
+# ============================================================
+
+st.set_page_config(
+    page_title="Сверка расходов — нейминг и UTM",
+    page_icon="📊",
+    layout="wide"
+)
+
+inject_styles()
+
+st.title("📊 Сверка расходов с сессиями")
+st.markdown(
+    "Расходы из кабинетов и сессии из аналитики сводятся по `utm_campaign`, название кампании "
+    "разбирается на поля нейминга. Файлы читаются по частям; суммы по каждому файлу кэшируются, "
+    "поэтому при повторной сверке читаются только новые файлы."
+)
+
+with st.expander("Формат файлов"):
+    for spec in SOURCES.values():
+        columns = "; ".join(f"**{field}**: {', '.join(names)}" for field, names in spec.fields.items())
+        st.markdown(f"{spec.title} — CSV с колонками (регистр не важен): {columns}.")
+    st.markdown(
+        "Если в выгрузке сессий нет колонки с числом сессий, каждая строка считается одной сессией. "
+        "Строки над заголовком (название отчёта) пропускаются."
+    )
+
+col_costs, col_sessions = st.columns(2)
+cost_files = col_costs.file_uploader("Расходы (кабинеты)", type=["csv", "tsv", "txt"],
+                                     accept_multiple_files=True, key="reconcile_costs")
+session_files = col_sessions.file_uploader("Сессии (аналитика)", type=["csv", "tsv", "txt"],
+                                           accept_multiple_files=True, key="reconcile_sessions")
+
+if cost_files and st.button("▶️ Свести", type="primary"):
+    cache = get_reconcile_cache()
+    partials = {"costs": [], "sessions": []}
+    files = []
+    progress = st.progress(0.0, text="Чтение файлов...")
+    uploads = [("costs", upload) for upload in cost_files] + [("sessions", upload) for upload in session_files or ()]
+    for number, (kind, upload) in enumerate(uploads, 1):
+        try:
+            partial, stats = load_partial(upload, upload.name, kind, cache)
+        except (ValueError, RuntimeError) as exc:
+            progress.empty()
+            st.error(f"❌ {upload.name}: {exc}")
+            st.stop()
+        partials[kind].append(partial)
+        files.append(stats)
+        progress.progress(number / len(uploads), text=f"{upload.name}: {stats['rows']:,} строк")
+    progress.empty()
+
+    st.session_state.reconcile_result = {
+        "campaigns": reconcile(partials["costs"], partials["sessions"], get_vocabularies().members),
+        "files": files,
+    }
+
+# ============================================================
+# РЕЗУЛЬТАТ
+# ============================================================
+
+result = st.session_state.get("reconcile_result")
+if result:
+    campaigns = result["campaigns"]
+    summary_totals = totals(campaigns)
+
+    col_cost, col_sessions, col_matched, col_unmatched = st.columns(4)
+    col_cost.metric("Расход", f"{summary_totals['cost']:,.0f}")
+    col_sessions.metric("Сессии", f"{summary_totals['sessions']:,.0f}")
+    col_matched.metric("Кампаний сведено", f"{summary_totals['matched']:,} из {summary_totals['campaigns']:,}")
+    col_unmatched.metric("Расход без сессий", f"{summary_totals['unmatched_cost_share']:.1%}")
+    if summary_totals["outside_naming"]:
+        st.warning(f"⚠️ Кампаний вне нейминга: {summary_totals['outside_naming']:,} — "
+                   "они собраны в сегмент «(вне нейминга)»")
+
+    by = st.multiselect("Группировать по", NAMING_FIELDS, default=["product", "stream"],
+                        format_func=FIELD_VOCABULARY.get, key="reconcile_by")
+    if by:
+        summary = summarize(campaigns, by)
+        st.dataframe(summary, use_container_width=True, hide_index=True, column_config={
+            **{field: FIELD_VOCABULARY[field] for field in by},
+            "campaigns": "Кампаний",
+            "cost": st.column_config.NumberColumn("Расход", format="%.2f"),
+            "clicks": st.column_config.NumberColumn("Клики", format="%d"),
+            "sessions": st.column_config.NumberColumn("Сессии", format="%d"),
+            "conversions": st.column_config.NumberColumn("Конверсии", format="%d"),
+            "cost_per_session": st.column_config.NumberColumn("Цена сессии", format="%.2f"),
+            "cost_per_conversion": st.column_config.NumberColumn("Цена конверсии", format="%.2f"),
+        })
+        st.download_button("⬇️ Скачать итог (CSV)", to_csv_bytes(summary),
+                           file_name=f"reconcile_{'_'.join(by)}.csv", mime="text/csv", type="primary")
+    st.download_button("⬇️ Скачать разбивку по кампаниям (CSV)", to_csv_bytes(campaigns),
+                       file_name="reconcile_campaigns.csv", mime="text/csv")
+
+    unmatched = campaigns[(campaigns["cost"] > 0) & (campaigns["sessions"] == 0)]
+    if len(unmatched):
+        with st.expander(f"Расход без сессий: {len(unmatched):,} кампаний"):
+            st.dataframe(unmatched.sort_values("cost", ascending=False)[["campaign", "cost", "clicks", "unknown"]],
+                         use_container_width=True, hide_index=True)
+
+    with st.expander("Файлы"):
+        st.dataframe(result["files"], use_container_width=True, hide_index=True, column_order=(
+            "file", "kind", "cached", "rows", "campaigns", "skipped", "not_numbers"))